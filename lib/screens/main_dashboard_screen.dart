@@ -261,10 +261,12 @@ class _MainDashboardScreenState extends State<MainDashboardScreen> {
                             
                             // 2. 세션 체크 성공 시 트래킹 시작
                             if (sessionResult['sucess'] == true || sessionResult['success'] == true) {
-                              // 혹시 남아있는 프로세스 정리
-                              print('Ensuring clean state before starting tracking...');
-                              await PythonService.cleanup();
-                              await Future.delayed(const Duration(milliseconds: 300));
+                              // 혹시 남아있는 프로세스 정리 (일시정지된 프로세스는 재사용)
+                              if (!PythonService.hasWarmProcess) {
+                                print('Ensuring clean state before starting tracking...');
+                                await PythonService.cleanup();
+                                await Future.delayed(const Duration(milliseconds: 300));
+                              }
                               
                               final settingsProvider = Provider.of<SettingsProvider>(context, listen: false);
                               print('Starting tracking with showSkeleton: ${settingsProvider.showSkeleton}');
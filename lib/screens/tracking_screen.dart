@@ -432,9 +432,9 @@ class _TrackingScreenState extends State<TrackingScreen> {
                                         _transcriptSubscription?.cancel();
                                         _commandSubscription?.cancel();
                                         
-                                        // Python 프로세스 완전 종료
-                                        print('Window is closing, cleaning up Python processes...');
-                                        await PythonService.cleanup();
+                                        // Python 프로세스는 일시정지 - 모델과 연결을 유지해 다시 시작이 빠름
+                                        print('Pausing hand tracking, keeping the Python process warm...');
+                                        await PythonService.pauseHandTracking();
                                         
                                         // main_dashboard_screen으로 이동
                                         if (mounted) Navigator.pop(context);
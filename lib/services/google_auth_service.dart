@@ -5,6 +5,7 @@ import 'dart:io';
 import 'dart:async';
 import 'dart:math';
 import 'auth_storage_service.dart';
+import 'python_service.dart';
 import 'env_service.dart';
 import '../constants/app_constants.dart';
 import '../utils/logger.dart';
@@ -195,6 +196,9 @@ class GoogleAuthService {
   }
 
   static Future<bool> logout() async {
+    // 일시정지된 Python 프로세스는 이전 사용자의 토큰과 모션 설정을 갖고 있다
+    await PythonService.cleanup();
+    
     final result = await http.post(
       Uri.parse('https://www.3-sigma-server.com/v1/auth/logout'),
       headers: {
@@ -228,6 +232,10 @@ class GoogleAuthService {
         // 토큰 저장
         final data = serverResponse['data'];
         if (data != null && data['accessToken'] != null && data['refreshToken'] != null) {
+          // 다른 계정일 수 있으므로 이전 로그인의 Python 프로세스를 재사용하지 않는다
+          if (PythonService.hasWarmProcess || PythonService.isTracking) {
+            await PythonService.cleanup();
+          }
           AuthStorageService.setTokens(data['accessToken'], data['refreshToken']);
         }
         
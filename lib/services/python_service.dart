@@ -7,6 +7,7 @@ import 'auth_storage_service.dart';
 class PythonService {
   static Process? _handTrackingProcess;
   static bool _isTracking = false;
+  static bool _isPaused = false;
   static int? _pythonProcessId;
   static StreamController<Uint8List> _cameraStreamController = StreamController<Uint8List>.broadcast();
   static StreamController<String> _gestureStreamController = StreamController<String>.broadcast();
@@ -15,6 +16,22 @@ class PythonService {
 
   /// Start hand tracking using Python overlay
   static Future<bool> startHandTracking({bool showSkeleton = false}) async {
+    // 일시정지된 프로세스는 모델과 연결이 살아있으므로 재개만 한다
+    if (_handTrackingProcess != null && _isPaused) {
+      // 토큰이 없으면 (로그아웃 등) 이전 세션의 프로세스를 재사용하지 않는다
+      final accessToken = await AuthStorageService.getValidAccessToken();
+      if (accessToken != null) {
+        print('Resuming warm Python process (PID: $_pythonProcessId)');
+        _isPaused = false;
+        updateSkeletonDisplay(showSkeleton);
+        // 일시정지 중 바뀐 모션 설정을 현재 토큰으로 다시 불러온다
+        sendCommand('resume_tracking', null, {'access_token': accessToken});
+        return true;
+      }
+      print('No access token for the warm Python process, starting a fresh one');
+      await cleanup();
+    }
+
     // 이미 실행 중인 경우 먼저 정리
     if (_isTracking) {
       print('Python process already running, cleaning up first...');
@@ -67,8 +84,21 @@ class PythonService {
 
       if (_handTrackingProcess != null) {
         _isTracking = true;
+        _isPaused = false;
         _pythonProcessId = _handTrackingProcess!.pid;
         print('Hand tracking started successfully (PID: $_pythonProcessId)');
+
+        // Forget the process if it exits on its own so the next start relaunches it
+        final process = _handTrackingProcess!;
+        process.exitCode.then((code) {
+          if (_handTrackingProcess == process) {
+            print('Python process exited with code $code');
+            _handTrackingProcess = null;
+            _pythonProcessId = null;
+            _isTracking = false;
+            _isPaused = false;
+          }
+        });
         
         // Listen to process output and parse camera frames and gestures
         _handTrackingProcess!.stdout.listen((data) {
@@ -170,6 +200,17 @@ class PythonService {
     return false;
   }
 
+  /// Pause hand tracking - the camera is released but the Python process,
+  /// its model and WebSocket stay warm so the next start only resumes it
+  static Future<void> pauseHandTracking() async {
+    if (_handTrackingProcess == null || _isPaused) {
+      return;
+    }
+    sendCommand('pause_tracking');
+    _isPaused = true;
+    print('Hand tracking paused (PID: $_pythonProcessId)');
+  }
+
   /// Stop hand tracking
   static Future<void> stopHandTracking() async {
     if (_handTrackingProcess != null) {
@@ -194,6 +235,7 @@ class PythonService {
       _handTrackingProcess = null;
       _pythonProcessId = null;
       _isTracking = false;
+      _isPaused = false;
       print('Hand tracking stopped');
     }
   }
@@ -243,7 +285,10 @@ class PythonService {
   }
 
   /// Check if hand tracking is currently active
-  static bool get isTracking => _isTracking;
+  static bool get isTracking => _isTracking && !_isPaused;
+
+  /// Check if a paused, warm Python process can be resumed
+  static bool get hasWarmProcess => _handTrackingProcess != null && _isPaused;
 
   /// Get camera stream from MediaPipe
   static Stream<Uint8List> get cameraStream => _cameraStreamController.stream;
@@ -257,17 +302,19 @@ class PythonService {
   /// Get command stream from Python command processing
   static Stream<Map<String, dynamic>> get commandStream => _commandStreamController.stream;
   
-  /// Send command to Python process
-  static void sendCommand(String command, [String? text]) {
+  /// Send command to Python process, with optional extra fields in payload
+  static void sendCommand(String command, [String? text, Map<String, dynamic>? payload]) {
     if (_handTrackingProcess != null && _isTracking) {
       try {
         final commandData = {
           'type': command,
           if (text != null) 'text': text,
+          ...?payload,
         };
         final jsonCommand = json.encode(commandData);
         _handTrackingProcess!.stdin.writeln(jsonCommand);
-        print('Sent command to Python: $jsonCommand');
+        // payload may carry the access token - only its keys are logged
+        print('Sent command to Python: ${payload == null ? jsonCommand : '$command ${payload.keys.toList()}'}');
       } catch (e) {
         print('Error sending command to Python: $e');
       }
@@ -0,0 +1,128 @@
+"""
+Compact audio encodings for the transcription stream: G.711 μ-law and 2:1 narrowband downsampling
+"""
+
+import numpy as np
+
+from audio_frames import FORMATS, SAMPLE_BYTES
+
+_BIAS = 0x84
+_CLIP = 32635
+
+
+def _build_mulaw_tables():
+    """Encode table indexed by the uint16 bit pattern of every int16 sample, and the 256-entry decode table"""
+    linear = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    sign = np.where(linear < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(linear), _CLIP) + _BIAS
+    exponent = np.frexp((magnitude >> 7).astype(np.float64))[1] - 1  # Highest set bit, 0-7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    encode = (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+    code = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (code >> 4) & 0x07
+    decoded = (((code & 0x0F) << 3) + _BIAS << exponent) - _BIAS
+    decode = np.where(code & 0x80, -decoded, decoded).astype(np.int16)
+    return encode, decode
+
+
+_MULAW_ENCODE, _MULAW_DECODE = _build_mulaw_tables()
+
+
+def mulaw_encode(samples, out=None):
+    """int16 samples to μ-law bytes (uint8), one table lookup per sample"""
+    samples = np.ascontiguousarray(samples, dtype=np.int16)
+    return np.take(_MULAW_ENCODE, samples.view(np.uint16), out=out)
+
+
+def mulaw_decode(data):
+    """μ-law bytes (any buffer) back to int16 samples"""
+    return _MULAW_DECODE[np.frombuffer(data, dtype=np.uint8)]
+
+
+def decode_audio(payload, audio_format):
+    """Payload of one audio message as int16 samples at its own sample rate"""
+    if audio_format == 'mulaw':
+        return mulaw_decode(payload)
+    if audio_format == 'pcm_s16le':
+        return np.frombuffer(payload, dtype='<i2')
+    raise ValueError(f"Unknown audio format: {audio_format}")
+
+
+class Downsampler:
+    """Halves the sample rate of int16 chunks.
+
+    A windowed-sinc low-pass removes everything above cutoff (a fraction of
+    the output Nyquist frequency) before every second sample is kept. Filter
+    history and sample phase carry over between chunks, so a stream comes
+    out the same however it was chunked.
+    """
+
+    def __init__(self, taps=31, cutoff=0.9):
+        n = np.arange(taps) - (taps - 1) / 2.0
+        fc = 0.25 * cutoff  # Cycles per input sample
+        kernel = 2 * fc * np.sinc(2 * fc * n) * np.hamming(taps)
+        self.kernel = (kernel / kernel.sum()).astype(np.float32)
+        self.taps = taps
+        self.reset()
+
+    def reset(self):
+        """Start a new stream"""
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._phase = 0  # Index of the first kept sample in the next chunk
+
+    def process(self, samples):
+        """Filter and decimate one chunk; returns about half as many int16 samples"""
+        signal = np.concatenate((self._history, np.asarray(samples, dtype=np.float32)))
+        windows = np.lib.stride_tricks.sliding_window_view(signal, self.taps)[self._phase::2]
+        filtered = windows @ self.kernel
+        self._phase = (self._phase - len(samples)) % 2
+        self._history = signal[len(signal) - (self.taps - 1):]
+        return np.clip(np.rint(filtered), -32768, 32767).astype(np.int16)
+
+
+class AudioEncoder:
+    """Turns captured int16 chunks into the payload of one audio message.
+
+    audio_format is a key of audio_frames.FORMATS. sample_rate may be the
+    capture rate or half of it (narrowband). The returned array is reused
+    by the next encode call, so it must be sent before then.
+    """
+
+    def __init__(self, audio_format='pcm_s16le', input_rate=16000, sample_rate=None):
+        if audio_format not in FORMATS:
+            raise ValueError(f"Unknown audio format: {audio_format}")
+        self.audio_format = audio_format
+        self.input_rate = input_rate
+        self.sample_rate = sample_rate or input_rate
+        if self.sample_rate == input_rate:
+            self.downsampler = None
+        elif self.sample_rate * 2 == input_rate:
+            self.downsampler = Downsampler()
+        else:
+            raise ValueError(f"Audio can be sent at {input_rate} or {input_rate // 2} Hz, not {self.sample_rate}")
+        self._out = np.empty(0, dtype=np.uint8)
+
+    @property
+    def is_default(self):
+        """Plain PCM at the capture rate, what servers expect without negotiation"""
+        return self.audio_format == 'pcm_s16le' and self.downsampler is None
+
+    def reset(self):
+        if self.downsampler is not None:
+            self.downsampler.reset()
+
+    def encoded_size(self, sample_count):
+        """Payload bytes for sample_count captured samples"""
+        if self.downsampler is not None:
+            sample_count = (sample_count + 1) // 2
+        return sample_count * SAMPLE_BYTES[self.audio_format]
+
+    def encode(self, samples):
+        if self.downsampler is not None:
+            samples = self.downsampler.process(samples)
+        if self.audio_format == 'pcm_s16le':
+            return samples
+        if len(self._out) < len(samples):
+            self._out = np.empty(len(samples), dtype=np.uint8)
+        return mulaw_encode(samples, out=self._out[:len(samples)])
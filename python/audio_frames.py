@@ -0,0 +1,57 @@
+"""
+Binary audio frames for the transcription WebSocket: a small fixed header followed by raw samples
+"""
+
+import struct
+
+MAGIC = b'SA'
+VERSION = 1
+
+# Sample encodings a frame can carry
+FORMATS = {
+    'pcm_s16le': 1,  # 16-bit signed little-endian PCM, mono
+    'mulaw': 2,  # G.711 μ-law, 8 bits per sample, mono (see audio_codec.py)
+}
+FORMAT_NAMES = {code: name for name, code in FORMATS.items()}
+SAMPLE_BYTES = {'pcm_s16le': 2, 'mulaw': 1}
+
+# magic, version, format, session id, sequence number, sample rate in Hz
+_HEADER = struct.Struct('<2sBBIIH')
+HEADER_SIZE = _HEADER.size
+
+
+class AudioFrame:
+    """One decoded binary audio frame"""
+
+    __slots__ = ('session', 'sequence', 'audio_format', 'sample_rate', 'payload')
+
+    def __init__(self, session, sequence, audio_format, sample_rate, payload):
+        self.session = session
+        self.sequence = sequence  # Per-session chunk counter, starting at 0
+        self.audio_format = audio_format  # Key of FORMATS
+        self.sample_rate = sample_rate
+        self.payload = payload  # memoryview of the sample bytes
+
+
+def pack_audio_frame(session, sequence, samples, audio_format='pcm_s16le', sample_rate=16000):
+    """Header plus sample bytes as one binary WebSocket payload.
+
+    samples may be any contiguous buffer, e.g. a slice of a pooled int16
+    chunk; it is copied once, into the returned bytes.
+    """
+    header = _HEADER.pack(MAGIC, VERSION, FORMATS[audio_format],
+                          session & 0xFFFFFFFF, sequence & 0xFFFFFFFF, sample_rate)
+    return header + memoryview(samples).cast('B')
+
+
+def unpack_audio_frame(data):
+    """Parse a binary payload written by pack_audio_frame; raises ValueError if it is not one"""
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"Audio frame too short: {len(data)} bytes")
+    magic, version, format_code, session, sequence, sample_rate = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not an audio frame (magic {magic!r}, version {version})")
+    if format_code not in FORMAT_NAMES:
+        raise ValueError(f"Unknown audio format code: {format_code}")
+    return AudioFrame(session, sequence, FORMAT_NAMES[format_code], sample_rate,
+                      memoryview(data)[HEADER_SIZE:])
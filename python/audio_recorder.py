@@ -4,100 +4,478 @@ Audio recording module for gesture-based voice recognition
 
 import sys
 import queue
+import random
 import threading
 import json
 import base64
 import numpy as np
-import sounddevice as sd
-import websocket
+from audio_codec import AudioEncoder
+from audio_frames import pack_audio_frame
 from command_executor import LocalAgent
+from flutter_channel import send_to_flutter
+from metrics import metrics
+from startup import startup
 
 class AudioRecorder:
-    def __init__(self, websocket_client):
+    """Streams microphone audio to the transcription WebSocket.
+
+    The sounddevice callback converts each block straight into preallocated
+    int16 chunk buffers, so capture allocates no audio arrays per block. Blocks are
+    coalesced into chunk_ms chunks, which cuts the number of WebSocket
+    messages. Full chunks wait in a bounded queue for the sender thread. When
+    the sender falls behind, the oldest chunk is dropped and counted. Each
+    recording has its own queue and sender, which sends start_transcribe,
+    the chunks and stop_transcribe in order after the previous recording's
+    sender is done; stopping a recording never waits on the network.
+
+    With always_open the input stream stays open between recordings and
+    the callback keeps the last preroll_ms of audio in a ring buffer. A
+    recording then starts instantly and begins with that pre-roll, so words
+    spoken while the gesture was being made are not lost.
+
+    An optional VoiceActivityDetector gates chunks before they are encoded:
+    silent chunks are skipped except every silence_keep_every-th one, which
+    keeps the transcription stream alive. The newest skipped chunk is held
+    back and sent ahead of the next speech, since it may hold a word onset.
+
+    audio_format and send_samplerate pick the encoding of sent chunks (see
+    audio_codec.py): 'mulaw' halves the bytes, and half the capture rate
+    halves them again. Any other than 16 kHz PCM is announced in the
+    start_transcribe message.
+    """
+
+    def __init__(self, websocket_client, chunk_ms=160.0, max_queued_chunks=16,
+                 samplerate=16000, blocksize=1024, always_open=False, preroll_ms=500.0,
+                 voice_activity=None, silence_keep_every=10, audio_format='pcm_s16le',
+                 send_samplerate=None):
         self.websocket_client = websocket_client
         self.is_recording = False
-        self.audio_queue = queue.Queue()
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.chunk_samples = max(1, int(samplerate * chunk_ms / 1000.0))
+        
+        # Guards the recording flag, the chunk being filled and the pre-roll
+        # between the PortAudio callback and start/stop
+        self._lock = threading.Lock()
+        self.stream = None
+        
+        # A stream is opened outside the lock; while that runs nobody else may
+        # open one, and a close that arrives meanwhile is left to the opener
+        self._stream_opening = False
+        self._stream_opened = threading.Condition(self._lock)
+        self._stream_wanted = False  # Always-open stream requested and not closed since
+        self._shared_stream = None  # The always-open stream, kept open between recordings
+        
+        # Always-open mode: stream kept open, pre-roll ring of the latest samples
+        self.always_open = always_open
+        preroll_samples = int(samplerate * preroll_ms / 1000.0) if always_open else 0
+        self._preroll = np.zeros(max(0, preroll_samples), dtype=np.int16)
+        self._preroll_pos = 0  # Next write position
+        self._preroll_count = 0  # Valid samples, up to the ring size
+
+        # Scaled float samples of the current block, reused by every callback
+        self._scratch = np.empty(blocksize, dtype=np.float32)
+        
+        # Buffer pool: every queued chunk plus the ones being filled, sent and held back
+        # Each recording gets its own queue, so a slow sender of the last one
+        # never loses its end marker to the next recording's chunks
+        self.max_queued_chunks = max_queued_chunks
+        self.audio_queue = queue.Queue(maxsize=max_queued_chunks)
+        self._free_chunks = queue.SimpleQueue()
+        for _ in range(max_queued_chunks + 3):
+            self._free_chunks.put(np.empty(self.chunk_samples, dtype=np.int16))
+        self._chunk = None  # Chunk being filled by the callback
+        self._chunk_fill = 0
+        
+        # Encoding of sent chunks, runs on the sender thread
+        self.encoder = AudioEncoder(audio_format, samplerate, send_samplerate)
+        
+        # Identifies the recording and orders its chunks in binary audio frames
+        self.session = 0
+        self.sequence = 0
+        
+        # Silence suppression (see voice_activity.py), None sends everything
+        self.voice_activity = voice_activity
+        self.silence_keep_every = silence_keep_every  # 0 drops all silence
+        self._held_chunk = None  # Newest skipped silent chunk, (buffer, length)
+        self._silent_run = 0
+
+        # Statistics
+        self.chunks_sent = 0
+        self.chunks_dropped = 0
+        self.input_overflows = 0
+        self.preroll_samples_sent = 0
+        self.silent_chunks_skipped = 0
+        self.bytes_saved = 0
+
+    def _take_chunk(self):
+        """Free chunk buffer from the pool"""
+        try:
+            return self._free_chunks.get_nowait()
+        except queue.Empty:
+            # Only if the pool was sized too small - keep capturing anyway
+            return np.empty(self.chunk_samples, dtype=np.int16)
+
+    def _queue_chunk(self, chunk, length):
+        """Hand a filled chunk to the sender, dropping the oldest one if the queue is full"""
+        self._queue_item((chunk, length))
+
+    def _queue_end(self):
+        """Queue the end-of-recording marker - call with the lock held; the oldest chunk makes room"""
+        self._queue_item(None)
+
+    def _queue_item(self, item):
+        """Put an item on the sender queue, dropping the oldest chunk while it is full"""
+        while True:
+            try:
+                self.audio_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    dropped, _ = self.audio_queue.get_nowait()
+                except queue.Empty:
+                    continue
+                self._free_chunks.put(dropped)
+                self.chunks_dropped += 1
+                metrics.increment('audio_chunks_dropped')
 
     def audio_callback(self, audio_data, frames, time, status):
         """Audio callback for sounddevice"""
-        if self.is_recording:
-            # Scale and convert to int16 (same as main.py)
-            scaled_audio = (audio_data * 32767).astype(np.int16)
-            self.audio_queue.put(scaled_audio.tobytes())
+        if status and status.input_overflow:
+            self.input_overflows += 1
+            metrics.increment('audio_input_overflows')
+        if not self.is_recording and not len(self._preroll):
+            return
 
-    def start_recording(self):
-        """Start audio recording"""
-        if self.is_recording:
-            return False
-            
-        self.is_recording = True
-        
-        # Send start transcribe message
-        self.websocket_client.send_message({
-            'action': 'transcribe_streaming', 
-            'type': 'start_transcribe'
-        })
+        if frames > len(self._scratch):
+            self._scratch = np.empty(frames, dtype=np.float32)
+        # Scale into the scratch buffer; the int16 copies below truncate like astype
+        samples = self._scratch[:frames]
+        np.multiply(audio_data[:, 0], 32767, out=samples)
+        with self._lock:
+            if self.is_recording:
+                self._append_samples(samples)
+            else:
+                self._write_preroll(samples)
+
+    def _write_preroll(self, samples):
+        """Keep the newest samples in the pre-roll ring - call with the lock held"""
+        size = len(self._preroll)
+        if len(samples) >= size:
+            self._preroll[:] = samples[-size:]
+            self._preroll_pos = 0
+            self._preroll_count = size
+            return
+        end = self._preroll_pos + len(samples)
+        if end <= size:
+            self._preroll[self._preroll_pos:end] = samples
+        else:
+            split = size - self._preroll_pos
+            self._preroll[self._preroll_pos:] = samples[:split]
+            self._preroll[:end - size] = samples[split:]
+        self._preroll_pos = end % size
+        self._preroll_count = min(self._preroll_count + len(samples), size)
+
+    def _take_preroll(self):
+        """Move the buffered pre-roll, oldest first, into the recording - call with the lock held"""
+        count = self._preroll_count
+        if not count:
+            return
+        start = (self._preroll_pos - count) % len(self._preroll)
+        if start + count <= len(self._preroll):
+            self._append_samples(self._preroll[start:start + count])
+        else:
+            self._append_samples(self._preroll[start:])
+            self._append_samples(self._preroll[:self._preroll_pos])
+        self._preroll_count = 0
+        self.preroll_samples_sent += count
+        metrics.record('audio_preroll', count / self.samplerate)
+
+    def _append_samples(self, samples):
+        """Copy samples into pooled chunks, queueing each one that fills up"""
+        frames = len(samples)
+        offset = 0
+        while offset < frames:
+            if self._chunk is None:
+                self._chunk = self._take_chunk()
+                self._chunk_fill = 0
+            count = min(frames - offset, self.chunk_samples - self._chunk_fill)
+            self._chunk[self._chunk_fill:self._chunk_fill + count] = samples[offset:offset + count]
+            self._chunk_fill += count
+            offset += count
+            if self._chunk_fill == self.chunk_samples:
+                self._queue_chunk(self._chunk, self._chunk_fill)
+                self._chunk = None
+
+    def _flush_chunk(self):
+        """Queue the partly filled chunk - call with the lock held once recording has stopped"""
+        if self._chunk is not None and self._chunk_fill:
+            self._queue_chunk(self._chunk, self._chunk_fill)
+        elif self._chunk is not None:
+            self._free_chunks.put(self._chunk)
+        self._chunk = None
+        self._chunk_fill = 0
+
+    def _wait_for_opening(self):
+        """Wait until no stream is being opened - call with the lock held"""
+        while self._stream_opening:
+            self._stream_opened.wait()
+
+    def _open_input_stream(self):
+        """Create and start an input stream, None if the microphone cannot be opened
         
+        Runs without the lock; the caller has set _stream_opening.
+        """
         try:
-            # Start audio input stream
-            self.stream = sd.InputStream(
-                samplerate=16000,
+            # Imported on first use - PortAudio init is slow and not needed to start tracking
+            import sounddevice as sd
+            stream = sd.InputStream(
+                samplerate=self.samplerate,
                 channels=1,
                 dtype='float32',
-                blocksize=1024,
+                blocksize=self.blocksize,
                 callback=self.audio_callback,
             )
-            self.stream.start()
-            
-            # Start audio processing thread
-            self.processing_thread = threading.Thread(target=self._process_audio, daemon=True)
-            self.processing_thread.start()
-            
-            return True
+            stream.start()
+            return stream
         except Exception as e:
-            print(f"Error starting audio recording: {e}")
-            self.is_recording = False
+            print(f"Error opening microphone: {e}")
+            return None
+
+    def _finish_opening(self, stream, still_wanted, shared=False):
+        """Publish a started stream, or close it if it was closed while opening
+        
+        still_wanted is checked under the lock. A shared stream stays open
+        between recordings. Returns True if the stream was kept.
+        """
+        with self._lock:
+            self._stream_opening = False
+            self._stream_opened.notify_all()
+            if stream is not None and still_wanted():
+                self.stream = stream
+                if shared:
+                    self._shared_stream = stream
+                return True
+        if stream is not None:
+            # Stopped outside the lock - stop() waits for a running callback
+            try:
+                stream.stop()
+                stream.close()
+                print("Microphone closed while it was opening")
+            except Exception as e:
+                print(f"Error closing microphone: {e}")
+        return False
+
+    def open_stream(self):
+        """Open the input stream and keep it open (always-open mode only)
+        
+        Returns False if the microphone cannot be opened; recordings then
+        open their own stream as usual.
+        """
+        with self._lock:
+            if not self.always_open:
+                return False
+            self._stream_wanted = True
+            self._wait_for_opening()
+            if self.stream is not None:
+                # A recording's own stream is running - keep it from now on
+                self._shared_stream = self.stream
+                return True
+            self._stream_opening = True
+        
+        stream = self._open_input_stream()
+        # A pause may have closed the microphone while it was starting
+        if not self._finish_opening(stream, lambda: self._stream_wanted, shared=True):
             return False
+        print(f"Microphone open with {len(self._preroll) * 1000 // self.samplerate} ms pre-roll")
+        return True
 
-    def _process_audio(self):
-        """Process audio data in separate thread"""
-        while self.is_recording:
+    def close_stream(self):
+        """Close the input stream, e.g. while tracking is paused or on exit"""
+        self.stop_recording()
+        with self._lock:
+            # A stream still opening is closed by its opener
+            self._stream_wanted = False
+            stream = self.stream
+            self.stream = None
+            self._shared_stream = None
+            self._preroll_count = 0
+        if stream is not None:
             try:
-                # Get audio data with timeout
-                audio_data = self.audio_queue.get(timeout=0.1)
-                
-                # Encode and send
-                encoded_audio = base64.b64encode(audio_data).decode('utf-8')
-                self.websocket_client.send_message({
-                    'action': 'transcribe_streaming',
-                    'type': 'send_audio',
-                    'data': encoded_audio,
-                })
+                stream.stop()
+                stream.close()
+            except Exception as e:
+                print(f"Error closing microphone: {e}")
+
+    def start_recording(self):
+        """Start audio recording"""
+        with self._lock:
+            # Never open a second stream next to one that is still starting
+            self._wait_for_opening()
+            if self.is_recording:
+                return False
+            own_stream = self.stream is None
+            if own_stream:
+                self._stream_opening = True
+        
+        # Stream already running (always-open mode): the pre-roll goes out
+        # first, then live audio. Otherwise the sender waits for the new stream.
+        self._begin_session()
+        if not own_stream:
+            return True
+        
+        stream = self._open_input_stream()
+        # The recording may have been stopped while the stream was starting
+        if not self._finish_opening(stream, lambda: self.is_recording):
+            self.stop_recording()
+            return False
+        return True
+
+    def _begin_session(self):
+        """Start recording into the queue and hand the session to a new sender thread
+        
+        The sender of the previous recording may still be draining; the new
+        one waits for it, so sessions reach the server one after the other.
+        """
+        with self._lock:
+            self.audio_queue = queue.Queue(maxsize=self.max_queued_chunks)
+            self.is_recording = True
+            self._take_preroll()
+        previous = getattr(self, 'processing_thread', None)
+        self.processing_thread = threading.Thread(target=self._send_session, args=(previous, self.audio_queue),
+                                                  daemon=True)
+        self.processing_thread.start()
+
+    def _send_session(self, previous, audio_queue):
+        """Sender thread: announce the session, send its chunks, then stop it"""
+        if previous is not None:
+            previous.join()
+        self._announce_session()
+        self._process_audio(audio_queue)
+        self._end_session()
+
+    def _announce_session(self):
+        """Reset the per-session send state and announce the session to the server"""
+        self.session = random.getrandbits(32)
+        self.sequence = 0
+        self._silent_run = 0
+        self.encoder.reset()
+        if self.voice_activity is not None:
+            self.voice_activity.reset()
+        
+        # Send start transcribe message
+        start_message = {
+            'action': 'transcribe_streaming', 
+            'type': 'start_transcribe'
+        }
+        audio_format = {
+            'audio_format': self.encoder.audio_format,
+            'sample_rate': self.encoder.sample_rate,
+        }
+        if self.websocket_client.binary_audio:
+            # Tell the server how to read the binary frames that follow
+            start_message.update(framing='binary', session=self.session, **audio_format)
+        elif not self.encoder.is_default:
+            start_message.update(audio_format)
+        self.websocket_client.send_message(start_message)
+
+    def _process_audio(self, audio_queue=None):
+        """Send queued chunks until the end-of-recording marker"""
+        if audio_queue is None:
+            audio_queue = self.audio_queue
+        while True:
+            try:
+                item = audio_queue.get(timeout=0.1)
             except queue.Empty:
                 continue
-            except Exception as e:
-                print(f"Error processing audio: {e}")
+            if item is None:
+                # Trailing silence is never needed
+                if self._held_chunk is not None:
+                    self._skip_chunk(*self._held_chunk)
+                    self._held_chunk = None
                 break
+            chunk, length = item
+            if self.voice_activity is not None and not self._gate_chunk(chunk, length):
+                continue
+            self._send_chunk(chunk, length)
+
+    def _gate_chunk(self, chunk, length):
+        """Voice activity gate: False if the chunk was held back or skipped instead of sent"""
+        if self.voice_activity.update(chunk[:length]):
+            self._silent_run = 0
+            if self._held_chunk is not None:
+                # Possible word onset just before the speech
+                self._send_chunk(*self._held_chunk)
+                self._held_chunk = None
+            return True
+
+        self._silent_run += 1
+        if self.silence_keep_every and self._silent_run % self.silence_keep_every == 0:
+            # Thin out long silences instead of dropping them entirely
+            if self._held_chunk is not None:
+                self._skip_chunk(*self._held_chunk)
+                self._held_chunk = None
+            return True
+        if self._held_chunk is not None:
+            self._skip_chunk(*self._held_chunk)
+        self._held_chunk = (chunk, length)
+        return False
+
+    def _skip_chunk(self, chunk, length):
+        """Count a silent chunk that is not sent and return its buffer"""
+        self.silent_chunks_skipped += 1
+        self.bytes_saved += self.encoder.encoded_size(length)
+        metrics.increment('audio_silent_chunks_skipped')
+        metrics.increment('audio_bytes_saved', self.encoder.encoded_size(length))
+        self._free_chunks.put(chunk)
+
+    def _send_chunk(self, chunk, length):
+        """Encode and send a chunk straight from its pooled buffer, then return the buffer"""
+        try:
+            with metrics.time('audio_encode'):
+                payload = self.encoder.encode(chunk[:length])
+            self.websocket_client.send_audio(self.session, self.sequence, payload,
+                                             self.encoder.sample_rate, self.encoder.audio_format)
+            self.sequence += 1
+            self.chunks_sent += 1
+            metrics.increment('audio_chunks_sent')
+        except Exception as e:
+            print(f"Error processing audio: {e}")
+        finally:
+            self._free_chunks.put(chunk)
 
     def stop_recording(self):
         """Stop audio recording"""
-        if not self.is_recording:
-            return
-            
-        self.is_recording = False
+        with self._lock:
+            if not self.is_recording:
+                return
+            self.is_recording = False
+            # Stop and close the recording's own stream; only the always-open
+            # stream stays open for the pre-roll
+            stream = None
+            if self.stream is not self._shared_stream:
+                stream = self.stream
+                self.stream = None
         
-        try:
-            # Stop and close stream
-            if hasattr(self, 'stream'):
-                self.stream.stop()
-                self.stream.close()
-                
-            # Wait for processing thread to finish
-            if hasattr(self, 'processing_thread'):
-                self.processing_thread.join(timeout=1.0)
-                
-        except Exception as e:
-            print(f"Error stopping audio recording: {e}")
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception as e:
+                print(f"Error stopping audio recording: {e}")
+        
+        # Send the tail of the recording; the sender drains the queue up to
+        # the end marker and then sends stop_transcribe, off this thread
+        with self._lock:
+            self._flush_chunk()
+            self._queue_end()
+
+    def _end_session(self):
+        """Report the finished session and tell the server it is over - sender thread"""
+        if self.voice_activity is not None:
+            speech_ratio = self.voice_activity.speech_ratio
+            metrics.set('audio_speech_ratio', round(speech_ratio, 3))
+            print(f"Voice activity: {speech_ratio:.0%} speech, {self.bytes_saved} bytes of silence not sent")
         
         # Send stop transcribe message
         self.websocket_client.send_message({
@@ -129,7 +507,10 @@ class WebSocketClient:
     INFO_OS = 'get_os'
     INFO_RECENT_FILES = 'get_recent_files'
 
-    def __init__(self, transcript_callback=None, command_callback=None, local_agent=None):
+    def __init__(self, transcript_callback=None, command_callback=None, local_agent=None,
+                 url=None, binary_audio=False):
+        self.url = url or self.WEBSOCKET_URL
+        self.binary_audio = binary_audio  # Audio as binary frames (see audio_frames.py) instead of base64 JSON
         self.websocket_connection = None
         self.is_connected = False
         self.audio_streaming = False
@@ -139,17 +520,21 @@ class WebSocketClient:
         self._connect()
 
     def _connect(self):
-        """Connect to WebSocket server"""
+        """Connect to WebSocket server in a background thread"""
+        threading.Thread(target=self._run_connection, daemon=True).start()
+
+    def _run_connection(self):
+        """Import the client, connect and serve the connection until it closes"""
         try:
+            import websocket
             self.websocket_connection = websocket.WebSocketApp(
-                self.WEBSOCKET_URL,
+                self.url,
                 on_message=self._on_message,
                 on_open=self._on_open,
                 on_close=self._on_close,
                 on_error=self._on_error,
             )
-            # Start WebSocket in background thread
-            threading.Thread(target=self.websocket_connection.run_forever, daemon=True).start()
+            self.websocket_connection.run_forever()
         except Exception as e:
             print(f"WebSocket connection error: {e}")
 
@@ -157,6 +542,7 @@ class WebSocketClient:
         """WebSocket opened"""
         self.is_connected = True
         self.audio_streaming = False
+        startup.mark('websocket_connected')
         print("WebSocket connected")
 
     def _on_close(self, ws, code, msg):
@@ -189,10 +575,8 @@ class WebSocketClient:
                 }
                 # Ensure UTF-8 encoding and validate JSON before sending
                 try:
-                    json_str = json.dumps(transcript_data, ensure_ascii=False)
+                    json_str = send_to_flutter(transcript_data)
                     if json_str and json_str.strip():
-                        print(json_str)
-                        sys.stdout.flush()  # Force flush stdout
                         # Debug log to file
                         with open('transcript_debug.log', 'a', encoding='utf-8') as f:
                             f.write(f"SENT: {json_str}\n")
@@ -215,9 +599,7 @@ class WebSocketClient:
                     "message": data.get('message', '')
                 }
                 try:
-                    json_str = json.dumps(command_data, ensure_ascii=False)
-                    if json_str and json_str.strip():
-                        print(json_str, flush=True)
+                    send_to_flutter(command_data)
                 except Exception as e:
                     print(f"Error encoding command JSON: {e}", flush=True)
             
@@ -255,6 +637,8 @@ class WebSocketClient:
             try:
                 message = json.dumps(data, ensure_ascii=False)
                 self.websocket_connection.send(message)
+                metrics.increment('websocket_messages_sent')
+                metrics.increment('websocket_bytes_sent', len(message))
 
                 msg_type = data.get('type', '')
                 if msg_type == 'start_transcribe':
@@ -270,6 +654,27 @@ class WebSocketClient:
                 return False
         return False
 
+    def send_audio(self, session, sequence, samples, sample_rate, audio_format='pcm_s16le'):
+        """Send one encoded chunk (see audio_codec.py), as a binary frame or a base64 JSON message"""
+        if not self.binary_audio:
+            return self.send_message({
+                'action': self.ACTION_TRANSCRIBE_STREAMING,
+                'type': self.TYPE_SEND_AUDIO,
+                'data': base64.b64encode(memoryview(samples)).decode('ascii'),
+            })
+        if self.websocket_connection and self.is_connected:
+            try:
+                import websocket
+                frame = pack_audio_frame(session, sequence, samples, audio_format, sample_rate)
+                self.websocket_connection.send(frame, opcode=websocket.ABNF.OPCODE_BINARY)
+                metrics.increment('websocket_messages_sent')
+                metrics.increment('websocket_bytes_sent', len(frame))
+                return True
+            except Exception as e:
+                print(f"Error sending WebSocket audio frame: {e}")
+                return False
+        return False
+
     def close(self):
         """Close WebSocket connection"""
         if self.websocket_connection:
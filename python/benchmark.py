@@ -0,0 +1,1319 @@
+#!/usr/bin/env python3
+"""
+Headless benchmarks for the hand tracking pipeline
+
+Usage:
+    python benchmark.py pipeline <clip|image_dir|synthetic[:frames]> [--realtime]
+                                 [--backend legacy|tasks] [--model-complexity 0|1] [--model path] [--json]
+    python benchmark.py replay <landmark_log> [--realtime] [--events] [--cursor-filter] [--json]
+    python benchmark.py frame-channel [--frames N] [--width W] [--json]
+    python benchmark.py degradation [--frames N] [--json]
+    python benchmark.py injection <landmark_log> [--backend recording|pyautogui|native] [--cursor-rate HZ] [--json]
+    python benchmark.py scroll-units [--json]
+    python benchmark.py scroll [--speed S] [--seconds T] [--json]
+    python benchmark.py audio [--seconds T] [--chunk-ms MS] [--json]
+    python benchmark.py audio-framing [--seconds T] [--chunk-ms MS] [--audio-format F] [--sample-rate HZ] [--json]
+    python benchmark.py codec [--seconds T] [--chunk-ms MS] [--json]
+    python benchmark.py vad [--seconds T] [--chunk-ms MS] [--hangover-ms MS] [--json]
+    python benchmark.py audio-sessions [--json]
+    python benchmark.py mic-open [--json]
+    python benchmark.py startup [--source SPEC] [--runs N] [--timeout S] [--json] [-- standalone args]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class StubCursorSink:
+    """Stands in for CursorController and only counts what it is asked to do"""
+
+    def __init__(self):
+        self.cursor_updates = 0
+        self.gestures = {}
+
+    def update_cursor(self, thumb_pos):
+        self.cursor_updates += 1
+
+    def handle_gesture(self, gesture):
+        self.gestures[gesture] = self.gestures.get(gesture, 0) + 1
+
+
+def latency_summary(latencies):
+    """p50/p95/p99/max of a list of per-frame latencies in seconds, as ms"""
+    if not latencies:
+        return {'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    values = np.asarray(latencies) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'max_ms': round(float(values.max()), 3),
+    }
+
+
+def run_pipeline_benchmark(source, max_frames=None, warmup_frames=10, roi_mode=False,
+                           landmark_backend='legacy', model_complexity=1, model_path=None):
+    """Push every frame of a source through GestureDetector and a stub cursor sink
+
+    With the async tasks backend a frame may return before its landmarks
+    are ready; results counts the frames that produced a landmark result.
+    """
+    import cv2
+    from gesture_detector import GestureDetector
+
+    detector = GestureDetector(roi_mode=roi_mode, landmark_backend=landmark_backend,
+                               model_complexity=model_complexity, model_path=model_path)
+    sink = StubCursorSink()
+    latencies = []
+    results = 0
+    hands_detected = 0
+    frame_index = 0
+
+    if not source.open():
+        raise RuntimeError("Could not open frame source")
+
+    try:
+        start = None
+        while max_frames is None or frame_index < max_frames + warmup_frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+
+            frame_start = time.perf_counter()
+            frame = cv2.flip(frame, 1)
+            _, gesture_data = detector.process_frame(frame)
+            if gesture_data and gesture_data['landmarks'] is not None:
+                if gesture_data['thumb_pos'] is not None:
+                    sink.update_cursor(gesture_data['thumb_pos'])
+                sink.handle_gesture(gesture_data['gesture'])
+            frame_end = time.perf_counter()
+
+            frame_index += 1
+            if frame_index <= warmup_frames:
+                continue
+            if start is None:
+                start = frame_start
+            latencies.append(frame_end - frame_start)
+            if not detector.result_pending:
+                results += 1
+            if gesture_data and gesture_data['landmarks'] is not None:
+                hands_detected += 1
+    finally:
+        source.release()
+        detector.cleanup()
+
+    elapsed = (time.perf_counter() - start) if start is not None else 0.0
+    result = {
+        'frames': len(latencies),
+        'elapsed_s': round(elapsed, 3),
+        'fps': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'backend': landmark_backend,
+        'results': results,
+        'result_fps': round(results / elapsed, 2) if elapsed > 0 else 0.0,
+        'hands_detected': hands_detected,
+        'cursor_updates': sink.cursor_updates,
+        'gestures': sink.gestures,
+    }
+    result.update(latency_summary(latencies))
+    return result
+
+
+def run_degradation_benchmark(frames=60, window_size=30):
+    """Frame-loop load at each degradation level, from real stage costs.
+
+    Flip, preview encode (done inline here; the app encodes on the preview
+    thread), full-frame inference and a fingertip repaint are each timed on
+    synthetic frames. Their medians then drive DegradationController at every
+    level, so the load it measures reflects only which stages the level
+    runs. checks require each level to lower the load. Downscaled inference
+    is timed as well, as it was dropped from the ladder for costing more
+    than it saves.
+    """
+    import cv2
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QColor, QImage, QPainter, QPen
+    from degradation_controller import DegradationController
+    from frame_source import SyntheticFrameSource
+    from gesture_detector import GestureDetector
+    from preview_encoder import PreviewEncoder
+
+    source = SyntheticFrameSource(frame_count=frames + 5)
+    if not source.open():
+        raise RuntimeError("Could not open frame source")
+    images = []
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        images.append(frame)
+    source.release()
+
+    detector = GestureDetector()
+    encoder = PreviewEncoder(send=lambda message: None, skip_threshold=-1.0)
+    canvas = QImage(1920, 1080, QImage.Format.Format_ARGB32_Premultiplied)
+    canvas.fill(Qt.GlobalColor.transparent)
+
+    def paint():
+        painter = QPainter(canvas)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        pen = QPen(QColor(0, 255, 0, 200))
+        pen.setWidth(10)
+        painter.setPen(pen)
+        for x, y in ((600, 400), (700, 380), (800, 390), (900, 420)):
+            painter.drawPoint(x, y)
+        painter.end()
+
+    def median_ms(work, warmup=5):
+        times = []
+        for index, image in enumerate(images):
+            start = time.perf_counter()
+            work(image)
+            if index >= warmup:
+                times.append(time.perf_counter() - start)
+        return float(np.median(times))
+
+    try:
+        stage_costs = {
+            'flip': median_ms(lambda image: cv2.flip(image, 1)),
+            'preview': median_ms(encoder._encode_and_send),
+            'inference': median_ms(lambda image: detector.process_frame(image)),
+            'paint': median_ms(lambda image: paint()),
+        }
+        low_res_inference = median_ms(lambda image: detector.process_frame(image, inference_width=320))
+    finally:
+        detector.cleanup()
+
+    levels = {}
+    for level, name in DegradationController.LEVEL_NAMES.items():
+        controller = DegradationController(window_size=window_size, enabled=False)
+        controller.level = level
+        preview_counter = 0
+        for _ in range(window_size):
+            if not controller.should_process_frame():
+                continue
+            controller.record('flip', stage_costs['flip'])
+            preview_counter += 1
+            if preview_counter >= controller.preview_interval:
+                preview_counter = 0
+                controller.record('preview', stage_costs['preview'])
+            controller.record('inference', stage_costs['inference'])
+            controller.end_frame()
+            if not controller.skip_skeleton:
+                controller.record_late('paint', stage_costs['paint'])
+        levels[name] = round(controller.load * 1000, 3)
+
+    names = list(levels)
+    return {
+        'stage_ms': {name: round(cost * 1000, 3) for name, cost in stage_costs.items()},
+        'inference_320px_ms': round(low_res_inference * 1000, 3),
+        'load_ms_per_frame': levels,
+        'checks': {f"{names[index]}_lowers_load": levels[names[index]] < levels[names[index - 1]]
+                   for index in range(1, len(names))},
+    }
+
+
+def evaluate_cursor_filter(timestamps, thumb_positions, latency=0.06, params=None,
+                           screen_size=(1920, 1080)):
+    """Run the predictive cursor filter over recorded thumb positions.
+
+    Jitter is the mean absolute second difference of the cursor path.
+    Prediction error compares each output with where the raw thumb actually
+    was `latency` seconds later, which is what the filter tries to show.
+    """
+    from cursor_filter import PredictiveCursorFilter
+
+    cursor_filter = PredictiveCursorFilter()
+    if params:
+        cursor_filter.update_params(**params)
+
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    raw = np.asarray(thumb_positions, dtype=np.float64)[:, :2] * screen_size
+    filtered = np.empty_like(raw)
+    start = time.perf_counter()
+    for i, (x, y) in enumerate(raw):
+        filtered[i] = cursor_filter.filter(x, y, timestamp=timestamps[i], latency=latency)
+    elapsed = time.perf_counter() - start
+
+    def jitter(path):
+        if len(path) < 3:
+            return 0.0
+        return float(np.mean(np.linalg.norm(np.diff(path, n=2, axis=0), axis=1)))
+
+    future = np.searchsorted(timestamps, timestamps + latency)
+    valid = future < len(raw)
+    raw_error = np.linalg.norm(raw[valid] - raw[future[valid]], axis=1)
+    filtered_error = np.linalg.norm(filtered[valid] - raw[future[valid]], axis=1)
+    return {
+        'params': cursor_filter.params(),
+        'latency_ms': round(latency * 1000, 1),
+        'filter_us': round(elapsed / max(len(raw), 1) * 1e6, 2),
+        'raw_jitter_px': round(jitter(raw), 2),
+        'filtered_jitter_px': round(jitter(filtered), 2),
+        'raw_error_px': round(float(raw_error.mean()), 2) if valid.any() else 0.0,
+        'filtered_error_px': round(float(filtered_error.mean()), 2) if valid.any() else 0.0,
+    }
+
+
+def run_replay_benchmark(path, realtime=False, show_events=False, cursor_latency=None):
+    """Replay a landmark log through the gesture classifier"""
+    from gesture_detector import GestureDetector
+    from landmark_log import replay_landmark_log
+
+    detector = GestureDetector(enable_tracking=False)
+    gestures = {}
+    latencies = []
+    frames = 0
+    last_gesture = None
+    dynamic_gestures = {}
+    timestamps = []
+    thumb_positions = []
+    start = time.perf_counter()
+    frame_start = start
+    for timestamp, positions, gesture in replay_landmark_log(path, detector, realtime=realtime):
+        now = time.perf_counter()
+        latencies.append(now - frame_start)
+        frames += 1
+        key = 'scroll' if gesture.startswith('scroll:') else gesture
+        gestures[key] = gestures.get(key, 0) + 1
+        if show_events and gesture != last_gesture:
+            print(f"{timestamp:.3f} {gesture}")
+        for event in detector.dynamic.update(positions, timestamp):
+            dynamic_gestures[event] = dynamic_gestures.get(event, 0) + 1
+            if show_events:
+                print(f"{timestamp:.3f} {event} (dynamic)")
+        last_gesture = gesture
+        if cursor_latency is not None:
+            timestamps.append(timestamp)
+            thumb_positions.append(positions[4])
+        frame_start = time.perf_counter()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'frames': frames,
+        'elapsed_s': round(elapsed, 3),
+        'fps': round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        'gestures': gestures,
+        'dynamic_gestures': dynamic_gestures,
+    }
+    result.update(latency_summary(latencies))
+    if cursor_latency is not None and thumb_positions:
+        result['cursor_filter'] = evaluate_cursor_filter(timestamps, thumb_positions, cursor_latency)
+    return result
+
+
+def run_injection_benchmark(path, backend='recording', latency=0.06, cursor_rate=120.0, paced_frames=150):
+    """Drive CursorController with a recorded gesture stream and count injection calls.
+
+    Moves are injected inline (no injector thread) so the call counts are
+    deterministic. With a real backend every call is also timed. The first
+    paced_frames cursor targets are then posted to a cursor_rate injector
+    thread at the recorded frame pace, to measure the delay the thread adds
+    between a target and its first move and how many extrapolated moves
+    it sends per target.
+    """
+    from cursor_controller import CursorController
+    from gesture_detector import GestureDetector
+    from input_backend import RecordingBackend, create_input_backend
+    from landmark_log import replay_landmark_log
+
+    inner = None if backend == 'recording' else create_input_backend(backend)
+    recorder = RecordingBackend(inner=inner)
+    controller = CursorController(cursor_rate=0, backend=recorder, scroll_rate=0)
+    detector = GestureDetector(enable_tracking=False)
+
+    frames = 0
+    gesture_calls = {}
+    targets = []  # (move_to args, frame timestamp, filter velocity) for the paced pass
+    start = time.perf_counter()
+    for timestamp, positions, gesture in replay_landmark_log(path, detector):
+        calls_before = len(recorder.calls)
+        controller.update_cursor(positions[4], timestamp=timestamp, latency=latency)
+        if len(recorder.calls) > calls_before and len(targets) < paced_frames:
+            velocity = (controller.cursor_filter.x_filter.velocity, controller.cursor_filter.y_filter.velocity)
+            targets.append((recorder.calls[-1][1], timestamp, velocity))
+        controller.handle_gesture(gesture, timestamp=timestamp)
+        if gesture == 'paste_start':
+            controller.paste()
+        frames += 1
+        key = 'scroll' if gesture.startswith('scroll:') else gesture
+        gesture_calls[key] = gesture_calls.get(key, 0) + len(recorder.calls) - calls_before
+    elapsed = time.perf_counter() - start
+    controller.stop()
+
+    durations = {}
+    for call, _, duration in recorder.calls:
+        durations.setdefault(call, []).append(duration)
+
+    # The injector works from the newest target; a target's delay runs to its first move
+    from cursor_injector import CursorInjector
+    post_times = []
+    moves = []  # (time, targets posted so far) for every move the injector sends
+    injector = CursorInjector(lambda x, y: moves.append((time.perf_counter(), len(post_times))),
+                              rate_hz=cursor_rate)
+    injector.start()
+    previous = None
+    paced_start = time.perf_counter()
+    for (x, y), timestamp, velocity in targets:
+        if previous is not None:
+            time.sleep(min(max(timestamp - previous, 0.0), 0.1))
+        previous = timestamp
+        post_times.append(time.perf_counter())
+        injector.set_target(x, y, velocity)
+    time.sleep(2.0 / cursor_rate)
+    injector.stop()
+    paced_elapsed = time.perf_counter() - paced_start
+    first_moves = {}
+    for move_time, posted in moves:
+        first_moves.setdefault(posted, move_time)
+    move_delays = [move_time - post_times[posted - 1] for posted, move_time in first_moves.items() if posted]
+
+    return {
+        'backend': inner.name if inner is not None else 'recording',
+        'frames': frames,
+        'elapsed_s': round(elapsed, 3),
+        'calls': recorder.counts(),
+        'calls_per_frame': round(len(recorder.calls) / frames, 3) if frames else 0.0,
+        'moves_merged': controller.cursor_injector.moves_merged,
+        'calls_by_gesture': gesture_calls,
+        'call_latency': {call: latency_summary(values) for call, values in durations.items()},
+        'injector_rate_hz': cursor_rate,
+        'injector_move_delay': latency_summary(move_delays),
+        'injector_moves_per_target': round(len(moves) / len(targets), 2) if targets else 0.0,
+        'injector_moves_per_s': round(len(moves) / paced_elapsed, 1) if targets else 0.0,
+        'targets_per_s': round(len(targets) / paced_elapsed, 1) if targets else 0.0,
+    }
+
+
+def run_scroll_units_check(amounts=(-240, -37, -1, 1, 20, 120)):
+    """Check that the native and pyautogui backends scroll by the same amount.
+
+    Each backend runs behind a RecordingBackend, as CursorController uses
+    it, against stand-ins for what it calls: pyautogui, user32 on Windows
+    and XTest on X11. The stand-ins record how far the OS would scroll, in
+    the units pyautogui itself passes on for that platform: wheel delta on
+    Windows, button 4/5 presses on X11.
+    """
+    from input_backend import PyAutoGuiBackend, RecordingBackend, WindowsInputBackend, XTestInputBackend
+
+    class Pyautogui:
+        def __init__(self):
+            self.scrolled = []
+
+        def scroll(self, clicks):
+            self.scrolled.append(clicks)
+
+    class User32:
+        def __init__(self):
+            self.scrolled = []
+
+        def mouse_event(self, flags, dx, dy, data, extra):
+            if flags == WindowsInputBackend._MOUSEEVENTF_WHEEL:
+                self.scrolled.append(data)
+
+    class XTest:
+        def __init__(self):
+            self.scrolled = []
+
+        def fake_input(self, display, event, detail=0, **kwargs):
+            if event == 'press':
+                self.scrolled.append(1 if detail == 4 else -1)
+
+    class XEvents:
+        ButtonPress = 'press'
+        ButtonRelease = 'release'
+
+    class Display:
+        def flush(self):
+            pass
+
+    def scroll_with(backend, log):
+        recorder = RecordingBackend(inner=backend)
+        totals = []
+        for amount in amounts:
+            before = len(log)
+            recorder.scroll(amount)
+            totals.append(sum(log[before:]))
+        return totals
+
+    pyautogui = Pyautogui()
+    pyautogui_backend = PyAutoGuiBackend.__new__(PyAutoGuiBackend)
+    pyautogui_backend.pyautogui = pyautogui
+    expected = scroll_with(pyautogui_backend, pyautogui.scrolled)
+
+    windows = WindowsInputBackend.__new__(WindowsInputBackend)
+    windows.user32 = User32()
+    xtest = XTestInputBackend.__new__(XTestInputBackend)
+    xtest.xtest = XTest()
+    xtest.X = XEvents
+    xtest.display = Display()
+
+    result = {
+        'amounts': list(amounts),
+        'pyautogui': expected,
+        'native_windows': scroll_with(windows, windows.user32.scrolled),
+        'native_x11': scroll_with(xtest, xtest.xtest.scrolled),
+    }
+    result['checks'] = {
+        'windows_matches_pyautogui': result['native_windows'] == expected,
+        'x11_matches_pyautogui': result['native_x11'] == expected,
+    }
+    return result
+
+
+def run_scroll_benchmark(speed=0.5, seconds=2.0, frame_rates=(15, 30, 60)):
+    """Scroll output for a steady scroll gesture at several camera frame rates.
+
+    The legacy path sent int(-speed * 20) units per frame, so its rate scaled
+    with FPS and small speeds truncated to nothing; the scroll engine should
+    give the same units/s at every frame rate.
+    """
+    from scroll_engine import ScrollEngine
+
+    gain = 600.0  # Same calibration as CursorController.scroll_gain
+    result = {'speed': speed, 'seconds': seconds}
+    for fps in frame_rates:
+        sent = []
+        engine = ScrollEngine(sent.append, rate_hz=0)
+        frames = int(seconds * fps)
+        for frame in range(frames):
+            now = frame / fps
+            engine.advance(now)
+            engine.set_velocity(-speed * gain, now)
+        engine.advance(frames / fps)
+        held_units = sum(sent)
+        engine.release()
+        now = frames / fps
+        while engine.is_active:
+            now += 1 / 60
+            engine.advance(now)
+        result[f"{fps}fps"] = {
+            'engine_units_per_s': round(held_units / seconds, 1),
+            'inertia_units': sum(sent) - held_units,
+            'events': len(sent),
+            'legacy_units_per_s': round(int(-speed * 20) * frames / seconds, 1),
+        }
+    return result
+
+
+def run_audio_benchmark(seconds=10.0, chunk_ms=160.0, samplerate=16000, blocksize=1024):
+    """Capture path cost: per-block int16 conversion and sends vs pooled, coalesced chunks.
+
+    Feeds the same synthetic microphone blocks to both paths with a client
+    that only counts messages. Allocations are traced inside the callback.
+    """
+    import base64
+    import tracemalloc
+    from audio_recorder import AudioRecorder
+
+    class CountingClient:
+        binary_audio = False
+
+        def __init__(self):
+            self.messages = 0
+            self.bytes = 0
+
+        def send_message(self, data):
+            self.messages += 1
+            self.bytes += len(json.dumps(data))
+            return True
+
+        def send_audio(self, session, sequence, samples, sample_rate, audio_format='pcm_s16le'):
+            return self.send_message({'action': 'transcribe_streaming', 'type': 'send_audio',
+                                      'data': base64.b64encode(memoryview(samples)).decode('ascii')})
+
+    rng = np.random.default_rng(0)
+    block_count = int(seconds * samplerate / blocksize)
+    blocks = [rng.uniform(-0.5, 0.5, (blocksize, 1)).astype(np.float32) for _ in range(16)]
+
+    def measure(callback, send_pending):
+        """Median callback time, then the most memory one callback allocated (traced separately)"""
+        times = []
+        for index in range(block_count):
+            start = time.perf_counter()
+            callback(blocks[index % len(blocks)], blocksize, None, None)
+            times.append(time.perf_counter() - start)
+            send_pending()
+        peak = 0
+        tracemalloc.start()
+        for index in range(len(blocks) * 4):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            callback(blocks[index % len(blocks)], blocksize, None, None)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+            tracemalloc.stop()
+            send_pending()
+            tracemalloc.start()
+        tracemalloc.stop()
+        return times, peak
+
+    # Legacy path: a new int16 array and bytes object per block, one message per block
+    legacy_client = CountingClient()
+    legacy_queue = []
+
+    def legacy_callback(audio_data, frames, time_info, status):
+        legacy_queue.append((audio_data * 32767).astype(np.int16).tobytes())
+
+    def legacy_send():
+        while legacy_queue:
+            legacy_client.send_message({'action': 'transcribe_streaming', 'type': 'send_audio',
+                                        'data': base64.b64encode(legacy_queue.pop()).decode('utf-8')})
+
+    legacy_times, legacy_peak = measure(legacy_callback, legacy_send)
+
+    client = CountingClient()
+    recorder = AudioRecorder(client, chunk_ms=chunk_ms, samplerate=samplerate, blocksize=blocksize)
+    recorder.is_recording = True
+
+    def chunk_send():
+        while not recorder.audio_queue.empty():
+            recorder.audio_queue.put(None)
+            recorder._process_audio()
+
+    times, peak = measure(recorder.audio_callback, chunk_send)
+    duration = (block_count + len(blocks) * 4) * blocksize / samplerate  # Both measuring passes
+
+    def summary(client, callback_times, peak_bytes):
+        return {
+            'messages_per_s': round(client.messages / duration, 1),
+            'bytes_per_s': round(client.bytes / duration, 1),
+            'callback_us': round(float(np.median(callback_times)) * 1e6, 2),
+            'callback_peak_alloc_bytes': peak_bytes,
+        }
+
+    return {
+        'seconds': round(duration, 2),
+        'chunk_ms': chunk_ms,
+        'legacy': summary(legacy_client, legacy_times, legacy_peak),
+        'coalesced': summary(client, times, peak),
+        'added_delay_ms': round(max(0.0, chunk_ms - blocksize * 1000.0 / samplerate), 1),
+        'chunks_dropped': recorder.chunks_dropped,
+    }
+
+
+def run_audio_framing_benchmark(seconds=10.0, chunk_ms=160.0, samplerate=16000, blocksize=1024,
+                                audio_format='pcm_s16le', send_samplerate=None):
+    """Base64 JSON vs binary audio frames through a real WebSocket to local_ws_server.py.
+
+    The same synthetic microphone blocks go through AudioRecorder and
+    WebSocketClient in each framing mode. Client cost is the time spent in
+    send_audio; wire bytes and decode cost come from the server.
+    """
+    from audio_recorder import AudioRecorder, WebSocketClient
+    from local_ws_server import LocalWebSocketServer
+
+    server = LocalWebSocketServer(('127.0.0.1', 0)).start()
+    rng = np.random.default_rng(0)
+    blocks = [rng.uniform(-0.5, 0.5, (blocksize, 1)).astype(np.float32) for _ in range(16)]
+    block_count = int(seconds * samplerate / blocksize)
+    result = {'seconds': round(block_count * blocksize / samplerate, 2), 'chunk_ms': chunk_ms,
+              'audio_format': audio_format, 'sample_rate': send_samplerate or samplerate}
+    try:
+        for framing in ('json', 'binary'):
+            client = WebSocketClient(url=server.url, binary_audio=framing == 'binary')
+            deadline = time.perf_counter() + 5.0
+            while not client.is_connected and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            if not client.is_connected:
+                raise RuntimeError(f"Could not connect to {server.url}")
+
+            send_times = []
+            send_audio = client.send_audio
+
+            def timed_send_audio(*args):
+                start = time.perf_counter()
+                sent = send_audio(*args)
+                send_times.append(time.perf_counter() - start)
+                return sent
+
+            client.send_audio = timed_send_audio
+            recorder = AudioRecorder(client, chunk_ms=chunk_ms, samplerate=samplerate, blocksize=blocksize,
+                                     max_queued_chunks=block_count, audio_format=audio_format,
+                                     send_samplerate=send_samplerate)
+            recorder._begin_session()
+            for index in range(block_count):
+                recorder.audio_callback(blocks[index % len(blocks)], blocksize, None, None)
+            recorder.stop_recording()
+            recorder.processing_thread.join()
+
+            reports = len(server.reports)
+            client.close()
+            deadline = time.perf_counter() + 5.0
+            while len(server.reports) == reports and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            report = server.reports[-1].get(framing, {})
+            result[framing] = {
+                'messages': report.get('messages', 0),
+                'wire_bytes': report.get('wire_bytes', 0),
+                'overhead_pct': report.get('overhead_pct'),
+                'client_send_us': round(float(np.mean(send_times)) * 1e6, 2) if send_times else None,
+                'server_decode_us': report.get('decode_us_per_message'),
+                'audio_seconds': server.reports[-1]['audio_seconds'],
+                'sequence_gaps': server.reports[-1]['sequence_gaps'],
+            }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if result['json']['wire_bytes'] and result['binary']['wire_bytes']:
+        result['bytes_saved_pct'] = round(
+            100.0 * (1 - result['binary']['wire_bytes'] / result['json']['wire_bytes']), 1)
+    return result
+
+
+def run_codec_benchmark(seconds=10.0, chunk_ms=160.0, samplerate=16000):
+    """Round-trip checks, quality and encode throughput of the audio encodings.
+
+    Each mode encodes synthetic speech chunk by chunk through AudioEncoder,
+    as the sender thread does. checks must all be True.
+    """
+    from audio_codec import AudioEncoder, Downsampler, mulaw_decode, mulaw_encode
+
+    # Every μ-law code survives decode-encode-decode, and every int16 value
+    # comes back within half a quantization step (values past the top code clip)
+    codes = np.arange(256, dtype=np.uint8)
+    linear = np.arange(-32768, 32768, dtype=np.int32)
+    decoded = mulaw_decode(mulaw_encode(linear.astype(np.int16))).astype(np.int32)
+    in_range = np.abs(linear) <= np.abs(mulaw_decode(codes).astype(np.int32)).max()
+    step_bound = (np.abs(linear) + 132) / 32 + 1
+    checks = {
+        'mulaw_codes_round_trip': bool(np.array_equal(mulaw_decode(mulaw_encode(mulaw_decode(codes))),
+                                                      mulaw_decode(codes))),
+        'mulaw_error_within_step': bool(np.all(np.abs(decoded - linear)[in_range] <= step_bound[in_range])),
+    }
+
+    # Downsampling: chunking must not change the output; tones measure the filter
+    t = np.arange(samplerate) / samplerate
+    tone = lambda frequency: (10000 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+    downsampler = Downsampler()
+    whole = downsampler.process(tone(440))
+    downsampler.reset()
+    chunked = np.concatenate([downsampler.process(part) for part in np.array_split(tone(440), 7)])
+    checks['downsample_chunking_invariant'] = bool(np.array_equal(whole, chunked))
+
+    def gain_db(frequency):
+        downsampler.reset()
+        output = downsampler.process(tone(frequency))[64:].astype(np.float64)
+        return round(float(10 * np.log10(np.mean(output ** 2) / (10000 ** 2 / 2))), 1)
+
+    result = {
+        'seconds': seconds,
+        'chunk_ms': chunk_ms,
+        'checks': checks,
+        'narrowband_gain_db': {f"{frequency}Hz": gain_db(frequency) for frequency in (1000, 3000, 5000, 7000)},
+    }
+    checks['narrowband_stopband'] = result['narrowband_gain_db']['5000Hz'] < -40
+
+    speech, _ = synthetic_speech(seconds, samplerate)
+    speech = (speech * 32767).astype(np.int16)
+    speech_db = 10 * np.log10(np.mean(speech.astype(np.float64) ** 2))
+    result['mulaw_snr_db'] = round(float(
+        speech_db - 10 * np.log10(np.mean((mulaw_decode(mulaw_encode(speech)) - speech.astype(np.float64)) ** 2))), 1)
+
+    chunk_samples = int(samplerate * chunk_ms / 1000.0)
+    chunks = [speech[start:start + chunk_samples] for start in range(0, len(speech), chunk_samples)]
+    for audio_format in ('pcm_s16le', 'mulaw'):
+        for rate in (samplerate, samplerate // 2):
+            encoder = AudioEncoder(audio_format, samplerate, rate)
+            times = []
+            payload_bytes = 0
+            for chunk in chunks:
+                start = time.perf_counter()
+                payload = encoder.encode(chunk)
+                times.append(time.perf_counter() - start)
+                payload_bytes += payload.nbytes
+            result[f"{audio_format}@{rate}"] = {
+                'kbit_per_s': round(payload_bytes * 8 / seconds / 1000, 1),
+                'encode_us_per_chunk': round(float(np.median(times)) * 1e6, 2),
+                'msamples_per_s': round(len(speech) / sum(times) / 1e6, 1),
+            }
+    return result
+
+
+def synthetic_speech(seconds, samplerate=16000, speech_s=1.5, pause_s=2.0, seed=0):
+    """Voiced bursts with syllable-rate loudness changes over quiet room noise.
+
+    Returns float32 samples in [-1, 1] and a per-sample speech mask.
+    """
+    rng = np.random.default_rng(seed)
+    count = int(seconds * samplerate)
+    t = np.arange(count) / samplerate
+    mask = (t % (speech_s + pause_s)) < speech_s
+    pitch = 140.0 + 20.0 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / samplerate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = 0.55 + 0.45 * np.sin(2 * np.pi * 4.0 * t)
+    audio = 0.15 * voiced * syllables * mask + rng.normal(0.0, 0.002, count)
+    return np.clip(audio, -1.0, 1.0).astype(np.float32), mask
+
+
+def run_vad_benchmark(seconds=30.0, chunk_ms=160.0, hangover_ms=300.0, samplerate=16000):
+    """Chunks and bytes voice activity gating saves on synthetic speech with pauses.
+
+    Chunks go straight through AudioRecorder's send path. A chunk counts as
+    speech when any of its samples is; missed_speech_chunks are speech chunks
+    that were not sent.
+    """
+    from audio_recorder import AudioRecorder
+    from voice_activity import VoiceActivityDetector
+
+    audio, mask = synthetic_speech(seconds, samplerate)
+
+    class RecordingClient:
+        binary_audio = True
+
+        def __init__(self):
+            self.sent = set()
+
+        def send_message(self, data):
+            return True
+
+        def send_audio(self, session, sequence, samples, sample_rate, audio_format='pcm_s16le'):
+            self.sent.add(id(samples.base))
+            return True
+
+    client = RecordingClient()
+    vad = VoiceActivityDetector(samplerate=samplerate, hangover_ms=hangover_ms)
+    chunk_samples = max(1, int(samplerate * chunk_ms / 1000.0))
+    chunks = []
+    speech = []
+    for start in range(0, len(audio) - chunk_samples + 1, chunk_samples):
+        chunks.append((audio[start:start + chunk_samples] * 32767).astype(np.int16))
+        speech.append(bool(mask[start:start + chunk_samples].any()))
+    recorder = AudioRecorder(client, chunk_ms=chunk_ms, samplerate=samplerate,
+                             max_queued_chunks=len(chunks) + 1, voice_activity=vad)
+    recorder._announce_session()
+
+    vad_times = []
+    for chunk in chunks:
+        start = time.perf_counter()
+        vad.update(chunk)
+        vad_times.append(time.perf_counter() - start)
+    vad.reset()
+
+    for chunk in chunks:
+        recorder.audio_queue.put((chunk, chunk_samples))
+    recorder.audio_queue.put(None)
+    recorder._process_audio()
+
+    sent = [id(chunk) in client.sent for chunk in chunks]
+    return {
+        'seconds': round(len(chunks) * chunk_samples / samplerate, 2),
+        'chunk_ms': chunk_ms,
+        'hangover_ms': hangover_ms,
+        'chunks': len(chunks),
+        'speech_chunks': sum(speech),
+        'chunks_sent': recorder.chunks_sent,
+        'missed_speech_chunks': sum(1 for is_speech, was_sent in zip(speech, sent) if is_speech and not was_sent),
+        'silent_chunks_sent': sum(1 for is_speech, was_sent in zip(speech, sent) if was_sent and not is_speech),
+        'bytes_saved_pct': round(100.0 * recorder.bytes_saved / (len(chunks) * chunk_samples * 2), 1),
+        'speech_ratio': round(vad.speech_ratio, 3),
+        'vad_us_per_chunk': round(float(np.median(vad_times)) * 1e6, 2),
+    }
+
+
+def run_audio_session_check(sessions=2, chunks_per_session=12, send_delay=0.3, max_queued_chunks=4,
+                            chunk_ms=160.0, samplerate=16000):
+    """Check that recordings stay apart when the sender falls behind.
+
+    A client that sends slowly lets the queue fill up before every stop and
+    a new recording starts while the last one is still draining. Stopping
+    must not wait for the sender, every recording must still end with its
+    stop_transcribe, and no audio of a recording may be sent after that or
+    under the next session.
+    """
+    from audio_recorder import AudioRecorder
+
+    class SlowClient:
+        binary_audio = True
+
+        def __init__(self):
+            self.events = []
+
+        def send_message(self, data):
+            self.events.append((data['type'], data.get('session')))
+            return True
+
+        def send_audio(self, session, sequence, samples, sample_rate, audio_format='pcm_s16le'):
+            time.sleep(send_delay)
+            self.events.append(('audio', session))
+            return True
+
+    client = SlowClient()
+    recorder = AudioRecorder(client, chunk_ms=chunk_ms, samplerate=samplerate,
+                             max_queued_chunks=max_queued_chunks, always_open=True)
+    # Stand-in for the open always-open microphone, no PortAudio needed
+    recorder.stream = recorder._shared_stream = object()
+    block = np.full((recorder.chunk_samples, 1), 0.1, dtype=np.float32)
+
+    stop_times = []
+    for _ in range(sessions):
+        recorder.start_recording()
+        for _ in range(chunks_per_session):
+            recorder.audio_callback(block, len(block), None, None)
+        start = time.perf_counter()
+        recorder.stop_recording()
+        stop_times.append(time.perf_counter() - start)
+    recorder.processing_thread.join(timeout=sessions * (max_queued_chunks + 2) * send_delay + 5.0)
+
+    # Replay the wire order: audio belongs to the session opened last, never after a stop
+    current = None
+    misplaced = 0
+    for kind, session in client.events:
+        if kind == 'start_transcribe':
+            misplaced += current is not None  # Started before the last one stopped
+            current = session
+        elif kind == 'stop_transcribe':
+            current = None
+        elif session != current:
+            misplaced += 1
+    stops = sum(1 for kind, _ in client.events if kind == 'stop_transcribe')
+    return {
+        'sessions': sessions,
+        'chunks_sent': recorder.chunks_sent,
+        'chunks_dropped': recorder.chunks_dropped,
+        'stop_ms': [round(t * 1000.0, 1) for t in stop_times],
+        'misplaced_chunks': misplaced,
+        'checks': {
+            'stop_does_not_wait_for_sender': max(stop_times) < send_delay,
+            'every_session_stopped': stops == sessions and not recorder.processing_thread.is_alive(),
+            'no_audio_outside_its_session': misplaced == 0,
+        },
+    }
+
+
+def run_mic_open_check(open_delay=0.3):
+    """Check that a microphone stream still starting is neither doubled nor left open.
+
+    The always-open stream starts on a background thread. A recording that
+    begins meanwhile must use that stream instead of opening a second one,
+    and a pause that closes the microphone meanwhile must leave no stream
+    running. Once a recording stops, only the always-open stream its owner
+    wants open may keep running. PortAudio is replaced by streams that take
+    open_delay to start.
+    """
+    import threading
+    from audio_recorder import AudioRecorder
+
+    class Client:
+        binary_audio = False
+
+        def send_message(self, data):
+            return True
+
+        def send_audio(self, session, sequence, samples, sample_rate, audio_format='pcm_s16le'):
+            return True
+
+    class SlowStream:
+        def __init__(self, streams):
+            self.running = False
+            streams.append(self)
+
+        def start(self):
+            time.sleep(open_delay)
+            self.running = True
+
+        def stop(self):
+            self.running = False
+
+        def close(self):
+            pass
+
+    def recorder_with_slow_streams(always_open):
+        recorder = AudioRecorder(Client(), always_open=always_open)
+        streams = []
+
+        def open_slowly():
+            stream = SlowStream(streams)
+            stream.start()
+            return stream
+
+        recorder._open_input_stream = open_slowly
+        return recorder, streams
+
+    def while_opening(open_call, action):
+        thread = threading.Thread(target=open_call)
+        thread.start()
+        time.sleep(open_delay / 3)
+        action()
+        thread.join()
+
+    # Recording starts while the always-open stream is starting
+    recorder, streams = recorder_with_slow_streams(always_open=True)
+    while_opening(recorder.open_stream, recorder.start_recording)
+    recorder.stop_recording()
+    record_during_open = {'streams_opened': len(streams), 'running': sum(s.running for s in streams)}
+
+    # Tracking pauses while the always-open stream is starting
+    recorder, streams = recorder_with_slow_streams(always_open=True)
+    while_opening(recorder.open_stream, recorder.close_stream)
+    pause_during_open = {'streams_opened': len(streams), 'running': sum(s.running for s in streams)}
+
+    # A recording's own stream is still starting when the recording stops
+    recorder, streams = recorder_with_slow_streams(always_open=False)
+    while_opening(recorder.start_recording, recorder.stop_recording)
+    stop_during_open = {'streams_opened': len(streams), 'running': sum(s.running for s in streams),
+                        'recording': recorder.is_recording}
+
+    # Recordings after the shared stream is up, and while it is closed (paused)
+    recorder, streams = recorder_with_slow_streams(always_open=True)
+    recorder.open_stream()
+    recorder.start_recording()
+    recorder.stop_recording()
+    shared_kept = {'streams_opened': len(streams), 'running': sum(s.running for s in streams)}
+    recorder.close_stream()
+    recorder.start_recording()
+    recorder.stop_recording()
+    record_while_closed = {'streams_opened': len(streams), 'running': sum(s.running for s in streams)}
+
+    # Recording that opened its own stream because the always-open one could not be opened
+    recorder, streams = recorder_with_slow_streams(always_open=True)
+    open_slowly = recorder._open_input_stream
+    recorder._open_input_stream = lambda: None
+    recorder.open_stream()
+    recorder._open_input_stream = open_slowly
+    recorder.start_recording()
+    recorder.stop_recording()
+    fallback_closed = {'streams_opened': len(streams), 'running': sum(s.running for s in streams)}
+
+    return {
+        'record_during_open': record_during_open,
+        'pause_during_open': pause_during_open,
+        'stop_during_open': stop_during_open,
+        'shared_kept': shared_kept,
+        'record_while_closed': record_while_closed,
+        'fallback_closed': fallback_closed,
+        'checks': {
+            'shared_stream_kept_after_recording': shared_kept == {'streams_opened': 1, 'running': 1},
+            'mic_off_after_recording_while_closed': record_while_closed == {'streams_opened': 2, 'running': 0},
+            'mic_off_after_fallback_recording': fallback_closed == {'streams_opened': 1, 'running': 0},
+            'one_stream_when_recording_during_open': record_during_open == {'streams_opened': 1, 'running': 1},
+            'mic_off_when_paused_during_open': pause_during_open['running'] == 0,
+            'mic_off_when_stopped_during_open': stop_during_open['running'] == 0
+                                                 and not stop_during_open['recording'],
+        },
+    }
+
+
+def run_startup_benchmark(source='synthetic', runs=3, timeout=30.0, extra_args=()):
+    """Launch hand_tracking_standalone.py and time its startup milestones.
+
+    Times are wall clock from process launch to each 'startup' message, as
+    seen on the stdout pipe Flutter reads. A run ends at the first cursor
+    move or after timeout seconds; milestones never reached are left out.
+    """
+    import subprocess
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hand_tracking_standalone.py')
+    command = [sys.executable, script, '--source', source, '--input-backend', 'recording',
+               '--idle-timeout', '0', *extra_args]
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    timelines = []
+    for _ in range(runs):
+        launched = time.perf_counter()
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, env=env, text=True, encoding='utf-8')
+        timeline = {}
+        try:
+            for line in process.stdout:
+                # flutter_channel locks stdout per line, so every message is a line of its own
+                if line.startswith('{"type": "startup"'):
+                    try:
+                        message = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    timeline[message['event']] = (time.perf_counter() - launched) * 1000.0
+                    if message['event'] == 'first_cursor_move':
+                        break
+                if time.perf_counter() - launched > timeout:
+                    break
+        finally:
+            process.kill()
+            process.wait()
+        timelines.append(timeline)
+
+    events = sorted({event for timeline in timelines for event in timeline},
+                    key=lambda event: np.median([t[event] for t in timelines if event in t]))
+    milestones = {}
+    for event in events:
+        values = [timeline[event] for timeline in timelines if event in timeline]
+        milestones[event] = {
+            'median_ms': round(float(np.median(values)), 1),
+            'min_ms': round(float(np.min(values)), 1),
+            'runs': len(values),
+        }
+
+    def median_of(event):
+        return milestones[event]['median_ms'] if event in milestones else None
+
+    return {
+        'source': source,
+        'runs': runs,
+        'first_frame_processed_ms': median_of('first_frame_processed'),
+        'first_cursor_move_ms': median_of('first_cursor_move'),
+        'milestones': milestones,
+    }
+
+
+def run_frame_channel_benchmark(frames=500, width=180):
+    """Compare the JSON-line camera_frame path with the shared-memory ring.
+
+    Writer cost covers everything after JPEG encoding; reader cost covers
+    getting the JPEG bytes back out on the Flutter side.
+    """
+    import base64
+    import cv2
+    from frame_channel import SharedFrameReader, SharedFrameWriter
+    from frame_source import SyntheticFrameSource
+
+    source = SyntheticFrameSource(frame_count=frames)
+    source.open()
+    jpegs = []
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        height = int(frame.shape[0] * width / frame.shape[1])
+        _, buffer = cv2.imencode('.jpg', cv2.resize(frame, (width, height)),
+                                 [cv2.IMWRITE_JPEG_QUALITY, 80])
+        jpegs.append(buffer.tobytes())
+    source.release()
+
+    def measure(write, read):
+        write_times, read_times, wire_bytes = [], [], 0
+        for jpeg in jpegs:
+            start = time.perf_counter()
+            message = write(jpeg)
+            middle = time.perf_counter()
+            decoded = read(message)
+            end = time.perf_counter()
+            assert decoded == jpeg
+            write_times.append(middle - start)
+            read_times.append(end - middle)
+            wire_bytes += len(message) if isinstance(message, bytes) else len(jpeg)
+        return {
+            'write_us': round(float(np.mean(write_times)) * 1e6, 2),
+            'read_us': round(float(np.mean(read_times)) * 1e6, 2),
+            'bytes_per_frame': round(wire_bytes / len(jpegs), 1),
+        }
+
+    def json_write(jpeg):
+        data = {"type": "camera_frame", "data": base64.b64encode(jpeg).decode('utf-8')}
+        return (json.dumps(data, ensure_ascii=False) + "\n").encode('utf-8')
+
+    def json_read(line):
+        return base64.b64decode(json.loads(line)['data'])
+
+    writer = SharedFrameWriter()
+    reader = SharedFrameReader(writer.name)
+    try:
+        shm_result = measure(writer.write, lambda _: reader.read_latest()[1])
+    finally:
+        reader.close()
+        writer.close()
+
+    json_result = measure(json_write, json_read)
+    return {
+        'frames': len(jpegs),
+        'jpeg_bytes': round(sum(len(j) for j in jpegs) / len(jpegs), 1),
+        'json_line': json_result,
+        'shared_memory': shm_result,
+        'speedup': round((json_result['write_us'] + json_result['read_us']) /
+                         max(shm_result['write_us'] + shm_result['read_us'], 1e-9), 2),
+    }
+
+
+def print_result(name, result, as_json=False):
+    """Print a benchmark result as a table or a single JSON line"""
+    if as_json:
+        print(json.dumps({'benchmark': name, **result}, ensure_ascii=False))
+        return
+    print(f"== {name} ==")
+    for key, value in result.items():
+        print(f"  {key:<16} {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hand tracking benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    pipeline = subparsers.add_parser('pipeline', help='End-to-end frames/s and per-frame latency')
+    pipeline.add_argument('source', help='Video file, image directory or synthetic[:frames]')
+    pipeline.add_argument('--realtime', action='store_true',
+                          help='Pace frames at the clip frame rate instead of max speed')
+    pipeline.add_argument('--max-frames', type=int, default=None)
+    pipeline.add_argument('--warmup', type=int, default=10, help='Frames excluded from statistics')
+    pipeline.add_argument('--roi', action='store_true', help='Use ROI-cropped inference')
+    pipeline.add_argument('--backend', default='legacy', choices=['legacy', 'tasks'],
+                          help='Landmark backend to compare on the same clip')
+    pipeline.add_argument('--model-complexity', type=int, default=1, choices=[0, 1])
+    pipeline.add_argument('--model', default=None, help='hand_landmarker.task file for the tasks backend')
+    pipeline.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    replay = subparsers.add_parser('replay', help='Classifier throughput on a recorded landmark log')
+    replay.add_argument('log', help='Landmark log written with --record-landmarks')
+    replay.add_argument('--realtime', action='store_true', help='Replay at the recorded pace')
+    replay.add_argument('--events', action='store_true', help='Print every gesture change')
+    replay.add_argument('--cursor-filter', action='store_true',
+                        help='Also run the predictive cursor filter over the thumb path')
+    replay.add_argument('--latency-ms', type=float, default=60.0,
+                        help='Pipeline latency the cursor filter compensates for')
+    replay.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    frame_channel = subparsers.add_parser('frame-channel',
+                                          help='JSON-line vs shared-memory camera frame transport')
+    frame_channel.add_argument('--frames', type=int, default=500)
+    frame_channel.add_argument('--width', type=int, default=180, help='Preview width in pixels')
+    frame_channel.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    degradation = subparsers.add_parser('degradation',
+                                        help='Frame-loop load at each adaptive degradation level')
+    degradation.add_argument('--frames', type=int, default=60, help='Synthetic frames per timed stage')
+    degradation.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    injection = subparsers.add_parser('injection',
+                                      help='Input injection calls and cost for a recorded gesture stream')
+    injection.add_argument('log', help='Landmark log written with --record-landmarks')
+    injection.add_argument('--backend', default='recording', choices=['recording', 'pyautogui', 'native'],
+                           help='recording only counts calls; other backends really inject input')
+    injection.add_argument('--latency-ms', type=float, default=60.0,
+                           help='Pipeline latency the cursor filter compensates for')
+    injection.add_argument('--cursor-rate', type=float, default=120.0,
+                           help='Injector thread rate for the paced delay measurement')
+    injection.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    scroll_units = subparsers.add_parser('scroll-units',
+                                         help='Check that every input backend scrolls by the same units')
+    scroll_units.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    scroll = subparsers.add_parser('scroll', help='Scroll engine output across camera frame rates')
+    scroll.add_argument('--speed', type=float, default=0.5, help='Detector scroll speed to hold')
+    scroll.add_argument('--seconds', type=float, default=2.0)
+    scroll.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    audio = subparsers.add_parser('audio', help='Audio capture allocations and message rate')
+    audio.add_argument('--seconds', type=float, default=10.0, help='Seconds of synthetic microphone input')
+    audio.add_argument('--chunk-ms', type=float, default=160.0, help='Coalesced chunk length')
+    audio.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    audio_framing = subparsers.add_parser('audio-framing',
+                                          help='Base64 JSON vs binary WebSocket audio against a local server')
+    audio_framing.add_argument('--seconds', type=float, default=10.0, help='Seconds of synthetic microphone input')
+    audio_framing.add_argument('--chunk-ms', type=float, default=160.0, help='Coalesced chunk length')
+    audio_framing.add_argument('--audio-format', default='pcm_s16le', choices=['pcm_s16le', 'mulaw'])
+    audio_framing.add_argument('--sample-rate', type=int, default=16000, choices=[16000, 8000],
+                               help='Sample rate of sent audio')
+    audio_framing.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    codec = subparsers.add_parser('codec', help='Audio encoding round-trip checks, quality and throughput')
+    codec.add_argument('--seconds', type=float, default=10.0, help='Seconds of synthetic speech')
+    codec.add_argument('--chunk-ms', type=float, default=160.0, help='Coalesced chunk length')
+    codec.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    vad = subparsers.add_parser('vad', help='Silent audio chunks skipped by voice activity gating')
+    vad.add_argument('--seconds', type=float, default=30.0, help='Seconds of synthetic speech and pauses')
+    vad.add_argument('--chunk-ms', type=float, default=160.0, help='Coalesced chunk length')
+    vad.add_argument('--hangover-ms', type=float, default=300.0, help='Audio kept after speech ends')
+    vad.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    audio_sessions = subparsers.add_parser('audio-sessions',
+                                           help='Check that a slow sender never mixes audio across recordings')
+    audio_sessions.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    mic_open = subparsers.add_parser('mic-open',
+                                     help='Check microphone streams opened and closed concurrently')
+    mic_open.add_argument('--json', action='store_true', help='Print a single JSON line')
+
+    startup = subparsers.add_parser('startup',
+                                    help='Time to first processed frame and first cursor move')
+    startup.add_argument('--source', default='synthetic',
+                         help='Frame source for the standalone script; use a clip with a hand for cursor moves')
+    startup.add_argument('--runs', type=int, default=3)
+    startup.add_argument('--timeout', type=float, default=30.0, help='Seconds to wait per run')
+    startup.add_argument('--json', action='store_true', help='Print a single JSON line')
+    startup.add_argument('standalone_args', nargs=argparse.REMAINDER,
+                         help='Extra hand_tracking_standalone.py arguments after --')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'pipeline':
+        from frame_source import create_frame_source
+        source = args.source
+        if source == 'synthetic':
+            source = 'synthetic:300'
+        frame_source = create_frame_source(source, realtime=args.realtime)
+        result = run_pipeline_benchmark(frame_source, max_frames=args.max_frames,
+                                        warmup_frames=args.warmup, roi_mode=args.roi,
+                                        landmark_backend=args.backend,
+                                        model_complexity=args.model_complexity, model_path=args.model)
+        result['mode'] = 'realtime' if args.realtime else 'max_speed'
+        print_result('pipeline', result, args.json)
+    elif args.benchmark == 'replay':
+        cursor_latency = args.latency_ms / 1000.0 if args.cursor_filter else None
+        result = run_replay_benchmark(args.log, realtime=args.realtime, show_events=args.events,
+                                      cursor_latency=cursor_latency)
+        print_result('replay', result, args.json)
+    elif args.benchmark == 'frame-channel':
+        result = run_frame_channel_benchmark(frames=args.frames, width=args.width)
+        print_result('frame-channel', result, args.json)
+    elif args.benchmark == 'degradation':
+        result = run_degradation_benchmark(frames=args.frames)
+        print_result('degradation', result, args.json)
+        if not all(result['checks'].values()):
+            sys.exit(1)
+    elif args.benchmark == 'injection':
+        result = run_injection_benchmark(args.log, backend=args.backend, latency=args.latency_ms / 1000.0,
+                                         cursor_rate=args.cursor_rate)
+        print_result('injection', result, args.json)
+    elif args.benchmark == 'scroll-units':
+        result = run_scroll_units_check()
+        print_result('scroll-units', result, args.json)
+        if not all(result['checks'].values()):
+            sys.exit(1)
+    elif args.benchmark == 'scroll':
+        result = run_scroll_benchmark(speed=args.speed, seconds=args.seconds)
+        print_result('scroll', result, args.json)
+    elif args.benchmark == 'audio':
+        result = run_audio_benchmark(seconds=args.seconds, chunk_ms=args.chunk_ms)
+        print_result('audio', result, args.json)
+    elif args.benchmark == 'audio-framing':
+        result = run_audio_framing_benchmark(seconds=args.seconds, chunk_ms=args.chunk_ms,
+                                             audio_format=args.audio_format, send_samplerate=args.sample_rate)
+        print_result('audio-framing', result, args.json)
+    elif args.benchmark == 'codec':
+        result = run_codec_benchmark(seconds=args.seconds, chunk_ms=args.chunk_ms)
+        print_result('codec', result, args.json)
+        if not all(result['checks'].values()):
+            sys.exit(1)
+    elif args.benchmark == 'vad':
+        result = run_vad_benchmark(seconds=args.seconds, chunk_ms=args.chunk_ms, hangover_ms=args.hangover_ms)
+        print_result('vad', result, args.json)
+    elif args.benchmark == 'audio-sessions':
+        result = run_audio_session_check()
+        print_result('audio-sessions', result, args.json)
+        if not all(result['checks'].values()):
+            sys.exit(1)
+    elif args.benchmark == 'mic-open':
+        result = run_mic_open_check()
+        print_result('mic-open', result, args.json)
+        if not all(result['checks'].values()):
+            sys.exit(1)
+    elif args.benchmark == 'startup':
+        extra_args = [arg for arg in args.standalone_args if arg != '--']
+        result = run_startup_benchmark(source=args.source, runs=args.runs, timeout=args.timeout,
+                                       extra_args=extra_args)
+        print_result('startup', result, args.json)
+
+
+if __name__ == "__main__":
+    main()
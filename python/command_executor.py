@@ -9,6 +9,8 @@ import platform
 import os
 from pathlib import Path
 
+from flutter_channel import send_to_flutter
+
 class CommandExecutor:
     def __init__(self):
         pass
@@ -24,8 +26,7 @@ class CommandExecutor:
                 "status": "executing",
                 "command": command
             }
-            json_str = json.dumps(exec_data, ensure_ascii=False)
-            print(json_str, flush=True)
+            send_to_flutter(exec_data)
             
             # Execute command with timeout
             result = subprocess.run(
@@ -50,8 +51,7 @@ class CommandExecutor:
                         "output": output,
                         "copied": False
                     }
-                    json_str = json.dumps(success_data, ensure_ascii=False)
-                    print(json_str, flush=True)
+                    send_to_flutter(success_data)
                     
                     return True, output, False  # success, output, not copied
                 else:
@@ -65,8 +65,7 @@ class CommandExecutor:
                         "output": "",
                         "copied": False
                     }
-                    json_str = json.dumps(success_data, ensure_ascii=False)
-                    print(json_str, flush=True)
+                    send_to_flutter(success_data)
                     
                     return True, "", False  # success, no output, not copied
             else:
@@ -80,8 +79,7 @@ class CommandExecutor:
                     "command": command,
                     "error": error_output
                 }
-                json_str = json.dumps(error_data, ensure_ascii=False)
-                print(json_str, flush=True)
+                send_to_flutter(error_data)
                 
                 return False, error_output, False  # failed, error, not copied
                 
@@ -95,8 +93,7 @@ class CommandExecutor:
                 "status": "timeout",
                 "command": command
             }
-            json_str = json.dumps(timeout_data, ensure_ascii=False)
-            print(json_str, flush=True)
+            send_to_flutter(timeout_data)
             
             return False, error_msg, False
             
@@ -111,8 +108,7 @@ class CommandExecutor:
                 "command": command,
                 "error": str(e)
             }
-            json_str = json.dumps(failure_data, ensure_ascii=False)
-            print(json_str, flush=True)
+            send_to_flutter(failure_data)
             
             return False, error_msg, False
     
@@ -139,8 +135,7 @@ class CommandExecutor:
                     "status": "sent",
                     "text": text.strip()
                 }
-                json_str = json.dumps(request_data, ensure_ascii=False)
-                print(json_str, flush=True)
+                send_to_flutter(request_data)
                 
                 return True
             else:
@@ -2,74 +2,156 @@
 Mouse cursor control using detected gestures
 """
 
-import pyautogui
 import time
 
+from cursor_filter import PredictiveCursorFilter
+from cursor_injector import CursorInjector
+from input_backend import create_input_backend
+from scroll_engine import ScrollEngine
+
 class CursorController:
-    def __init__(self):
-        self.screen_width, self.screen_height = pyautogui.size()
+    def __init__(self, cursor_rate=120.0, backend=None, scroll_rate=60.0):
+        # Mouse/keyboard injection (see input_backend.py)
+        self.backend = backend if backend is not None else create_input_backend()
+        print(f"Input backend: {self.backend.name}")
+        self.screen_width, self.screen_height = self.backend.size()
         self.last_click_time = 0
         self.click_cooldown = 0.3  # Prevent multiple clicks
+        self.buttons_down = set()  # Buttons held by a click gesture
+        
+        # Smoothing and latency compensation for the raw thumb position
+        self.cursor_filter = PredictiveCursorFilter()
+        
+        # Cursor moves are injected from their own thread (cursor_rate=0 moves inline)
+        self.cursor_injector = CursorInjector(self.backend.move_to, rate_hz=cursor_rate,
+                                              bounds=(self.screen_width, self.screen_height))
+        self.cursor_injector.start()
+        
+        # Scroll velocity is integrated on its own thread (scroll_rate=0 advances per gesture)
+        self.scroll_gain = 600.0  # Units/s per unit of scroll speed - 20 units per frame at 30 FPS
+        self.scroll_engine = ScrollEngine(self.backend.scroll, rate_hz=scroll_rate)
+        self.scroll_engine.start()
         
-        # Disable pyautogui failsafe and pause
-        pyautogui.FAILSAFE = False
-        pyautogui.PAUSE = 0
+    def update_cursor(self, thumb_pos, timestamp=None, latency=None):
+        """Update cursor position based on thumb position
         
-    def update_cursor(self, thumb_pos):
-        """Update cursor position based on thumb position"""
+        timestamp is the perf_counter() capture time of the frame; the time
+        since then is the latency the cursor filter predicts across, unless
+        latency is given explicitly (e.g. when replaying a log). The injector
+        carries the target on from there along the filter's velocity.
+        """
         if thumb_pos is not None:
-            screen_x = int(thumb_pos[0] * self.screen_width)
-            screen_y = int(thumb_pos[1] * self.screen_height)
-            pyautogui.moveTo(screen_x, screen_y, duration=0.01)
+            now = time.perf_counter()
+            if timestamp is None:
+                timestamp = now
+            if latency is None:
+                latency = now - timestamp
+            filtered_x, filtered_y = self.cursor_filter.filter(
+                thumb_pos[0] * self.screen_width,
+                thumb_pos[1] * self.screen_height,
+                timestamp=timestamp,
+                latency=latency
+            )
+            screen_x = min(max(filtered_x, 0), self.screen_width - 1)
+            screen_y = min(max(filtered_y, 0), self.screen_height - 1)
+            velocity = (self.cursor_filter.x_filter.velocity, self.cursor_filter.y_filter.velocity)
+            self.cursor_injector.set_target(screen_x, screen_y, velocity)
+    
+    def reset_cursor_filter(self):
+        """Forget cursor history, e.g. when the hand leaves the frame"""
+        self.cursor_filter.reset()
+        self.cursor_injector.reset()
+    
+    def paste(self):
+        """Simulate Ctrl+V at the cursor position"""
+        self.backend.hotkey('ctrl', 'v')
+    
+    def release_scroll(self):
+        """Let an active scroll coast to a stop, e.g. when the hand leaves the frame"""
+        self.scroll_engine.release()
     
-    def handle_gesture(self, gesture):
-        """Handle detected gestures"""
+    def release_all(self):
+        """Let go of held buttons and stop scrolling, e.g. when tracking is paused"""
+        for button in list(self.buttons_down):
+            try:
+                self.backend.mouse_up(button)
+            except Exception as e:
+                print(f"Error releasing {button} button: {e}")
+        self.buttons_down.clear()
+        self.scroll_engine.halt()
+        self.reset_cursor_filter()
+    
+    def stop(self):
+        """Stop the cursor injection and scroll threads"""
+        self.cursor_injector.stop()
+        self.scroll_engine.stop()
+    
+    def update_cursor_filter(self, params):
+        """Tune cursor filter parameters at runtime"""
+        self.cursor_filter.update_params(**params)
+        print(f"Updated cursor filter: {self.cursor_filter.params()}")
+    
+    def handle_gesture(self, gesture, scroll_speed=None, timestamp=None):
+        """Handle detected gestures
+        
+        scroll_speed is the detector's numeric speed behind a scroll:<speed>
+        gesture. timestamp only matters without a scroll thread, where it
+        advances the scroll engine (e.g. recorded times during replay).
+        """
         try:
             current_time = time.time()
+            now = None
+            if self.scroll_engine.rate_hz <= 0:
+                now = timestamp if timestamp is not None else time.monotonic()
+                self.scroll_engine.advance(now)
+            
+            if not gesture.startswith("scroll"):
+                # Any other gesture ends the scroll - let it coast
+                self.scroll_engine.release()
             
             # Handle new click hold states
             if gesture == "left_click_start":
-                pyautogui.mouseDown()
+                self.backend.mouse_down()
+                self.buttons_down.add('left')
                 self.last_click_time = current_time
             elif gesture == "left_click_hold":
                 # Continue holding - no action needed
                 pass
             elif gesture == "left_click_end":
-                pyautogui.mouseUp()
+                self.backend.mouse_up()
+                self.buttons_down.discard('left')
                 self.last_click_time = current_time
                 
             elif gesture == "right_click_start":
-                pyautogui.mouseDown(button='right')
+                self.backend.mouse_down('right')
+                self.buttons_down.add('right')
                 self.last_click_time = current_time
             elif gesture == "right_click_hold":
                 # Continue holding - no action needed
                 pass
             elif gesture == "right_click_end":
-                pyautogui.mouseUp(button='right')
+                self.backend.mouse_up('right')
+                self.buttons_down.discard('right')
                 self.last_click_time = current_time
                 
             # Legacy gesture support (fallback)
             elif gesture == "left_click":
                 if current_time - self.last_click_time >= self.click_cooldown:
-                    pyautogui.click()
+                    self.backend.click()
                     self.last_click_time = current_time
             elif gesture == "right_click":
                 if current_time - self.last_click_time >= self.click_cooldown:
-                    pyautogui.rightClick()
+                    self.backend.click('right')
                     self.last_click_time = current_time
                 
-            elif gesture == "scroll_start":
-                # Just started scrolling - no action needed
-                pass
-            elif gesture == "scroll_hold":
-                # Holding scroll position - no action needed
-                pass
+            elif gesture == "scroll_start" or gesture == "scroll_hold":
+                # Pinched inside the dead zone - hold still
+                self.scroll_engine.set_velocity(0.0, now)
             elif gesture.startswith("scroll:"):
-                # Dynamic scroll based on Y movement
-                scroll_speed = float(gesture.split(":")[1])
-                scroll_units = int(-scroll_speed * 20)  # Convert to scroll units, invert direction
-                if abs(scroll_units) >= 1:
-                    pyautogui.scroll(scroll_units)
+                # Scroll velocity follows the Y displacement since the pinch started
+                if scroll_speed is None:
+                    scroll_speed = float(gesture.split(":")[1])
+                self.scroll_engine.set_velocity(-scroll_speed * self.scroll_gain, now)  # Invert direction
                 
         except:
             pass
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Speed-adaptive cursor smoothing with latency-compensating prediction
+"""
+
+import math
+import time
+
+
+class OneEuroFilter:
+    """One Euro filter for a single axis.
+
+    Smooths heavily when the signal moves slowly (jitter) and lightly when it
+    moves fast (lag), by raising the cutoff frequency with speed.
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=0.007, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff  # Hz, cutoff at rest
+        self.beta = beta  # Cutoff increase per unit/s of speed
+        self.d_cutoff = d_cutoff  # Hz, cutoff for the speed estimate
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = 0.0
+        self.last_time = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def filter(self, value, timestamp):
+        """Filter a sample taken at timestamp (seconds), returning the smoothed value"""
+        if self.value is None:
+            self.value = value
+            self.last_time = timestamp
+            return value
+        if timestamp <= self.last_time:
+            return self.value
+
+        dt = timestamp - self.last_time
+        self.last_time = timestamp
+
+        raw_velocity = (value - self.value) / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.velocity = a_d * raw_velocity + (1 - a_d) * self.velocity
+
+        cutoff = self.min_cutoff + self.beta * abs(self.velocity)
+        a = self._alpha(cutoff, dt)
+        self.value = a * value + (1 - a) * self.value
+        return self.value
+
+
+class PredictiveCursorFilter:
+    """Two-axis One Euro smoothing plus forward extrapolation.
+
+    The filtered position is pushed ahead along the smoothed velocity by the
+    measured capture-to-cursor latency, so the cursor shows where the hand
+    is now rather than where it was when the frame was captured.
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=0.007, d_cutoff=1.0,
+                 latency_compensation=1.0, extra_prediction_ms=0.0, max_prediction_ms=80.0):
+        self.x_filter = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.y_filter = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.latency_compensation = latency_compensation  # Fraction of measured latency to predict
+        self.extra_prediction_ms = extra_prediction_ms  # Added on top, e.g. display delay
+        self.max_prediction_ms = max_prediction_ms
+
+    def reset(self):
+        """Forget history, e.g. after the hand was lost"""
+        self.x_filter.reset()
+        self.y_filter.reset()
+
+    def lookahead(self, latency):
+        """Prediction horizon in seconds for a measured latency in seconds"""
+        horizon = latency * self.latency_compensation + self.extra_prediction_ms / 1000.0
+        return max(0.0, min(horizon, self.max_prediction_ms / 1000.0))
+
+    def filter(self, x, y, timestamp=None, latency=0.0):
+        """Smooth and predict a position sampled at timestamp (perf_counter seconds)"""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        filtered_x = self.x_filter.filter(x, timestamp)
+        filtered_y = self.y_filter.filter(y, timestamp)
+
+        horizon = self.lookahead(latency)
+        return (filtered_x + self.x_filter.velocity * horizon,
+                filtered_y + self.y_filter.velocity * horizon)
+
+    def update_params(self, **params):
+        """Change parameters at runtime; unknown keys are ignored"""
+        for key in ('min_cutoff', 'beta', 'd_cutoff'):
+            if key in params:
+                value = float(params[key])
+                setattr(self.x_filter, key, value)
+                setattr(self.y_filter, key, value)
+        for key in ('latency_compensation', 'extra_prediction_ms', 'max_prediction_ms'):
+            if key in params:
+                setattr(self, key, float(params[key]))
+
+    def params(self):
+        return {
+            'min_cutoff': self.x_filter.min_cutoff,
+            'beta': self.x_filter.beta,
+            'd_cutoff': self.x_filter.d_cutoff,
+            'latency_compensation': self.latency_compensation,
+            'extra_prediction_ms': self.extra_prediction_ms,
+            'max_prediction_ms': self.max_prediction_ms,
+        }
@@ -0,0 +1,154 @@
+"""
+Fixed-rate cursor injection thread that extrapolates the newest tracked target
+"""
+
+import threading
+import time
+
+from metrics import metrics
+
+
+class CursorInjector:
+    """Moves the system cursor from its own thread at a fixed rate.
+
+    The frame loop only posts the latest target with set_target() and never
+    waits for injection. Targets come with the cursor filter's velocity; on
+    every tick the injector projects the newest target forward along it by
+    the time since it was posted, capped at about one frame interval. The
+    cursor keeps moving between camera frames instead of stepping once per
+    frame, and no tick ever lags behind the newest target. Targets posted
+    between two ticks collapse into the newest one, and moves that do not
+    change the rounded pixel position are merged instead of being sent.
+    """
+
+    def __init__(self, move, rate_hz=120.0, bounds=None, max_extrapolation=0.1):
+        self.move = move  # Callable(x, y) that injects an absolute move
+        self.rate_hz = rate_hz  # 0 moves synchronously in set_target()
+        self.bounds = bounds  # (width, height) extrapolated moves are clamped to
+        self.max_extrapolation = max_extrapolation  # Seconds, upper bound of the frame-interval cap
+
+        self.is_running = False
+        self.thread = None
+        self._condition = threading.Condition()
+
+        self._target = None
+        self._velocity = (0.0, 0.0)  # Pixels per second
+        self._target_time = 0.0
+        self._target_sent = True  # Whether the newest target has been used by a tick yet
+        self._lead = 0.0  # How far the last tick projected the newest target, in seconds
+        self._frame_interval = 1.0 / 30.0  # Mean time between targets
+        self._sent = None  # Last pixel actually sent
+
+        # Statistics
+        self.moves_sent = 0
+        self.moves_merged = 0
+
+    def start(self):
+        """Start the injection thread"""
+        if self.is_running or self.rate_hz <= 0:
+            return
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the injection thread"""
+        self.is_running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+
+    def set_target(self, x, y, velocity=(0.0, 0.0)):
+        """Post a new cursor target in screen pixels - never blocks on injection
+
+        velocity is the target's speed in pixels per second, used to move
+        the cursor on between targets.
+        """
+        if not self.is_running:
+            self._send(x, y)
+            return
+
+        now = time.perf_counter()
+        with self._condition:
+            if self._target is not None:
+                if not self._target_sent:
+                    # The previous target was never sent
+                    self.moves_merged += 1
+                    metrics.increment('cursor_moves_merged')
+                interval = min(now - self._target_time, self.max_extrapolation)
+                self._frame_interval += 0.1 * (interval - self._frame_interval)
+            self._target = (x, y)
+            self._velocity = velocity
+            self._target_time = now
+            self._target_sent = False
+            self._lead = 0.0
+            self._condition.notify()
+
+    def reset(self):
+        """Drop the current target, e.g. when the hand is lost"""
+        with self._condition:
+            self._target = None
+
+    def _send(self, x, y):
+        pixel = (int(round(x)), int(round(y)))
+        if pixel == self._sent:
+            self.moves_merged += 1
+            metrics.increment('cursor_moves_merged')
+            return
+        with metrics.time('cursor_inject'):
+            self.move(*pixel)
+        self._sent = pixel
+        self.moves_sent += 1
+        metrics.increment('cursor_moves_sent')
+
+    def _next_position(self):
+        """Position for this tick, or None when stopping
+
+        Waits while there is no target, or while the newest one has been
+        extrapolated as far as it may go.
+        """
+        with self._condition:
+            while self.is_running:
+                if self._target is not None:
+                    elapsed = time.perf_counter() - self._target_time
+                    horizon = min(self._frame_interval, self.max_extrapolation)
+                    if not self._target_sent or self._lead < horizon:
+                        break
+                self._condition.wait()
+            if not self.is_running:
+                return None
+            if not self._target_sent:
+                self._target_sent = True
+                metrics.record('cursor_inject_delay', elapsed)
+            lead = self._lead = min(elapsed, horizon)
+            (x, y), (vx, vy) = self._target, self._velocity
+        x, y = x + vx * lead, y + vy * lead
+        if self.bounds is not None:
+            x = min(max(x, 0), self.bounds[0] - 1)
+            y = min(max(y, 0), self.bounds[1] - 1)
+        return x, y
+
+    def _run(self):
+        """Injection loop"""
+        period = 1.0 / self.rate_hz
+        next_tick = time.monotonic()
+        while self.is_running:
+            position = self._next_position()
+            if position is None:
+                continue
+            try:
+                self._send(*position)
+            except Exception:
+                pass
+
+            # Keep a fixed cadence; after an idle wait start a fresh schedule.
+            # A new target does not wait for the next tick.
+            now = time.monotonic()
+            next_tick = max(next_tick + period, now)
+            delay = next_tick - now
+            if delay > 0:
+                with self._condition:
+                    self._condition.wait_for(lambda: not self._target_sent or not self.is_running,
+                                             timeout=delay)
@@ -0,0 +1,195 @@
+"""
+Adaptive degradation controller that holds a per-frame latency budget
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class DegradationController:
+    """Measures per-stage frame times and steps through degradation levels.
+
+    The load is the mean processing time per captured frame, with skipped
+    frames counting as zero, so every level lowers it. Once the load exceeds
+    the budget, frames arrive faster than they are processed and lag builds
+    up. The budget is target_latency_ms, or the measured capture frame
+    interval when that is None.
+
+    Levels are cumulative - each one keeps the savings of the levels below it.
+    With enabled=False the controller only measures and stays at full quality.
+    """
+
+    LEVEL_FULL = 0
+    LEVEL_LOW_PREVIEW_RATE = 1
+    LEVEL_NO_SKELETON = 2
+    LEVEL_SKIP_FRAMES = 3
+
+    LEVEL_NAMES = {
+        LEVEL_FULL: 'full',
+        LEVEL_LOW_PREVIEW_RATE: 'low_preview_rate',
+        LEVEL_NO_SKELETON: 'no_skeleton',
+        LEVEL_SKIP_FRAMES: 'skip_frames',
+    }
+
+    def __init__(self, target_latency_ms=None, window_size=30, headroom_ratio=0.6,
+                 low_preview_interval=3, enabled=True, on_level_change=None, metrics=None):
+        self.target_latency = target_latency_ms / 1000.0 if target_latency_ms else None
+        self.window_size = window_size
+        self.headroom_ratio = headroom_ratio  # Step back up below budget * ratio
+        self.low_preview_interval = low_preview_interval
+        self.enabled = enabled
+        self.on_level_change = on_level_change
+        self.metrics = metrics  # Optional MetricsRegistry that also receives stage times
+
+        self.level = self.LEVEL_FULL
+
+        # Sliding windows of per-frame totals, per-stage durations and capture intervals
+        self.frame_times = deque(maxlen=window_size)
+        self.stage_times = {}
+        self.frame_intervals = deque(maxlen=window_size)
+
+        self._current_stages = {}
+        self._frames_since_change = 0
+        self._frame_counter = 0
+        self._last_capture = None
+
+    @property
+    def level_name(self):
+        return self.LEVEL_NAMES[self.level]
+
+    @property
+    def budget(self):
+        """Processing time available per captured frame, in seconds"""
+        if self.target_latency is not None:
+            return self.target_latency
+        if self.frame_intervals:
+            return self._percentile(self.frame_intervals, 0.5)
+        return 1.0 / 30.0
+
+    @property
+    def preview_interval(self):
+        """Send a camera preview every N processed frames"""
+        if self.level >= self.LEVEL_LOW_PREVIEW_RATE:
+            return self.low_preview_interval
+        return 1
+
+    @property
+    def skip_skeleton(self):
+        return self.level >= self.LEVEL_NO_SKELETON
+
+    def should_process_frame(self, timestamp=None):
+        """Start a captured frame; False if it should be skipped entirely
+
+        timestamp is the capture time, used to measure the frame interval.
+        """
+        if timestamp is not None:
+            if self._last_capture is not None and timestamp > self._last_capture:
+                self.frame_intervals.append(timestamp - self._last_capture)
+            self._last_capture = timestamp
+        self._frame_counter += 1
+        if self.level >= self.LEVEL_SKIP_FRAMES and self._frame_counter % 2:
+            # A skipped frame costs nothing but still counts toward the load
+            self.end_frame()
+            return False
+        return True
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage of the current frame"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, duration):
+        """Add a stage duration (seconds) to the current frame"""
+        self._current_stages[name] = self._current_stages.get(name, 0.0) + duration
+        if self.metrics:
+            self.metrics.record(name, duration)
+
+    def record_late(self, name, duration):
+        """Add a stage that ran after its frame was closed, e.g. the repaint it requested"""
+        if not self.frame_times:
+            return
+        self.frame_times[-1] += duration
+        window = self.stage_times.get(name)
+        if window is None:
+            window = self.stage_times[name] = deque(maxlen=self.window_size)
+        window.append(duration)
+        if self.metrics:
+            self.metrics.record(name, duration)
+
+    @property
+    def load(self):
+        """Mean processing time per captured frame over the window, in seconds"""
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+    def end_frame(self):
+        """Close the current frame and adjust the level if needed"""
+        stages = self._current_stages
+        self._current_stages = {}
+        for name, duration in stages.items():
+            window = self.stage_times.get(name)
+            if window is None:
+                window = self.stage_times[name] = deque(maxlen=self.window_size)
+            window.append(duration)
+        self.frame_times.append(sum(stages.values()))
+
+        self._frames_since_change += 1
+        if not self.enabled or self._frames_since_change < self.window_size:
+            return
+
+        load = self.load
+        budget = self.budget
+        # Leaving skip_frames doubles the load again
+        unskipped = load * 2 if self.level >= self.LEVEL_SKIP_FRAMES else load
+        if load > budget and self.level < self.LEVEL_SKIP_FRAMES:
+            self._set_level(self.level + 1, load)
+        elif unskipped < budget * self.headroom_ratio and self.level > self.LEVEL_FULL:
+            self._set_level(self.level - 1, load)
+
+    def set_level(self, level):
+        """Force a level, e.g. to measure it; the controller adapts from there if enabled"""
+        if level != self.level:
+            self._set_level(level, self.load)
+
+    def _set_level(self, level, load):
+        previous = self.level
+        self.level = level
+        self._frames_since_change = 0
+        status = self.status()
+        # Start measuring the new level from scratch
+        self.frame_times.clear()
+        for window in self.stage_times.values():
+            window.clear()
+
+        print(f"Degradation level {previous} -> {level} ({self.level_name}), "
+              f"load {load * 1000:.1f} ms per frame, budget {self.budget * 1000:.1f} ms")
+        if self.on_level_change:
+            self.on_level_change(status)
+
+    @staticmethod
+    def _percentile(values, fraction):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def status(self):
+        """Current level and stage averages for reporting"""
+        return {
+            'level': self.level,
+            'name': self.level_name,
+            'enabled': self.enabled,
+            'target_ms': round(self.budget * 1000, 1),
+            'frame_mean_ms': round(self.load * 1000, 2),
+            'frame_p90_ms': round(self._percentile(self.frame_times, 0.9) * 1000, 2),
+            'stages_ms': {
+                name: round(sum(window) / len(window) * 1000, 2)
+                for name, window in self.stage_times.items() if window
+            },
+        }
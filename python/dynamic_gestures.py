@@ -0,0 +1,225 @@
+"""
+Temporal gestures (swipes, flicks, double pinches) over a landmark history ring buffer
+"""
+
+import math
+
+import numpy as np
+
+PALM_LANDMARKS = [0, 5, 9, 13, 17]  # Wrist and finger bases - steadier than fingertips
+THUMB_TIP = 4
+INDEX_TIP = 8
+
+
+class LandmarkHistory:
+    """Fixed-size ring buffer of recent landmark frames and motion features.
+
+    push() is O(1): it writes one slot and derives the palm velocity and
+    acceleration from the previous frame, so recognizers never rescan the
+    buffer. Older frames stay available through frames() for inspection.
+    """
+
+    def __init__(self, capacity=64, smoothing=0.5):
+        self.capacity = capacity
+        self.smoothing = smoothing  # EMA weight of the newest velocity sample
+        self.positions = np.zeros((capacity, 21, 3), dtype=np.float32)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        """Forget all frames, e.g. when the hand leaves the frame"""
+        self.count = 0
+        self.index = -1  # Slot of the newest frame
+        self.center = None
+        self.velocity = np.zeros(2)
+        self.acceleration = np.zeros(2)
+        self.speed = 0.0
+        self.dt = 0.0
+
+    def push(self, positions, timestamp):
+        """Append a (21, 3) landmark frame taken at timestamp (seconds).
+
+        Returns False, without storing it, for a frame that is not newer than
+        the last one.
+        """
+        center = positions[PALM_LANDMARKS, :2].mean(axis=0)
+        if self.count:
+            dt = timestamp - self.timestamps[self.index]
+            if dt <= 0:
+                return False
+            velocity = (center - self.center) / dt
+            if self.count > 1:
+                velocity = self.smoothing * velocity + (1 - self.smoothing) * self.velocity
+                self.acceleration = (velocity - self.velocity) / dt
+            self.velocity = velocity
+            self.speed = math.hypot(velocity[0], velocity[1])
+            self.dt = dt
+
+        self.index = (self.index + 1) % self.capacity
+        self.positions[self.index] = positions
+        self.timestamps[self.index] = timestamp
+        self.center = center
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def latest(self):
+        """Newest (positions, timestamp), or None when empty"""
+        if not self.count:
+            return None
+        return self.positions[self.index], self.timestamps[self.index]
+
+    def frames(self):
+        """All buffered (positions, timestamps), oldest first - a copy"""
+        order = (np.arange(self.count) + self.index + 1 - self.count) % self.capacity
+        return self.positions[order], self.timestamps[order]
+
+    def features(self):
+        """Palm motion features in normalized image units per second"""
+        return {
+            'velocity': [round(float(v), 4) for v in self.velocity],
+            'speed': round(self.speed, 4),
+            'acceleration': [round(float(a), 4) for a in self.acceleration],
+        }
+
+
+class DynamicGestureRecognizer:
+    """Interface for incremental recognizers fed one frame at a time"""
+
+    name = 'dynamic'
+
+    def update(self, history):
+        """Look at the newest history frame and return an event name or None"""
+        raise NotImplementedError
+
+    def reset(self):
+        pass
+
+
+class StrokeRecognizer(DynamicGestureRecognizer):
+    """Fast straight palm movement, reported as <name>_<direction> when it ends.
+
+    A stroke starts when palm speed rises above min_speed and ends when it
+    falls back below half of that; its net displacement, duration and peak
+    speed are accumulated along the way.
+    """
+
+    def __init__(self, name='swipe', min_distance=0.25, max_distance=None, max_duration=0.6,
+                 min_speed=0.8, min_peak_speed=0.0, straightness=0.8):
+        self.name = name
+        self.min_distance = min_distance
+        self.max_distance = max_distance
+        self.max_duration = max_duration
+        self.min_speed = min_speed
+        self.min_peak_speed = min_peak_speed
+        self.straightness = straightness  # Net displacement / path length
+        self.reset()
+
+    def reset(self):
+        self.start_time = None
+        self.start_center = None
+        self.path_length = 0.0
+        self.peak_speed = 0.0
+
+    def update(self, history):
+        _, timestamp = history.latest()
+        if self.start_time is None:
+            if history.speed >= self.min_speed:
+                self.start_time = timestamp - history.dt
+                self.start_center = history.center - history.velocity * history.dt
+                self.path_length = history.speed * history.dt
+                self.peak_speed = history.speed
+            return None
+
+        if history.speed >= self.min_speed / 2:
+            self.path_length += history.speed * history.dt
+            self.peak_speed = max(self.peak_speed, history.speed)
+            if timestamp - self.start_time > self.max_duration:
+                self.reset()  # Too slow - wait for the next stroke
+            return None
+
+        # Stroke ended - decide whether it qualifies
+        dx, dy = history.center - self.start_center
+        duration = timestamp - self.start_time
+        peak_speed = self.peak_speed
+        path_length = self.path_length
+        self.reset()
+        distance = math.hypot(dx, dy)
+        if (distance < self.min_distance or duration > self.max_duration
+                or peak_speed < self.min_peak_speed
+                or (self.max_distance is not None and distance > self.max_distance)
+                or distance < self.straightness * path_length):
+            return None
+        if abs(dx) >= abs(dy):
+            direction = 'right' if dx > 0 else 'left'
+        else:
+            direction = 'down' if dy > 0 else 'up'
+        return f"{self.name}_{direction}"
+
+
+class DoublePinchRecognizer(DynamicGestureRecognizer):
+    """Two quick thumb-index pinches in a row"""
+
+    def __init__(self, name='double_pinch', close_threshold=0.05, open_threshold=0.07, max_interval=0.4):
+        self.name = name
+        self.close_threshold = close_threshold
+        self.open_threshold = open_threshold  # Hysteresis so jitter is not a second pinch
+        self.max_interval = max_interval
+        self.reset()
+
+    def reset(self):
+        self.is_pinched = False
+        self.last_pinch_time = None
+
+    def update(self, history):
+        positions, timestamp = history.latest()
+        delta = positions[THUMB_TIP] - positions[INDEX_TIP]
+        distance = math.sqrt(float(delta[0] * delta[0] + delta[1] * delta[1] + delta[2] * delta[2]))
+
+        if self.is_pinched:
+            if distance > self.open_threshold:
+                self.is_pinched = False
+            return None
+        if distance >= self.close_threshold:
+            return None
+
+        self.is_pinched = True
+        if self.last_pinch_time is not None and timestamp - self.last_pinch_time <= self.max_interval:
+            self.last_pinch_time = None
+            return self.name
+        self.last_pinch_time = timestamp
+        return None
+
+
+class DynamicGestureEngine:
+    """Feeds each frame to the history and every registered recognizer"""
+
+    def __init__(self, capacity=64, recognizers=None):
+        self.history = LandmarkHistory(capacity)
+        if recognizers is None:
+            recognizers = [
+                StrokeRecognizer('swipe', min_distance=0.25, max_duration=0.6),
+                StrokeRecognizer('flick', min_distance=0.06, max_distance=0.25, max_duration=0.2,
+                                 min_peak_speed=1.5),
+                DoublePinchRecognizer(),
+            ]
+        self.recognizers = list(recognizers)
+
+    def register(self, recognizer):
+        """Add a recognizer; it only sees frames pushed from now on"""
+        self.recognizers.append(recognizer)
+
+    def update(self, positions, timestamp):
+        """Push one frame and return the list of dynamic gesture events it completed"""
+        if not self.history.push(positions, timestamp):
+            return []
+        events = []
+        for recognizer in self.recognizers:
+            event = recognizer.update(self.history)
+            if event:
+                events.append(event)
+        return events
+
+    def reset(self):
+        self.history.reset()
+        for recognizer in self.recognizers:
+            recognizer.reset()
@@ -0,0 +1,73 @@
+"""
+Thread-safe JSON line messages to the Flutter host over stdout
+"""
+
+import json
+import sys
+import threading
+
+from metrics import metrics
+
+_write_lock = threading.Lock()
+_raw_stdout = None  # The real stdout once lock_stdout_lines() has replaced sys.stdout
+
+
+class _LineLockedStdout:
+    """Stands in for sys.stdout and writes only whole lines, under the message lock.
+
+    print() writes its text and the newline in separate calls, so another
+    thread's message could land between them. Each thread's output is held
+    until it ends a line instead.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def write(self, text):
+        pending = getattr(self._local, 'pending', '') + text
+        lines, newline, partial = pending.rpartition('\n')
+        if newline:
+            with _write_lock:
+                self._stream.write(lines + newline)
+                self._stream.flush()
+        self._local.pending = partial
+        return len(text)
+
+    def flush(self):
+        # A partial line stays held, writing it now could glue it to a message
+        with _write_lock:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def lock_stdout_lines():
+    """Route every print() through the message lock, so diagnostics from any
+    thread can never split a JSON message line. Call once at startup."""
+    global _raw_stdout
+    if _raw_stdout is None:
+        _raw_stdout = sys.stdout
+        sys.stdout = _LineLockedStdout(sys.stdout)
+
+
+def send_to_flutter(data):
+    """Write one JSON message as a single line and return the JSON text.
+
+    The line and its newline are written under a lock so messages sent from
+    worker threads never interleave with each other, or with print() output
+    once lock_stdout_lines() is in effect.
+    """
+    json_str = json.dumps(data, ensure_ascii=False)
+    line = json_str + "\n"
+    stream = _raw_stdout or sys.stdout
+    with _write_lock:
+        stream.write(line)
+        stream.flush()
+
+    message_type = data.get('type', 'unknown')
+    size = len(line) if line.isascii() else len(line.encode('utf-8'))
+    metrics.increment(f"stdout_bytes.{message_type}", size)
+    metrics.increment(f"stdout_messages.{message_type}")
+    return json_str
@@ -0,0 +1,167 @@
+"""
+Threaded camera capture with a latest-frame slot
+"""
+
+import threading
+import time
+
+from metrics import metrics
+
+
+class CapturedFrame:
+    """Camera frame stamped with its capture time"""
+
+    __slots__ = ('image', 'timestamp', 'frame_id')
+
+    def __init__(self, image, timestamp, frame_id):
+        self.image = image
+        self.timestamp = timestamp  # time.perf_counter() right after read
+        self.frame_id = frame_id
+
+
+class FrameCapture:
+    """Reads frames on a dedicated thread and keeps only the newest one.
+
+    Frames that are not consumed before the next one arrives are dropped,
+    never queued, so the consumer always works on the freshest image.
+    """
+
+    def __init__(self, source, on_frame=None, reopen_delay=0.5):
+        self.source = source  # FrameSource to read from
+        self.on_frame = on_frame  # Called from the capture thread for every new frame
+        self.reopen_delay = reopen_delay
+
+        self.is_open = False
+        self.is_running = False
+        self.thread = None
+        self._stop_event = threading.Event()
+
+        # Minimum time between reads, 0 reads as fast as the source delivers
+        self.frame_interval = 0.0
+        self._rate_changed = threading.Event()
+
+        # Latest-frame slot
+        self._condition = threading.Condition()
+        self._latest = None
+        self._frame_id = 0
+        self._consumed_id = 0
+
+        # Statistics
+        self.frames_captured = 0
+        self.frames_dropped = 0
+
+    def start(self):
+        """Start the capture thread"""
+        if self.is_running:
+            return
+        self.is_running = True
+        # A thread from the previous run may still be stuck in open() or
+        # read(); the new one waits for it to release the source first
+        self._stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(self._stop_event, self.thread), daemon=True)
+        self.thread.start()
+
+    def set_frame_interval(self, interval):
+        """Change the capture rate; takes effect immediately, even mid-wait"""
+        self.frame_interval = interval
+        self._rate_changed.set()
+
+    def stop(self, timeout=1.0):
+        """Stop the capture thread; it releases the source on its way out
+
+        Waits up to timeout for the thread to finish. The source is never
+        released from here, since the thread may still be inside open() or
+        read() when the wait runs out.
+        """
+        self.is_running = False
+        self._stop_event.set()
+        self._rate_changed.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=timeout)
+            if self.thread.is_alive():
+                print("Capture thread still busy, it releases the camera when it returns")
+
+    def _open(self):
+        """Open the source, returning True on success"""
+        try:
+            self.is_open = self.source.open()
+        except Exception as e:
+            print(f"Error opening frame source: {e}")
+            self.is_open = False
+        return self.is_open
+
+    def _release(self):
+        """Release the source if it is open"""
+        if self.is_open:
+            try:
+                self.source.release()
+                print("Camera released successfully")
+            except Exception as e:
+                print(f"Error releasing camera: {e}")
+            self.is_open = False
+
+    def _run(self, stop_event, previous=None):
+        """Capture loop - owns the source until it returns"""
+        if previous is not None:
+            previous.join()
+        try:
+            self._capture_loop(stop_event)
+        finally:
+            self._release()
+
+    def _capture_loop(self, stop_event):
+        """Read frames until stop_event is set"""
+        while not stop_event.is_set():
+            if self.frame_interval > 0:
+                # Throttled capture (e.g. idle mode) - wake early on rate change
+                self._rate_changed.wait(self.frame_interval)
+                self._rate_changed.clear()
+
+            if not self.is_open and not self._open():
+                stop_event.wait(self.reopen_delay)
+                continue
+            if stop_event.is_set():
+                break  # Stopped while the source was opening
+
+            read_start = time.perf_counter()
+            ret, image = self.source.read()
+            if not ret:
+                # Reopen the camera if read fails
+                print("Camera read failed, attempting to reinitialize...")
+                self._release()
+                stop_event.wait(self.reopen_delay)
+                continue
+
+            timestamp = time.perf_counter()
+            metrics.record('capture', timestamp - read_start)
+            with self._condition:
+                if self._frame_id > self._consumed_id:
+                    # Previous frame was never consumed - drop it
+                    self.frames_dropped += 1
+                    metrics.increment('frames_dropped')
+                self._frame_id += 1
+                self._latest = CapturedFrame(image, timestamp, self._frame_id)
+                self.frames_captured += 1
+                self._condition.notify_all()
+
+            if self.on_frame:
+                try:
+                    self.on_frame()
+                except Exception as e:
+                    print(f"Error in frame callback: {e}")
+
+    def get_latest(self, timeout=None):
+        """Take the newest unconsumed frame.
+
+        Returns None if no new frame arrives within timeout (0 or None
+        means do not wait).
+        """
+        with self._condition:
+            if timeout and self._frame_id == self._consumed_id and self.is_running:
+                self._condition.wait(timeout)
+            if self._frame_id == self._consumed_id or self._latest is None:
+                return None
+            self._consumed_id = self._frame_id
+            return self._latest
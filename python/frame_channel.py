@@ -0,0 +1,124 @@
+"""
+Shared-memory ring buffer for sending preview frames to the Flutter host
+
+Stdout keeps carrying small JSON control messages; encoded frames go
+through this channel as length-prefixed binary slots with sequence numbers.
+
+Layout (little endian):
+    header  32 bytes   magic b'SGFC', version u32, slot count u32, slot size u32,
+                       latest sequence u64, 8 reserved bytes
+    slots   slot count x (16 byte slot header + slot size payload bytes)
+            slot header: sequence u64, payload length u32, 4 reserved bytes
+
+A writer bumps the slot sequence to 0 while it fills a slot, so a reader
+that sees the same non-zero sequence before and after copying the payload
+has a consistent frame.
+"""
+
+import struct
+import uuid
+from multiprocessing import shared_memory
+
+MAGIC = b'SGFC'
+VERSION = 1
+
+HEADER = struct.Struct('<4sIIIQ8x')
+SLOT_HEADER = struct.Struct('<QI4x')
+_SEQUENCE = struct.Struct('<Q')
+_LATEST_OFFSET = 16  # Offset of the latest sequence inside the header
+
+
+class SharedFrameWriter:
+    """Producer side of the frame ring"""
+
+    def __init__(self, name=None, slot_count=4, slot_size=64 * 1024):
+        self.name = name or f"sigma_frames_{uuid.uuid4().hex[:8]}"
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.shm = shared_memory.SharedMemory(
+            name=self.name, create=True,
+            size=HEADER.size + slot_count * (SLOT_HEADER.size + slot_size)
+        )
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, slot_count, slot_size, 0)
+        self.sequence = 0
+        self.frames_dropped = 0  # Frames larger than a slot
+
+    def _slot_offset(self, sequence):
+        return HEADER.size + (sequence % self.slot_count) * (SLOT_HEADER.size + self.slot_size)
+
+    def write(self, payload):
+        """Publish one frame, returning its sequence number or None if it does not fit"""
+        length = len(payload)
+        if length > self.slot_size:
+            self.frames_dropped += 1
+            return None
+
+        sequence = self.sequence + 1
+        offset = self._slot_offset(sequence)
+        buf = self.shm.buf
+        SLOT_HEADER.pack_into(buf, offset, 0, length)  # Mark slot as being written
+        start = offset + SLOT_HEADER.size
+        buf[start:start + length] = payload
+        SLOT_HEADER.pack_into(buf, offset, sequence, length)
+        _SEQUENCE.pack_into(buf, _LATEST_OFFSET, sequence)
+        self.sequence = sequence
+        return sequence
+
+    def describe(self):
+        """Control message telling the reader where to attach"""
+        return {
+            "type": "frame_channel",
+            "transport": "shm",
+            "name": self.name,
+            "slots": self.slot_count,
+            "slot_size": self.slot_size,
+        }
+
+    def close(self):
+        """Close and remove the shared memory block"""
+        if self.shm is not None:
+            self.shm.close()
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = None
+
+
+class SharedFrameReader:
+    """Consumer side of the frame ring - a stand-in for the Flutter reader"""
+
+    def __init__(self, name):
+        self.shm = shared_memory.SharedMemory(name=name)
+        magic, version, self.slot_count, self.slot_size, _ = HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            raise ValueError(f"Not a frame channel: {name}")
+        self.last_sequence = 0
+        self.frames_missed = 0  # Frames overwritten before they were read
+
+    def read_latest(self):
+        """Return (sequence, payload) of the newest unread frame, or None"""
+        buf = self.shm.buf
+        latest = _SEQUENCE.unpack_from(buf, _LATEST_OFFSET)[0]
+        if latest <= self.last_sequence:
+            return None
+
+        offset = HEADER.size + (latest % self.slot_count) * (SLOT_HEADER.size + self.slot_size)
+        sequence, length = SLOT_HEADER.unpack_from(buf, offset)
+        if sequence != latest:
+            return None  # Being rewritten - try again on the next poll
+        start = offset + SLOT_HEADER.size
+        payload = bytes(buf[start:start + length])
+        if SLOT_HEADER.unpack_from(buf, offset)[0] != sequence:
+            return None
+
+        if self.last_sequence:
+            self.frames_missed += sequence - self.last_sequence - 1
+        self.last_sequence = sequence
+        return sequence, payload
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
@@ -0,0 +1,207 @@
+"""
+Pluggable frame sources: live camera, video file / image directory replay and synthetic frames
+"""
+
+import os
+import time
+import cv2
+import numpy as np
+
+
+class FrameSource:
+    """Interface for anything that produces BGR frames"""
+
+    def open(self):
+        """Open the source, returning True on success"""
+        raise NotImplementedError
+
+    def read(self):
+        """Read the next frame as (ret, frame) like cv2.VideoCapture.read"""
+        raise NotImplementedError
+
+    def release(self):
+        """Release the source"""
+        pass
+
+
+class CameraFrameSource(FrameSource):
+    """Live camera through OpenCV"""
+
+    def __init__(self, index=0, width=640, height=480):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.cap = None
+
+    def open(self):
+        """Open camera with error handling"""
+        try:
+            # Try DirectShow first (Windows)
+            self.cap = cv2.VideoCapture(self.index, cv2.CAP_DSHOW)
+            if not self.cap.isOpened():
+                print("DirectShow backend failed, trying default backend")
+                self.cap.release()
+                # Fallback to default backend
+                self.cap = cv2.VideoCapture(self.index)
+
+            if self.cap.isOpened():
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer size
+                print("Camera initialized successfully")
+                return True
+
+            print("Failed to initialize camera")
+            self.cap.release()
+        except Exception as e:
+            print(f"Error initializing camera: {e}")
+        self.cap = None
+        return False
+
+    def read(self):
+        if self.cap is None:
+            return False, None
+        return self.cap.read()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class _PacedFrameSource(FrameSource):
+    """Base for offline sources that can be replayed at real-time pace"""
+
+    def __init__(self, fps=30.0, realtime=False):
+        self.fps = fps
+        self.realtime = realtime
+        self._next_frame_time = None
+
+    def _pace(self):
+        """Sleep until the next frame is due when replaying in real time"""
+        if not self.realtime or not self.fps:
+            return
+        now = time.perf_counter()
+        if self._next_frame_time is None:
+            self._next_frame_time = now
+        delay = self._next_frame_time - now
+        if delay > 0:
+            time.sleep(delay)
+        self._next_frame_time = max(self._next_frame_time, now) + 1.0 / self.fps
+
+
+class VideoFileFrameSource(_PacedFrameSource):
+    """Replay a video file or a directory of images"""
+
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+    def __init__(self, path, realtime=False, loop=False, fps=None):
+        super().__init__(fps=fps, realtime=realtime)
+        self.path = path
+        self.loop = loop
+        self.cap = None
+        self.image_paths = None
+        self.position = 0
+
+    def open(self):
+        self._next_frame_time = None
+        self.position = 0
+        if os.path.isdir(self.path):
+            self.image_paths = sorted(
+                os.path.join(self.path, name) for name in os.listdir(self.path)
+                if name.lower().endswith(self.IMAGE_EXTENSIONS)
+            )
+            if not self.fps:
+                self.fps = 30.0
+            if not self.image_paths:
+                print(f"No images found in {self.path}")
+                return False
+            return True
+
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            print(f"Failed to open video file: {self.path}")
+            self.cap = None
+            return False
+        if not self.fps:
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        return True
+
+    def read(self):
+        self._pace()
+        if self.image_paths is not None:
+            if self.position >= len(self.image_paths):
+                if not self.loop:
+                    return False, None
+                self.position = 0
+            frame = cv2.imread(self.image_paths[self.position])
+            self.position += 1
+            return frame is not None, frame
+
+        if self.cap is None:
+            return False, None
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return ret, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        self.image_paths = None
+
+
+class SyntheticFrameSource(_PacedFrameSource):
+    """Generated frames with a moving blob - no camera or files needed"""
+
+    def __init__(self, width=640, height=480, fps=30.0, frame_count=None, realtime=False):
+        super().__init__(fps=fps, realtime=realtime)
+        self.width = width
+        self.height = height
+        self.frame_count = frame_count
+        self.position = 0
+        self._background = None
+
+    def open(self):
+        self._next_frame_time = None
+        self.position = 0
+        gradient = np.linspace(40, 120, self.width, dtype=np.uint8)
+        self._background = np.repeat(
+            np.tile(gradient, (self.height, 1))[:, :, np.newaxis], 3, axis=2)
+        return True
+
+    def read(self):
+        if self._background is None:
+            return False, None
+        if self.frame_count is not None and self.position >= self.frame_count:
+            return False, None
+        self._pace()
+
+        frame = self._background.copy()
+        phase = self.position / max(self.fps or 30.0, 1.0)
+        center = (int(self.width * (0.5 + 0.3 * np.sin(phase))),
+                  int(self.height * (0.5 + 0.3 * np.cos(phase * 0.7))))
+        cv2.circle(frame, center, min(self.width, self.height) // 8, (90, 160, 220), -1)
+        self.position += 1
+        return True, frame
+
+    def release(self):
+        self._background = None
+
+
+def create_frame_source(spec='camera', realtime=False, loop=False):
+    """Build a frame source from a command line spec.
+
+    'camera' or 'camera:<index>' opens a live camera, 'synthetic' or
+    'synthetic:<frames>' generates frames, anything else is treated as a
+    video file or image directory path.
+    """
+    if spec == 'camera' or spec.startswith('camera:'):
+        index = int(spec.split(':', 1)[1]) if ':' in spec else 0
+        return CameraFrameSource(index=index)
+    if spec == 'synthetic' or spec.startswith('synthetic:'):
+        frame_count = int(spec.split(':', 1)[1]) if ':' in spec else None
+        return SyntheticFrameSource(frame_count=frame_count, realtime=realtime)
+    return VideoFileFrameSource(spec, realtime=realtime, loop=loop)
@@ -3,261 +3,316 @@ Simple gesture detection using MediaPipe
 """
 
 import cv2
-import mediapipe as mp
 import numpy as np
 import sys
+import time
 from typing import Optional, Dict
 
+from dynamic_gestures import DynamicGestureEngine
+from gesture_engine import GestureEngine, GESTURE_TABLE
+from landmark_backend import create_landmark_backend
+from metrics import metrics
+
+# Table gestures each hand may produce in two-hand mode; None allows all.
+# The primary hand always drives the cursor.
+HAND_ROLES = {
+    'primary': [],
+    'secondary': None,
+}
+
 class GestureDetector:
-    def __init__(self, motion_mapping=None):
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
+    def __init__(self, motion_mapping=None, enable_tracking=True, roi_mode=False,
+                 two_hands=False, primary_hand='Right', landmark_backend='legacy',
+                 model_complexity=1, model_path=None):
+        # enable_tracking=False skips MediaPipe entirely, e.g. for landmark replay
+        self.hands = None
+        if enable_tracking:
+            # Landmark inference (see landmark_backend.py)
+            self.hands = create_landmark_backend(
+                landmark_backend,
+                max_num_hands=2 if two_hands else 1,
+                model_complexity=model_complexity,
+                model_path=model_path
+            )
         
-        # Thresholds
-        self.pinch_threshold = 0.06
-        self.scroll_threshold = 0.08  # Larger threshold for scroll
+        # Set when an asynchronous backend had no new result for the last frame
+        self.result_pending = False
         
-        # Motion mapping configuration
-        self.motion_mapping = motion_mapping or {
-            'left_click': 'M1',      # Default: 엄지+검지 핀치
-            'right_click': 'M2',     # Default: 엄지+중지 핀치  
-            'paste': 'M3',           # Default: 엄지+새끼 핀치
-        }
+        # Optional landmark recording (see landmark_log.py)
+        self.landmark_writer = None
+        
+        # ROI mode runs inference on a crop around the last detected hand
+        self.roi_mode = roi_mode
+        self.roi = None  # (x0, y0, x1, y1) in pixels
+        self.roi_padding = 0.35  # Fraction of the hand size added on each side
+        self.roi_min_size = 160  # Pixels
+        if roi_mode and self.hands is not None and self.hands.is_async:
+            print("ROI inference needs synchronous results - disabled for the async landmark backend")
+            self.roi_mode = False
         
-        # Scroll state tracking
-        self.is_scrolling = False
-        self.scroll_start_pos = None
+        # Gesture table, thresholds and hold state (see gesture_engine.py)
+        self.engine = GestureEngine(motion_mapping=motion_mapping)
         
-        # Recording state tracking
-        self.is_recording = False
+        # Landmark history and temporal gestures (see dynamic_gestures.py)
+        self.dynamic = DynamicGestureEngine()
         
-        # Click state tracking
-        self.is_left_clicking = False
-        self.is_right_clicking = False
+        # Two-hand mode: roles by handedness, separate state per role
+        self.two_hands = two_hands
+        self.primary_hand = primary_hand  # MediaPipe label on the mirrored frame: 'Left' or 'Right'
+        self.role_engines = {}
+        self.role_dynamics = {}
+        if two_hands:
+            if roi_mode:
+                print("ROI inference tracks a single hand - disabled in two-hand mode")
+                self.roi_mode = False
+            for role, names in HAND_ROLES.items():
+                if names is None:
+                    # The shared engine keeps serving motion mapping updates and overlay colors
+                    self.role_engines[role] = self.engine
+                    self.role_dynamics[role] = self.dynamic
+                elif names:
+                    table = [spec for spec in GESTURE_TABLE if spec['name'] in names]
+                    self.role_engines[role] = GestureEngine(motion_mapping=motion_mapping, table=table)
+                    self.role_dynamics[role] = DynamicGestureEngine()
         
-        # Paste state tracking
-        self.is_pasting = False
+    def process_frame(self, frame, inference_width=None, timestamp=None):
+        """Process frame and detect gestures
         
-    def process_frame(self, frame):
-        """Process frame and detect gestures"""
+        inference_width downscales the frame before inference; landmarks are
+        normalized so they stay in full-frame coordinates. timestamp is the
+        frame capture time used by the temporal gestures.
+        
+        With an asynchronous landmark backend the result can belong to an
+        earlier frame (see gesture_data['timestamp']); when none is ready yet
+        this returns no gesture data and sets result_pending.
+        """
+        self.result_pending = False
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(rgb_frame)
+            if timestamp is None:
+                timestamp = time.perf_counter()
+            if self.two_hands:
+                return frame, self._process_two_hands(frame, inference_width, timestamp)
             
-            gesture_data = None
+            frame_height, frame_width = frame.shape[:2]
+            positions = None
+            
+            # Track inside a padded box around the last hand when possible
+            if self.roi_mode and self.roi is not None:
+                x0, y0, x1, y1 = self.roi
+                result = self._run_hands(frame[y0:y1, x0:x1], inference_width, timestamp)
+                positions = result.hands[0][1] if result.hands else None  # Only process first hand
+                if positions is not None:
+                    # Map crop-normalized landmarks back to the full frame
+                    roi_width = x1 - x0
+                    roi_height = y1 - y0
+                    positions[:, 0] = (positions[:, 0] * roi_width + x0) / frame_width
+                    positions[:, 1] = (positions[:, 1] * roi_height + y0) / frame_height
+                    positions[:, 2] *= roi_width / frame_width
+                else:
+                    # Tracking lost - fall back to a full-frame search
+                    self.roi = None
             
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    gesture_data = self._extract_gesture(hand_landmarks)
-                    break  # Only process first hand
+            if positions is None:
+                result = self._run_hands(frame, inference_width, timestamp)
+                if result is None:
+                    self.result_pending = True
+                    return frame, None
+                timestamp = result.timestamp
+                positions = result.hands[0][1] if result.hands else None  # Only process first hand
+            
+            gesture_data = None
+            if positions is not None:
+                if self.roi_mode:
+                    self.roi = self._compute_roi(positions, frame_width, frame_height)
+                gesture_data = self._extract_gesture(positions, timestamp)
+            else:
+                self.dynamic.reset()
                     
             return frame, gesture_data
         except:
             return frame, None
     
-    def _extract_gesture(self, landmarks):
-        """Extract gesture data from hand landmarks"""
-        # Get landmark positions
-        positions = []
-        for lm in landmarks.landmark:
-            positions.append([lm.x, lm.y, lm.z])
+    def _run_hands(self, image, inference_width=None, timestamp=None):
+        """Submit an image to the landmark backend and return its newest result, or None"""
+        if inference_width and image.shape[1] > inference_width:
+            height = int(image.shape[0] * inference_width / image.shape[1])
+            image = cv2.resize(image, (inference_width, height), interpolation=cv2.INTER_AREA)
+        with metrics.time('color_convert'):
+            rgb_frame = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        start = time.perf_counter()
+        self.hands.submit(rgb_frame, timestamp if timestamp is not None else start)
+        duration = time.perf_counter() - start
+        # For an async backend this is only the cost of handing the frame over
+        metrics.record('hands_process', duration)
+        result = self.hands.poll()
+        if self.two_hands and result is not None and not self.hands.is_async:
+            # Compare against hands_process.1 to see what tracking a second hand costs
+            metrics.record(f"hands_process.{len(result.hands)}", duration)
+        return result
+    
+    def _detect_hands(self, result):
+        """(role, (21, 3) array) for up to two hands of a landmark result"""
+        hands = [('primary' if label == self.primary_hand else 'secondary', positions)
+                 for label, positions in result.hands]
+        if len(hands) == 2 and hands[0][0] == hands[1][0]:
+            # Both hands got the same label - treat the second as the other hand
+            other = 'secondary' if hands[0][0] == 'primary' else 'primary'
+            hands[1] = (other, hands[1][1])
+        return hands
+    
+    def _process_two_hands(self, frame, inference_width=None, timestamp=None):
+        """Two-hand mode: the primary hand moves the cursor, gestures come from the hands allowed to act
+        
+        Only hands whose role has gestures run the classifier, so the
+        per-frame cost grows with the number of acting hands, not detected ones.
+        """
+        result = self._run_hands(frame, inference_width, timestamp)
+        if result is None:
+            self.result_pending = True
+            return None
+        timestamp = result.timestamp
+        hands = dict(self._detect_hands(result))
+        for role, dynamic in self.role_dynamics.items():
+            if role not in hands:
+                dynamic.reset()
+        if not hands:
+            return None
         
-        positions = np.array(positions)
+        gesture_type = "cursor"
+        scroll_speed = 0.0
+        dynamic_gestures = []
+        motion = None
+        action_positions = None
+        for role in ('secondary', 'primary'):
+            positions = hands.get(role)
+            if positions is None:
+                continue
+            engine = self.role_engines.get(role)
+            if engine is None:
+                metrics.increment('classify_skipped')
+                continue
+            with metrics.time('classify'):
+                role_gesture = engine.classify(positions)
+            with metrics.time('dynamic'):
+                dynamic_gestures += self.role_dynamics[role].update(positions, timestamp)
+            if action_positions is None or (gesture_type == "cursor" and role_gesture != "cursor"):
+                gesture_type = role_gesture
+                scroll_speed = engine.scroll_speed
+                action_positions = positions
+                motion = self.role_dynamics[role].history.features()
+        
+        primary = hands.get('primary')
+        landmarks = action_positions if action_positions is not None else primary
+        if self.landmark_writer:
+            self.landmark_writer.write(landmarks)
+        return {
+            'landmarks': landmarks,
+            'gesture': gesture_type,
+            'dynamic_gestures': dynamic_gestures,
+            'motion': motion,
+            'scroll_speed': scroll_speed,
+            'timestamp': timestamp,
+            'thumb_pos': primary[4] if primary is not None else None,
+            'hands': hands,
+        }
+    
+    def _compute_roi(self, positions, frame_width, frame_height):
+        """Square pixel box around the landmarks, padded and kept inside the frame"""
+        xs = positions[:, 0] * frame_width
+        ys = positions[:, 1] * frame_height
+        center_x = (xs.min() + xs.max()) / 2
+        center_y = (ys.min() + ys.max()) / 2
+        size = max(xs.max() - xs.min(), ys.max() - ys.min()) * (1 + 2 * self.roi_padding)
+        # Snap the size so the inference input does not change every frame
+        size = int(np.ceil(max(size, self.roi_min_size) / 32) * 32)
+        size = min(size, frame_width, frame_height)
+        
+        # Shift rather than shrink the box at the frame edges
+        x0 = int(np.clip(center_x - size / 2, 0, frame_width - size))
+        y0 = int(np.clip(center_y - size / 2, 0, frame_height - size))
+        return x0, y0, x0 + size, y0 + size
+    
+    def _extract_gesture(self, positions, timestamp=None):
+        """Extract gesture data from hand landmark positions"""
+        if self.landmark_writer:
+            self.landmark_writer.write(positions)
         
         # Detect gesture
-        gesture_type = self._classify_gesture(positions)
+        with metrics.time('classify'):
+            gesture_type = self._classify_gesture(positions)
+        
+        # Temporal gestures update incrementally from the history
+        with metrics.time('dynamic'):
+            dynamic_gestures = self.dynamic.update(
+                positions, timestamp if timestamp is not None else time.perf_counter())
         
         return {
             'landmarks': positions,
             'gesture': gesture_type,
+            'dynamic_gestures': dynamic_gestures,
+            'motion': self.dynamic.history.features(),
+            'scroll_speed': self.engine.scroll_speed,
+            'timestamp': timestamp,
             'thumb_pos': positions[4] if len(positions) > 4 else None
         }
     
     def _classify_gesture(self, positions):
         """Classify gesture based on landmarks and motion mapping configuration"""
-        # Landmark indices
-        THUMB_TIP = 4
-        THUMB_IP = 3
-        INDEX_TIP = 8
-        INDEX_PIP = 6
-        MIDDLE_TIP = 12
-        MIDDLE_PIP = 10
-        RING_TIP = 16
-        RING_PIP = 14
-        PINKY_TIP = 20
-        PINKY_PIP = 18
-        
-        # Get key positions
-        thumb_tip = positions[THUMB_TIP]
-        index_tip = positions[INDEX_TIP]
-        middle_tip = positions[MIDDLE_TIP]
-        ring_tip = positions[RING_TIP]
-        pinky_tip = positions[PINKY_TIP]
-        
-        # Calculate distances for all possible pinch gestures
-        thumb_index_distance = np.sqrt(np.sum((thumb_tip - index_tip) ** 2))
-        thumb_middle_distance = np.sqrt(np.sum((thumb_tip - middle_tip) ** 2))
-        thumb_ring_distance = np.sqrt(np.sum((thumb_tip - ring_tip) ** 2))
-        thumb_pinky_distance = np.sqrt(np.sum((thumb_tip - pinky_tip) ** 2))
-        
-        # Map motion codes to gesture distances and types
-        gesture_distances = {
-            'M1': ('thumb_index', thumb_index_distance),
-            'M2': ('thumb_middle', thumb_middle_distance), 
-            'M3': ('thumb_pinky', thumb_pinky_distance),
-        }
-        
-        # Determine which gestures are active based on motion mapping
-        left_click_motion = self.motion_mapping.get('left_click', 'M1')
-        right_click_motion = self.motion_mapping.get('right_click', 'M2')
-        paste_motion = self.motion_mapping.get('paste', 'M3')
-        
-        # Get distances for configured gestures
-        left_click_gesture, left_click_distance = gesture_distances.get(left_click_motion, ('thumb_index', thumb_index_distance))
-        right_click_gesture, right_click_distance = gesture_distances.get(right_click_motion, ('thumb_middle', thumb_middle_distance))
-        paste_gesture, paste_distance = gesture_distances.get(paste_motion, ('thumb_pinky', thumb_pinky_distance))
-        
-        # Check active gestures
-        is_left_click_gesture = left_click_distance < self.pinch_threshold
-        is_right_click_gesture = right_click_distance < self.pinch_threshold
-        is_paste_gesture = paste_distance < self.pinch_threshold
-        
-        # Fixed recording gesture (always thumb-ring for now)
-        is_recording_gesture = thumb_ring_distance < self.pinch_threshold
-        
-        
-        # Handle recording state but continue processing other gestures
-        recording_gesture = None
-        if is_recording_gesture:
-            # Reset scroll state when making thumb-ring pinch
-            if self.is_scrolling:
-                self.is_scrolling = False
-                self.scroll_start_pos = None
-            
-            if not self.is_recording:
-                # First time making thumb-ring pinch - start recording
-                self.is_recording = True
-                recording_gesture = "recording_start"
-            else:
-                # Continue holding thumb-ring pinch - keep recording
-                recording_gesture = "recording_hold"
-        else:
-            # Not making thumb-ring pinch
-            if self.is_recording:
-                # Just stopped thumb-ring pinch - stop recording
-                self.is_recording = False
-                recording_gesture = "recording_stop"
-        
-        # Handle paste gesture
-        paste_gesture_result = None
-        if is_paste_gesture:
-            # Reset scroll state when making paste pinch
-            if self.is_scrolling:
-                self.is_scrolling = False
-                self.scroll_start_pos = None
-            
-            if not self.is_pasting:
-                # First time making paste pinch - trigger paste
-                self.is_pasting = True
-                paste_gesture_result = "paste_start"
-            else:
-                # Continue holding paste pinch
-                paste_gesture_result = "paste_hold"
-        else:
-            # Not making paste pinch
-            if self.is_pasting:
-                # Just stopped paste pinch
-                self.is_pasting = False
-                paste_gesture_result = "paste_end"
-        
-        # Check for 3-finger scroll (when thumb, index, and middle are close together)
-        if (thumb_index_distance < self.scroll_threshold and 
-            thumb_middle_distance < self.scroll_threshold):
-            return self._handle_scroll(positions)
-        
-        # Reset scroll state if not in triple pinch
-        if self.is_scrolling:
-            self.is_scrolling = False
-            self.scroll_start_pos = None
-        
-        # Return paste gesture first if active (highest priority)
-        if paste_gesture_result:
-            return paste_gesture_result
-            
-        # Return recording gesture if active (second priority)
-        if recording_gesture:
-            return recording_gesture
-        
-        # Check for left click gesture with hold state
-        if is_left_click_gesture:
-            if not self.is_left_clicking:
-                self.is_left_clicking = True
-                return "left_click_start"
-            else:
-                return "left_click_hold"
-        else:
-            if self.is_left_clicking:
-                self.is_left_clicking = False
-                return "left_click_end"
-        
-        # Check for right click gesture with hold state
-        if is_right_click_gesture:
-            if not self.is_right_clicking:
-                self.is_right_clicking = True
-                return "right_click_start"
-            else:
-                return "right_click_hold"
-        else:
-            if self.is_right_clicking:
-                self.is_right_clicking = False
-                return "right_click_end"
-        
-        # Default cursor control
-        return "cursor"
+        return self.engine.classify(positions)
     
-    def _handle_scroll(self, positions):
-        """Handle 3-finger scroll gesture based on Y-axis movement"""
-        THUMB_TIP = 4
-        INDEX_TIP = 8
-        MIDDLE_TIP = 12
+    def classify_batch(self, positions):
+        """Classify a whole (N, 21, 3) landmark sequence at once
         
-        # Get current triple pinch center position (average of 3 fingertips)
-        thumb_pos = positions[THUMB_TIP]
-        index_pos = positions[INDEX_TIP]
-        middle_pos = positions[MIDDLE_TIP]
-        current_pinch_pos = (thumb_pos + index_pos + middle_pos) / 3
-        
-        if not self.is_scrolling:
-            # First time detecting triple pinch - initialize scroll tracking
-            self.scroll_start_pos = current_pinch_pos
-            self.is_scrolling = True
-            return "scroll_start"
-        else:
-            # Calculate Y-axis movement from initial pinch position
-            y_displacement = current_pinch_pos[1] - self.scroll_start_pos[1]
-            
-            # Calculate scroll speed based on Y displacement
-            # Negative y_displacement = moved up = scroll up
-            # Positive y_displacement = moved down = scroll down
-            scroll_speed = y_displacement * 30
-            
-            # Apply minimum threshold to avoid micro-scrolls
-            if abs(scroll_speed) > 0.4:
-                return f"scroll:{scroll_speed}"
-            else:
-                return "scroll_hold"
+        Produces exactly the gesture stream that N calls to _classify_gesture
+        would, starting from and updating the detector's current state.
+        """
+        return self.engine.classify_batch(positions)
+    
+    def reset(self):
+        """Forget gesture state, history and the tracked ROI, e.g. when tracking is paused"""
+        self.roi = None
+        self.engine.reset()
+        self.dynamic.reset()
+        for engine in self.role_engines.values():
+            engine.reset()
+        for dynamic in self.role_dynamics.values():
+            dynamic.reset()
+    
+    @property
+    def motion_mapping(self):
+        return self.engine.motion_mapping
     
     def update_motion_mapping(self, motion_mapping: Dict[str, str]):
         """Update motion mapping configuration"""
-        self.motion_mapping = motion_mapping
+        self.engine.set_motion_mapping(motion_mapping)
+        for engine in self.role_engines.values():
+            if engine is not self.engine:
+                engine.set_motion_mapping(motion_mapping)
         print(f"Updated motion mapping: {motion_mapping}")
     
+    def start_landmark_recording(self, path):
+        """Record every extracted landmark block to a binary log"""
+        from landmark_log import LandmarkLogWriter
+        self.stop_landmark_recording()
+        self.landmark_writer = LandmarkLogWriter(path)
+        print(f"Recording landmarks to {path}")
+    
+    def stop_landmark_recording(self):
+        """Stop landmark recording and close the log"""
+        if self.landmark_writer:
+            self.landmark_writer.close()
+            print(f"Recorded {self.landmark_writer.records_written} landmark frames")
+            self.landmark_writer = None
+    
+    def warm_up(self, width=640, height=480):
+        """Run one blank frame through a synchronous landmark model so the first real frame is not slow"""
+        if self.hands is None or self.hands.is_async:
+            return
+        self.hands.submit(np.zeros((height, width, 3), dtype=np.uint8), 0.0)
+        self.hands.poll()
+    
     def cleanup(self):
         """Clean up resources"""
+        self.stop_landmark_recording()
         if self.hands:
             self.hands.close()
\ No newline at end of file
@@ -0,0 +1,287 @@
+"""
+Table-driven gesture classification over a fingertip distance matrix
+"""
+
+import numpy as np
+
+# Landmark index of each fingertip, in distance matrix order
+FINGERTIPS = {'thumb': 4, 'index': 8, 'middle': 12, 'ring': 16, 'pinky': 20}
+_TIP_ROW = {name: row for row, name in enumerate(FINGERTIPS)}
+_TIP_LANDMARKS = list(FINGERTIPS.values())
+
+# Motion codes selectable in the app settings: fingertip pairs that must touch
+MOTION_CODES = {
+    'M1': [('thumb', 'index')],      # 엄지+검지 핀치
+    'M2': [('thumb', 'middle')],     # 엄지+중지 핀치
+    'M3': [('thumb', 'pinky')],      # 엄지+새끼 핀치
+    'M4': [('index', 'middle')],
+    'M5': [('index', 'ring')],
+    'M6': [('index', 'pinky')],
+    'M7': [('middle', 'ring')],
+    'M8': [('middle', 'pinky')],
+    'M9': [('ring', 'pinky')],
+}
+
+# Distance thresholds in normalized image units
+THRESHOLDS = {
+    'pinch': 0.06,
+    'scroll': 0.08,  # Larger threshold for scroll
+}
+
+# Gestures in priority order - the first one with a result wins the frame.
+# A gesture is active while every fingertip pair is closer than its threshold;
+# pairs come either from 'pairs' or from the motion code mapped to the
+# gesture name (falling back to 'motion'). 'hold' selects the state rules:
+#   latched   - state follows the pinch on every frame, even when a higher
+#               priority gesture wins the frame; 'cancels' resets other gestures
+#   exclusive - state only changes on frames no higher priority gesture won
+#   scroll    - reports the vertical movement of the 'anchor' fingertips
+#               since the pinch started
+GESTURE_TABLE = [
+    {'name': 'scroll', 'pairs': [('thumb', 'index'), ('thumb', 'middle')], 'threshold': 'scroll',
+     'hold': 'scroll', 'anchor': ['thumb', 'index', 'middle'], 'scale': 30, 'min_speed': 0.4,
+     'events': ('scroll_start', 'scroll_hold'), 'color': (255, 0, 255, 255)},
+    {'name': 'paste', 'motion': 'M3', 'threshold': 'pinch', 'hold': 'latched', 'cancels': ['scroll'],
+     'events': ('paste_start', 'paste_hold', 'paste_end'), 'color': (0, 255, 255, 255)},
+    {'name': 'recording', 'pairs': [('thumb', 'ring')], 'threshold': 'pinch', 'hold': 'latched',
+     'cancels': ['scroll'],
+     'events': ('recording_start', 'recording_hold', 'recording_stop'), 'color': (255, 255, 0, 255)},
+    {'name': 'left_click', 'motion': 'M1', 'threshold': 'pinch', 'hold': 'exclusive',
+     'events': ('left_click_start', 'left_click_hold', 'left_click_end'), 'color': (0, 255, 0, 255)},
+    {'name': 'right_click', 'motion': 'M2', 'threshold': 'pinch', 'hold': 'exclusive',
+     'events': ('right_click_start', 'right_click_hold', 'right_click_end'), 'color': (255, 100, 0, 255)},
+]
+
+
+def fingertip_distances(positions):
+    """Pairwise fingertip distances: (5, 5) for one hand, (N, 5, 5) for a sequence"""
+    tips = positions[..., _TIP_LANDMARKS, :]
+    deltas = tips[..., :, None, :] - tips[..., None, :, :]
+    return np.sqrt(np.sum(deltas ** 2, axis=-1))
+
+
+def _previous(values, initial):
+    """Value of the previous frame, initial for the first"""
+    return np.concatenate(([initial], values[:-1]))
+
+
+def _last_index(mask):
+    """Index of the latest True at or before each frame, -1 if none"""
+    return np.maximum.accumulate(np.where(mask, np.arange(len(mask)), -1))
+
+
+def _carried_state(values, updates, initial):
+    """State before each frame for a flag set to values[i] only on update frames"""
+    last = _last_index(updates)
+    after = np.where(last >= 0, values[np.maximum(last, 0)], initial)
+    return _previous(after, initial), bool(after[-1])
+
+
+class GestureEngine:
+    """Evaluates a gesture table and keeps the hold state between frames"""
+
+    def __init__(self, motion_mapping=None, table=None, thresholds=None):
+        self.table = table or GESTURE_TABLE
+        self.thresholds = dict(THRESHOLDS, **(thresholds or {}))
+        self.motion_mapping = motion_mapping or {
+            spec['name']: spec['motion'] for spec in self.table if 'motion' in spec
+        }
+        self.states = {spec['name']: False for spec in self.table}
+        self.anchors = {}  # Scroll start position per scroll gesture
+        self.scroll_speed = 0.0  # Speed behind the last scroll:<speed> event, 0 otherwise
+        self.compile()
+
+    def compile(self):
+        """Resolve motion codes and thresholds into flat index arrays"""
+        self.pairs = {}
+        rows, cols, limits, starts = [], [], [], []
+        for spec in self.table:
+            pairs = spec.get('pairs')
+            if pairs is None:
+                code = self.motion_mapping.get(spec['name'], spec['motion'])
+                pairs = MOTION_CODES.get(code, MOTION_CODES[spec['motion']])
+            self.pairs[spec['name']] = pairs
+            starts.append(len(rows))
+            for first, second in pairs:
+                rows.append(_TIP_ROW[first])
+                cols.append(_TIP_ROW[second])
+                limits.append(self.thresholds[spec['threshold']])
+        self._rows = np.array(rows)
+        self._cols = np.array(cols)
+        self._limits = np.array(limits)
+        self._starts = np.array(starts)
+
+        index = {spec['name']: i for i, spec in enumerate(self.table)}
+        self._latched = [i for i, spec in enumerate(self.table) if spec['hold'] == 'latched']
+        self._cancels = {i: [index[name] for name in self.table[i].get('cancels', [])] for i in self._latched}
+
+    def reset(self):
+        """Drop all hold state, e.g. when tracking is paused mid-gesture"""
+        self.states = {spec['name']: False for spec in self.table}
+        self.anchors = {}
+        self.scroll_speed = 0.0
+
+    def set_motion_mapping(self, motion_mapping):
+        self.motion_mapping = motion_mapping
+        self.compile()
+
+    def active(self, distances):
+        """Which table gestures are pinched, from fingertip_distances() output"""
+        below = distances[..., self._rows, self._cols] < self._limits
+        return np.logical_and.reduceat(below, self._starts, axis=-1)
+
+    def classify(self, positions):
+        """Classify one (21, 3) landmark array, updating hold state"""
+        active = self.active(fingertip_distances(positions))
+        table = self.table
+        self.scroll_speed = 0.0
+
+        # Latched gestures track their pinch before anything else is decided
+        latched_events = {}
+        for i in self._latched:
+            spec = table[i]
+            name = spec['name']
+            event = None
+            if active[i]:
+                for j in self._cancels[i]:
+                    self._reset(table[j]['name'])
+                event = spec['events'][1] if self.states[name] else spec['events'][0]
+            elif self.states[name]:
+                event = spec['events'][2]
+            self.states[name] = bool(active[i])
+            latched_events[i] = event
+
+        for i, spec in enumerate(table):
+            name = spec['name']
+            hold = spec['hold']
+            if hold == 'latched':
+                if latched_events[i]:
+                    return latched_events[i]
+            elif hold == 'scroll':
+                if active[i]:
+                    return self._scroll_event(spec, positions)
+                self._reset(name)
+            elif active[i]:
+                was_active = self.states[name]
+                self.states[name] = True
+                return spec['events'][1] if was_active else spec['events'][0]
+            elif self.states[name]:
+                self.states[name] = False
+                return spec['events'][2]
+
+        # Default cursor control
+        return "cursor"
+
+    def _reset(self, name):
+        self.states[name] = False
+        self.anchors.pop(name, None)
+
+    def _anchor_center(self, spec, positions):
+        anchor = [FINGERTIPS[tip] for tip in spec['anchor']]
+        return positions[..., anchor, :].sum(axis=-2) / len(anchor)
+
+    def _scroll_event(self, spec, positions):
+        """Start, hold or scroll:<speed> for an active scroll gesture"""
+        name = spec['name']
+        center = self._anchor_center(spec, positions)
+        if not self.states[name]:
+            self.anchors[name] = center
+            self.states[name] = True
+            return spec['events'][0]
+
+        # Negative displacement = moved up = scroll up
+        scroll_speed = (center[1] - self.anchors[name][1]) * spec['scale']
+        if abs(scroll_speed) > spec['min_speed']:
+            self.scroll_speed = scroll_speed
+            return f"{name}:{scroll_speed}"
+        return spec['events'][1]
+
+    def classify_batch(self, positions):
+        """Classify a whole (N, 21, 3) landmark sequence at once
+
+        Produces exactly the gesture stream that N calls to classify() would,
+        starting from and updating the current state, but evaluates the table
+        and the hold/start/end transitions with array ops.
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        count = len(positions)
+        if count == 0:
+            return []
+        table = self.table
+        active = self.active(fingertip_distances(positions))
+        gestures = np.full(count, 'cursor', dtype=object)
+        decided = np.zeros(count, dtype=bool)  # A higher priority gesture won the frame
+        new_states = {}
+
+        # Latched states update every frame; collect which frames they cancel
+        latched_was = {}
+        cancelled = {i: np.zeros(count, dtype=bool) for i in range(len(table))}
+        for i in self._latched:
+            latched_was[i] = _previous(active[:, i], self.states[table[i]['name']])
+            for j in self._cancels[i]:
+                cancelled[j] |= active[:, i]
+
+        for i, spec in enumerate(table):
+            name = spec['name']
+            hold = spec['hold']
+            is_active = active[:, i]
+            reached = ~decided
+            if hold == 'latched':
+                was = latched_was[i]
+                events = spec['events']
+                gestures[reached & is_active & ~was] = events[0]
+                gestures[reached & is_active & was] = events[1]
+                gestures[reached & ~is_active & was] = events[2]
+                decided |= is_active | was
+                new_states[name] = bool(is_active[-1])
+            elif hold == 'scroll':
+                self._batch_scroll(spec, positions, is_active, reached, cancelled[i], gestures)
+                decided |= is_active
+            else:
+                was, new_states[name] = _carried_state(is_active, reached, self.states[name])
+                events = spec['events']
+                gestures[reached & is_active & ~was] = events[0]
+                gestures[reached & is_active & was] = events[1]
+                gestures[reached & ~is_active & was] = events[2]
+                decided |= reached & (is_active | was)
+
+        # Leave the engine in the same state as frame-by-frame processing
+        self.states.update(new_states)
+        return gestures.tolist()
+
+    def _batch_scroll(self, spec, positions, is_active, reached, cancelled, gestures):
+        """Scroll part of classify_batch; updates scroll state and anchor"""
+        name = spec['name']
+        # Cancelled before evaluation, then set to the pinch state when reached
+        was, final_state = _carried_state(reached & is_active, reached | cancelled, self.states[name])
+        was &= ~cancelled
+        continues = reached & is_active & was
+        starts = reached & is_active & ~was
+
+        centers = self._anchor_center(spec, positions)
+        start_index = _last_index(starts)
+        anchor = self.anchors.get(name)
+        if anchor is not None:
+            start_y = np.where(start_index >= 0, centers[np.maximum(start_index, 0), 1], anchor[1])
+        else:
+            start_y = centers[np.maximum(start_index, 0), 1]
+        scroll_speed = (centers[:, 1] - start_y) * spec['scale']
+
+        gestures[starts] = spec['events'][0]
+        gestures[continues] = spec['events'][1]
+        for frame in np.flatnonzero(continues & (np.abs(scroll_speed) > spec['min_speed'])):
+            gestures[frame] = f"{name}:{scroll_speed[frame]}"
+
+        self.states[name] = final_state
+        if not final_state:
+            self.anchors.pop(name, None)
+        elif start_index[-1] >= 0:
+            self.anchors[name] = centers[start_index[-1]].copy()
+
+    def gesture_fingertips(self, gesture):
+        """Landmark indices and RGBA color of the table gesture behind an event"""
+        for spec in self.table:
+            if gesture.startswith(spec['name']):
+                tips = {FINGERTIPS[tip] for pair in self.pairs[spec['name']] for tip in pair}
+                return tips, spec.get('color')
+        return set(), None
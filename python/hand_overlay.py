@@ -5,21 +5,54 @@ PyQt overlay to display hand landmarks
 import sys
 import cv2
 import json
-import base64
 from PyQt6.QtWidgets import QWidget, QApplication
-from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtCore import QTimer, Qt, pyqtSignal
 from PyQt6.QtGui import QPainter, QPen, QColor
-import pyautogui
 import pyperclip
 import time
 
 from gesture_detector import GestureDetector
 from cursor_controller import CursorController
+from input_backend import create_input_backend
 from audio_recorder import AudioRecorder, WebSocketClient
+from voice_activity import VoiceActivityDetector
 from command_executor import CommandExecutor, LocalAgent
+from settings_client import SettingsClient
+from frame_capture import FrameCapture
+from frame_source import CameraFrameSource
+from degradation_controller import DegradationController
+from idle_monitor import IdleMonitor
+from preview_encoder import PreviewEncoder
+from frame_channel import SharedFrameWriter
+from flutter_channel import send_to_flutter
+from metrics import metrics
+from startup import startup, run_in_background
+
+def load_gesture_detector(**kwargs):
+    """Build and warm up the gesture detector - runs on a startup thread"""
+    detector = GestureDetector(**kwargs)
+    detector.warm_up()
+    return detector
 
 class HandOverlay(QWidget):
-    def __init__(self, show_skeleton=False, motion_mapping=None):
+    # Emitted from the capture thread, delivered on the GUI thread
+    frame_ready = pyqtSignal()
+    # Emitted from startup threads when the model or the settings are loaded
+    detector_ready = pyqtSignal(object)
+    motion_mapping_loaded = pyqtSignal(object)
+    # Emitted from the stdin thread: pause/resume and metrics requests and stdin closing
+    pause_requested = pyqtSignal(bool)
+    metrics_requested = pyqtSignal()
+    shutdown_requested = pyqtSignal()
+    
+    def __init__(self, show_skeleton=False, motion_mapping=None, target_latency_ms=None,
+                 adaptive_degradation=True, frame_source=None, record_landmarks=None, roi_inference=False,
+                 idle_timeout=5.0, preview_fps=15.0, preview_bytes_per_second=150_000,
+                 frame_transport='json', metrics_interval=10.0, cursor_rate=120.0,
+                 input_backend='auto', two_hands=False, primary_hand='Right', scroll_rate=60.0,
+                 landmark_backend='legacy', model_complexity=1, hand_model=None, audio_chunk_ms=160.0,
+                 websocket_url=None, binary_audio=False, mic_always_open=False, preroll_ms=500.0,
+                 vad=False, vad_hangover_ms=300.0, audio_format='pcm_s16le', audio_samplerate=16000):
         super().__init__()
         print(f"HandOverlay initializing with skeleton display: {show_skeleton}")
         print(f"HandOverlay initializing with motion mapping: {motion_mapping}")
@@ -27,12 +60,28 @@ class HandOverlay(QWidget):
         self.gesture = None
         self.show_skeleton = show_skeleton
         
+        # The MediaPipe graph loads in the background; frames are only
+        # previewed and commands are accepted until it is ready
+        self.gesture_detector = None
+        self.motion_mapping = motion_mapping
+        self.record_landmarks = record_landmarks
+        self.detector_ready.connect(self._on_detector_ready)
+        self.motion_mapping_loaded.connect(self.update_motion_mapping)
+        detector_future = run_in_background('model', load_gesture_detector,
+                                            motion_mapping=motion_mapping, roi_mode=roi_inference,
+                                            two_hands=two_hands, primary_hand=primary_hand,
+                                            landmark_backend=landmark_backend,
+                                            model_complexity=model_complexity,
+                                            model_path=hand_model)
+        detector_future.add_done_callback(self._on_detector_loaded)
+        
         # Setup window
         self.setup_window()
         
-        # Initialize components with motion mapping
-        self.gesture_detector = GestureDetector(motion_mapping=motion_mapping)
-        self.cursor_controller = CursorController()
+        # Initialize components
+        self.cursor_controller = CursorController(cursor_rate=cursor_rate,
+                                                 backend=create_input_backend(input_backend),
+                                                 scroll_rate=scroll_rate)
         
         # Initialize command executor and local agent
         self.command_executor = CommandExecutor()
@@ -43,10 +92,19 @@ class HandOverlay(QWidget):
         self.websocket_client = WebSocketClient(
             transcript_callback=self.update_transcript,
             command_callback=self.handle_command_response,
-            local_agent=self.local_agent
+            local_agent=self.local_agent,
+            url=websocket_url,
+            binary_audio=binary_audio
         )
         print("Initializing audio recorder...")
-        self.audio_recorder = AudioRecorder(self.websocket_client)
+        voice_activity = VoiceActivityDetector(hangover_ms=vad_hangover_ms) if vad else None
+        self.audio_recorder = AudioRecorder(self.websocket_client, chunk_ms=audio_chunk_ms,
+                                            always_open=mic_always_open, preroll_ms=preroll_ms,
+                                            voice_activity=voice_activity, audio_format=audio_format,
+                                            send_samplerate=audio_samplerate)
+        if mic_always_open:
+            # Opening the device is slow - do it off the startup path
+            run_in_background('microphone', self.audio_recorder.open_stream)
         
         # Store current transcript for pasting
         self.current_transcript = ""
@@ -56,53 +114,100 @@ class HandOverlay(QWidget):
         self.last_gesture_type = None
         self.gesture_send_counter = 0
         
-        # Tracking state
+        # Tracking state - is_tracking stays True while paused, the process is still serving commands
         self.is_tracking = False
-        
-        # Camera with better settings and error handling
-        self.cap = None
+        self.is_paused = False
+        self.pause_requested.connect(self.set_paused)
+        self.metrics_requested.connect(self.send_metrics)
+        self.shutdown_requested.connect(self.shutdown)
+        
+        # Per-stage frame timing; adaptive degradation only when enabled
+        self.degradation_controller = DegradationController(
+            target_latency_ms=target_latency_ms,
+            enabled=adaptive_degradation,
+            on_level_change=self.on_degradation_level_change,
+            metrics=metrics
+        )
+        self.preview_counter = 0
+        
+        # Camera preview is encoded and sent on its own thread, either as JSON
+        # lines on stdout or through a shared-memory ring
+        self.frame_writer = None
+        if frame_transport == 'shm':
+            self.frame_writer = SharedFrameWriter()
+            send_to_flutter(self.frame_writer.describe())
+            print(f"Camera frames sent through shared memory: {self.frame_writer.name}")
+        self.preview_encoder = PreviewEncoder(preview_fps=preview_fps,
+                                              target_bytes_per_second=preview_bytes_per_second,
+                                              frame_writer=self.frame_writer)
+        self.preview_encoder.start()
+        
+        # Idle mode with motion-gated inference when no hand is present
+        self.idle_monitor = IdleMonitor(idle_timeout=idle_timeout,
+                                        on_state_change=self.on_idle_state_change)
+        
+        # Periodic metrics reports to Flutter, 0 disables
+        self.metrics_interval = metrics_interval
+        
+        # Camera capture runs on its own thread and signals new frames
+        self.frame_source = frame_source or CameraFrameSource()
+        self.frame_capture = None
+        self._frame_signal_pending = False
+        self.frame_ready.connect(self.process_frame)
         self._init_camera()
         
+    def _on_detector_loaded(self, future):
+        """Called on the startup thread when the gesture detector is built"""
+        if future.exception() is not None:
+            print(f"Hand tracking model failed to load: {future.exception()}")
+            return
+        self.detector_ready.emit(future.result())
+        
+    def _on_detector_ready(self, detector):
+        """Start using the gesture detector - runs on the GUI thread"""
+        if not self.is_tracking:
+            detector.cleanup()
+            return
+        if self.motion_mapping:
+            # Settings may have arrived while the model was loading
+            detector.update_motion_mapping(self.motion_mapping)
+        if self.record_landmarks:
+            detector.start_landmark_recording(self.record_landmarks)
+        self.gesture_detector = detector
+        
     def _init_camera(self):
-        """Initialize camera with error handling"""
-        try:
-            # Try DirectShow first (Windows)
-            self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-            if not self.cap.isOpened():
-                print("DirectShow backend failed, trying default backend")
-                self.cap.release()
-                # Fallback to default backend
-                self.cap = cv2.VideoCapture(0)
-            
-            if self.cap.isOpened():
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer size
-                print("Camera initialized successfully")
-            else:
-                print("Failed to initialize camera")
-        except Exception as e:
-            print(f"Error initializing camera: {e}")
-            self.cap = None
+        """Initialize threaded camera capture"""
+        self.frame_capture = FrameCapture(self.frame_source, on_frame=self._on_frame_captured)
+        self.frame_capture.start()
         
         # Start tracking
         self.is_tracking = True
         
-        # Timer for processing
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.process_frame)
-        self.timer.start(33)  # ~30 FPS
-        
         # Timer for stdin processing - use thread instead of timer for Windows
         import threading
         self.stdin_thread = threading.Thread(target=self.stdin_monitor, daemon=True)
         self.stdin_thread.start()
+        startup.mark('commands_ready')
         
         # Timer for WebSocket status check
         self.websocket_timer = QTimer()
         self.websocket_timer.timeout.connect(self.check_websocket_status)
         self.websocket_timer.start(5000)  # Check every 5 seconds
         
+        # Timer for periodic metrics reports
+        self.metrics_timer = QTimer()
+        self.metrics_timer.timeout.connect(self.send_metrics)
+        if self.metrics_interval > 0:
+            self.metrics_timer.start(int(self.metrics_interval * 1000))
+        
+    def _on_frame_captured(self):
+        """Called from the capture thread when a new frame is available"""
+        # Keep at most one notification queued on the GUI thread; the slot
+        # always holds the newest frame so older ones are simply dropped
+        if not self._frame_signal_pending:
+            self._frame_signal_pending = True
+            self.frame_ready.emit()
+        
     def setup_window(self):
         """Setup transparent overlay window"""
         screen = QApplication.primaryScreen().geometry()
@@ -121,26 +226,57 @@ class HandOverlay(QWidget):
         
     def process_frame(self):
         """Process camera frame"""
-        if not self.is_tracking or not self.cap:
+        self._frame_signal_pending = False
+        if not self.is_tracking or self.is_paused or not self.frame_capture:
             return
             
-        ret, frame = self.cap.read()
-        if not ret:
-            # Try to reinitialize camera if read fails
-            print("Camera read failed, attempting to reinitialize...")
-            if self.cap:
-                self.cap.release()
-            self._init_camera()
+        captured = self.frame_capture.get_latest()
+        if captured is None:
+            return
+        startup.mark('first_frame_captured')
+        
+        degradation = self.degradation_controller
+        if not degradation.should_process_frame(captured.timestamp):
             return
             
         # Flip frame for mirror effect
-        frame = cv2.flip(frame, 1)
+        with degradation.stage('flip'):
+            frame = cv2.flip(captured.image, 1)
         
         # Send frame to Flutter
-        self.send_frame_to_flutter(frame)
+        self.preview_counter += 1
+        if self.preview_counter >= degradation.preview_interval:
+            self.preview_counter = 0
+            with degradation.stage('preview'):
+                self.send_frame_to_flutter(frame)
+        
+        if self.gesture_detector is None:
+            # Model still loading - preview only
+            degradation.end_frame()
+            return
+        
+        # While idle, only run inference when the cheap motion test fires
+        if not self.idle_monitor.should_run_inference(frame):
+            if self.landmarks is not None:
+                self.landmarks = None
+                self.gesture = None
+                self.update()
+            degradation.end_frame()
+            return
         
         # Detect gestures
-        processed_frame, gesture_data = self.gesture_detector.process_frame(frame)
+        with degradation.stage('inference'):
+            processed_frame, gesture_data = self.gesture_detector.process_frame(
+                frame, timestamp=captured.timestamp)
+        
+        if self.gesture_detector.result_pending:
+            # Async landmark backend is still working - keep the current state
+            degradation.end_frame()
+            return
+        startup.mark('first_frame_processed')
+        
+        hand_detected = gesture_data is not None and gesture_data['landmarks'] is not None
+        self.idle_monitor.update(hand_detected)
         
         if gesture_data and gesture_data['landmarks'] is not None:
             # Update landmarks and gesture data
@@ -148,53 +284,148 @@ class HandOverlay(QWidget):
             self.landmarks = landmarks
             self.gesture = gesture_data['gesture']
             
-            # Update cursor position
-            if gesture_data['thumb_pos'] is not None:
-                self.cursor_controller.update_cursor(gesture_data['thumb_pos'])
-            
-            # Handle gestures
-            self.cursor_controller.handle_gesture(gesture_data['gesture'])
-            
-            # Handle audio recording based on gesture
-            self.handle_audio_recording(gesture_data['gesture'])
-            
-            # Handle paste gesture
-            self.handle_paste_gesture(gesture_data['gesture'])
-            
-            # Send gesture to Flutter
-            self.send_gesture_to_flutter(gesture_data['gesture'])
+            with degradation.stage('cursor'):
+                # Update cursor position
+                if gesture_data['thumb_pos'] is not None:
+                    self.cursor_controller.update_cursor(gesture_data['thumb_pos'],
+                                                         timestamp=gesture_data['timestamp'])
+                    startup.mark('first_cursor_move')
+                
+                # Handle gestures
+                self.cursor_controller.handle_gesture(gesture_data['gesture'],
+                                                      scroll_speed=gesture_data['scroll_speed'],
+                                                      timestamp=gesture_data['timestamp'])
             
-            # Update display
-            self.update()
+            with degradation.stage('actions'):
+                # Handle audio recording based on gesture
+                self.handle_audio_recording(gesture_data['gesture'])
+                
+                # Handle paste gesture
+                self.handle_paste_gesture(gesture_data['gesture'])
+                
+                # Send gesture to Flutter
+                self.send_gesture_to_flutter(gesture_data['gesture'])
+                for dynamic_gesture in gesture_data['dynamic_gestures']:
+                    self.send_dynamic_gesture_to_flutter(dynamic_gesture, gesture_data['motion'])
+        elif self.landmarks is None:
+            # Nothing on screen to clear - skip the repaint
+            degradation.end_frame()
+            return
         else:
             # Clear overlay if no hand detected
+            self.cursor_controller.reset_cursor_filter()
+            self.cursor_controller.release_scroll()
             self.landmarks = None
             self.gesture = None
+        
+        # Update display
+        if not degradation.skip_skeleton:
             self.update()
+        
+        degradation.end_frame()
     
-    def send_frame_to_flutter(self, frame):
-        """Send camera frame to Flutter"""
-        try:
-            # Resize and encode
-            height, width = frame.shape[:2]
-            new_width = 180
-            new_height = int(height * (new_width / width))
-            resized_frame = cv2.resize(frame, (new_width, new_height))
-            
-            _, buffer = cv2.imencode('.jpg', resized_frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-            frame_b64 = base64.b64encode(buffer).decode('utf-8')
+    def set_paused(self, paused):
+        """Pause or resume tracking - runs on the GUI thread
+        
+        Pausing releases the camera and stops the frame loop; the gesture
+        model, WebSocket and input backend stay loaded, so resuming only has
+        to reopen the camera.
+        """
+        if paused == self.is_paused:
+            return
+        start = time.perf_counter()
+        self.is_paused = paused
+        if paused:
+            self.frame_capture.stop()
             
-            frame_data = {
-                "type": "camera_frame",
-                "data": frame_b64
+            # Nothing may stay pressed, scrolling or recording while paused
+            self.cursor_controller.release_all()
+            self.handle_audio_recording("recording_stop")
+            self.audio_recorder.close_stream()  # No listening while paused
+            if self.gesture_detector:
+                self.gesture_detector.reset()
+            self.last_gesture_type = None
+            self.landmarks = None
+            self.gesture = None
+            self.update()
+            self.hide()
+        else:
+            self.idle_monitor.wake("tracking resumed")
+            if self.audio_recorder.always_open:
+                run_in_background('microphone', self.audio_recorder.open_stream)
+            self.show()
+            self.frame_capture.start()
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        print(f"Tracking {'paused' if paused else 'resumed'} in {elapsed_ms:.1f} ms")
+        metrics.record('pause' if paused else 'resume', elapsed_ms / 1000.0)
+        try:
+            send_to_flutter({
+                "type": "tracking_state",
+                "state": "paused" if paused else "active",
+                "elapsed_ms": round(elapsed_ms, 1),
+            })
+        except Exception as e:
+            print(f"Error sending tracking state: {e}")
+    
+    def shutdown(self):
+        """Close the overlay and quit the application"""
+        self.close()
+        QApplication.quit()
+    
+    def send_metrics(self):
+        """Send stage latency histograms and counters to Flutter"""
+        try:
+            metrics_data = {"type": "metrics"}
+            metrics_data.update(metrics.snapshot(reset=True))
+            metrics_data["degradation"] = self.degradation_controller.status()
+            metrics_data["idle"] = self.idle_monitor.is_idle
+            if self.frame_capture:
+                metrics_data["capture"] = {
+                    "frames_captured": self.frame_capture.frames_captured,
+                    "frames_dropped": self.frame_capture.frames_dropped,
+                }
+            send_to_flutter(metrics_data)
+        except Exception as e:
+            print(f"Error sending metrics: {e}")
+    
+    def on_idle_state_change(self, idle):
+        """Drop to a low capture rate while idle and report the state to Flutter"""
+        if self.frame_capture:
+            self.frame_capture.set_frame_interval(self.idle_monitor.idle_frame_interval if idle else 0.0)
+        try:
+            state_data = {
+                "type": "tracking_state",
+                "state": "idle" if idle else "active"
             }
-            
-            # Ensure UTF-8 encoding
-            json_str = json.dumps(frame_data, ensure_ascii=False)
-            print(json_str, flush=True)
+            send_to_flutter(state_data)
         except Exception as e:
-            # Don't print errors that could contain binary data
-            pass
+            print(f"Error sending tracking state: {e}")
+    
+    def on_degradation_level_change(self, status):
+        """Report degradation level changes to Flutter"""
+        try:
+            level_data = {"type": "degradation_level"}
+            level_data.update(status)
+            send_to_flutter(level_data)
+        except Exception as e:
+            print(f"Error sending degradation level: {e}")
+        
+        # Repaint once so a hidden skeleton is cleared from the screen
+        self.update()
+    
+    def send_frame_to_flutter(self, frame):
+        """Hand the frame to the preview encoder - encoding happens off the frame loop"""
+        self.preview_encoder.submit(frame)
+    
+    def send_dynamic_gesture_to_flutter(self, gesture, motion):
+        """Send a completed temporal gesture (swipe, flick, double pinch) to Flutter"""
+        send_to_flutter({
+            "type": "dynamic_gesture",
+            "gesture_type": gesture,
+            "velocity": motion['velocity'],
+            "speed": motion['speed'],
+        })
     
     def send_gesture_to_flutter(self, gesture):
         """Send gesture to Flutter - only when gesture changes"""
@@ -218,8 +449,7 @@ class HandOverlay(QWidget):
                     "confidence": 0.8
                 }
                 # Ensure UTF-8 encoding
-                json_str = json.dumps(gesture_data, ensure_ascii=False)
-                print(json_str, flush=True)
+                send_to_flutter(gesture_data)
                 self.last_gesture_type = gesture
             
         except:
@@ -267,7 +497,7 @@ class HandOverlay(QWidget):
                 if clipboard_content.strip():
                     # Simulate Ctrl+V to paste at cursor position
                     try:
-                        pyautogui.hotkey('ctrl', 'v')
+                        self.cursor_controller.paste()
                     except Exception as e:
                         print(f"Error simulating Ctrl+V: {e}")
                     
@@ -279,8 +509,7 @@ class HandOverlay(QWidget):
                         "text": clipboard_content
                     }
                     # Ensure UTF-8 encoding
-                    json_str = json.dumps(paste_data, ensure_ascii=False)
-                    print(json_str, flush=True)
+                    send_to_flutter(paste_data)
                 else:
                     print("No content available in clipboard to paste")
                 
@@ -336,6 +565,11 @@ class HandOverlay(QWidget):
         while self.is_tracking:
             try:
                 line = sys.stdin.readline()
+                if not line:
+                    # Flutter closed our stdin - nobody is left to resume or stop us
+                    print("Stdin closed, shutting down")
+                    self.shutdown_requested.emit()
+                    break
                 if line:
                     line = line.strip()
                     if line:
@@ -369,8 +603,7 @@ class HandOverlay(QWidget):
                             "status": "failed",
                             "text": text
                         }
-                        json_str = json.dumps(failure_data, ensure_ascii=False)
-                        print(json_str, flush=True)
+                        send_to_flutter(failure_data)
                 else:
                     print("Empty text received")
             
@@ -384,8 +617,7 @@ class HandOverlay(QWidget):
                 clear_data = {
                     "type": "transcript_cleared"
                 }
-                json_str = json.dumps(clear_data, ensure_ascii=False)
-                print(json_str, flush=True)
+                send_to_flutter(clear_data)
                 
             elif command_type == 'manual_recording_start':
                 # Manual recording start via mic button
@@ -396,6 +628,23 @@ class HandOverlay(QWidget):
                 # Manual recording stop via mic button
                 print("Manual recording stop requested")
                 self.handle_audio_recording("recording_stop")
+            elif command_type == 'update_cursor_filter':
+                # Runtime tuning, e.g. {"type": "update_cursor_filter", "beta": 0.01}
+                params = {key: value for key, value in data.items() if key != 'type'}
+                self.cursor_controller.update_cursor_filter(params)
+            elif command_type == 'pause_tracking':
+                # Release the camera but keep the model and connections warm
+                self.pause_requested.emit(True)
+            elif command_type == 'resume_tracking':
+                # Flutter sends the current access token - settings may have
+                # changed, or the token expired, while the process was paused
+                access_token = data.get('access_token')
+                if access_token:
+                    self.reload_motion_mapping(access_token)
+                self.pause_requested.emit(False)
+            elif command_type == 'get_metrics':
+                # On-demand metrics query - read on the GUI thread, which updates the state
+                self.metrics_requested.emit()
             elif command_type == 'update_skeleton_display':
                 # Update skeleton display setting
                 show_skeleton = data.get("show_skeleton", False)
@@ -413,17 +662,35 @@ class HandOverlay(QWidget):
         self.show_skeleton = show_skeleton
         self.update()  # Trigger repaint
     
+    def reload_motion_mapping(self, access_token):
+        """Fetch the motion mapping again on a background thread"""
+        def load():
+            settings_client = SettingsClient()
+            settings_client.set_access_token(access_token)
+            return settings_client.load_motion_mapping()
+        
+        def on_loaded(future):
+            motion_mapping = future.result() if future.exception() is None else None
+            if motion_mapping:
+                self.motion_mapping_loaded.emit(motion_mapping)
+            else:
+                print("Failed to reload motion settings, keeping the current mapping")
+        
+        run_in_background('settings', load).add_done_callback(on_loaded)
+    
     def update_motion_mapping(self, motion_mapping):
         """Update motion mapping configuration"""
         print(f"Updating motion mapping: {motion_mapping}")
+        self.motion_mapping = motion_mapping
         if self.gesture_detector:
             self.gesture_detector.update_motion_mapping(motion_mapping)
     
     def paintEvent(self, event):
         """Draw hand landmarks"""
-        if not self.landmarks or not self.show_skeleton:
+        if not self.landmarks or not self.show_skeleton or self.degradation_controller.skip_skeleton:
             return
-            
+        
+        paint_start = time.perf_counter()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
@@ -446,70 +713,50 @@ class HandOverlay(QWidget):
                 pen.setWidth(10)
                 painter.setPen(pen)
                 painter.drawPoint(x, y)
+        
+        painter.end()
+        # Paint runs after process_frame closed the frame that requested it
+        self.degradation_controller.record_late('paint', time.perf_counter() - paint_start)
                 
     def _get_fingertip_color(self, fingertip_idx):
         """Get color for fingertip based on current gesture and motion mapping"""
-        if not self.gesture:
+        if not self.gesture or not self.gesture_detector:
             return QColor(128, 128, 128, 200)  # Gray default
         
-        # Get current motion mapping from gesture detector
-        motion_mapping = getattr(self.gesture_detector, 'motion_mapping', {
-            'left_click': 'M1', 'right_click': 'M2', 'paste': 'M3'
-        })
-        
-        # Map motion codes to fingertip indices
-        motion_to_fingertip = {
-            'M1': 8,   # Index finger
-            'M2': 12,  # Middle finger  
-            'M3': 20,  # Pinky finger
-        }
-        
-        # Get fingertip indices for each action based on current mapping
-        left_click_fingertip = motion_to_fingertip.get(motion_mapping.get('left_click', 'M1'), 8)
-        right_click_fingertip = motion_to_fingertip.get(motion_mapping.get('right_click', 'M2'), 12)
-        paste_fingertip = motion_to_fingertip.get(motion_mapping.get('paste', 'M3'), 20)
-        
-        # Apply colors based on current gesture and corresponding fingertip
-        if (self.gesture.startswith("left_click") or self.gesture == "left_click") and fingertip_idx == left_click_fingertip:
-            return QColor(0, 255, 0, 255)  # Green for left click
-        elif (self.gesture.startswith("right_click") or self.gesture == "right_click") and fingertip_idx == right_click_fingertip:
-            return QColor(255, 100, 0, 255)  # Orange for right click
-        elif (self.gesture.startswith("paste") or self.gesture in ["paste_start", "paste_hold"]) and fingertip_idx == paste_fingertip:
-            return QColor(0, 255, 255, 255)  # Cyan for paste gesture
-        elif (self.gesture.startswith("recording") or self.gesture in ["recording_start", "recording_hold"]) and fingertip_idx == 16:
-            return QColor(255, 255, 0, 255)  # Yellow for recording (always ring finger)
-        elif (self.gesture.startswith("scroll") or self.gesture == "scroll_start" or self.gesture == "scroll_hold") and fingertip_idx in [8, 12]:
-            return QColor(255, 0, 255, 255)  # Magenta for scroll gestures (always index and middle)
-        else:
-            return QColor(128, 128, 128, 200)  # Gray default
+        # Fingertips and color come from the gesture table and motion mapping
+        fingertips, rgba = self.gesture_detector.engine.gesture_fingertips(self.gesture)
+        if rgba and fingertip_idx in fingertips:
+            return QColor(*rgba)
+        return QColor(128, 128, 128, 200)  # Gray default
     
     def closeEvent(self, event):
         """Clean up on close"""
         self.is_tracking = False
-        self.timer.stop()
-        self.stdin_timer.stop()
+        self.websocket_timer.stop()
+        self.metrics_timer.stop()
         
         # Stop audio recording if active
-        if hasattr(self, 'audio_recorder') and self.audio_recorder.is_recording:
-            self.audio_recorder.stop_recording()
+        if hasattr(self, 'audio_recorder'):
+            self.audio_recorder.close_stream()
         
         # Close WebSocket connection
         if hasattr(self, 'websocket_client'):
             self.websocket_client.close()
         
-        # Properly release camera with error handling
-        if self.cap:
-            try:
-                self.cap.release()
-                print("Camera released successfully")
-            except Exception as e:
-                print(f"Error releasing camera: {e}")
+        # Stop capture thread and release camera
+        if self.frame_capture:
+            self.frame_capture.stop()
+        self.preview_encoder.stop()
+        self.cursor_controller.stop()
+        if self.frame_writer:
+            self.frame_writer.close()
         
         # Additional camera cleanup for Windows
         import cv2
         cv2.destroyAllWindows()
         
-        self.gesture_detector.cleanup()
+        if self.gesture_detector:
+            self.gesture_detector.cleanup()
         event.accept()
 
 def main():
@@ -12,14 +12,24 @@ import argparse
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
+# Diagnostics from every thread share stdout with the JSON messages
+from flutter_channel import lock_stdout_lines
+lock_stdout_lines()
+
 try:
     # Set environment variables
     os.environ['OMP_NUM_THREADS'] = '1'
     
-    from PyQt6.QtWidgets import QApplication
-    from hand_overlay import HandOverlay
+    # Starts the startup clock; Qt, OpenCV and MediaPipe are imported in main()
+    from startup import startup, run_in_background
     from settings_client import SettingsClient
     
+    def load_motion_mapping(access_token):
+        """Fetch the motion mapping from the server - runs on a startup thread"""
+        settings_client = SettingsClient()
+        settings_client.set_access_token(access_token)
+        return settings_client.load_motion_mapping()
+    
     def signal_handler(sig, frame):
         """Handle Ctrl+C gracefully"""
         print("\nStopping hand tracking...")
@@ -34,36 +44,130 @@ try:
                           help='Show skeleton overlay (true/false)')
         parser.add_argument('--access-token', type=str, default='', 
                           help='Access token for server API requests')
+        parser.add_argument('--adaptive-degradation', type=str, default='true',
+                          help='Lower preview rate, skeleton and frame rate when frames back up (true/false, false opts out)')
+        parser.add_argument('--target-latency-ms', type=float, default=None,
+                          help='Per-frame processing budget for adaptive degradation, default the camera frame interval')
+        parser.add_argument('--source', type=str, default='camera',
+                          help='Frame source: camera[:index], synthetic, or a video file / image directory')
+        parser.add_argument('--record-landmarks', type=str, default=None,
+                          help='Record detected hand landmarks to a binary log file')
+        parser.add_argument('--roi-inference', type=str, default='false',
+                          help='Run inference on a crop around the tracked hand (true/false)')
+        parser.add_argument('--idle-timeout', type=float, default=5.0,
+                          help='Seconds without a hand before entering idle mode (0 disables)')
+        parser.add_argument('--preview-fps', type=float, default=15.0,
+                          help='Maximum camera preview frames per second sent to Flutter')
+        parser.add_argument('--preview-bytes-per-second', type=int, default=150000,
+                          help='Target preview bandwidth; JPEG quality adapts to it')
+        parser.add_argument('--frame-transport', type=str, default='json', choices=['json', 'shm'],
+                          help='Send camera frames as JSON lines on stdout or through shared memory')
+        parser.add_argument('--metrics-interval', type=float, default=10.0,
+                          help='Seconds between metrics messages to Flutter (0 disables)')
+        parser.add_argument('--cursor-rate', type=float, default=120.0,
+                          help='Cursor injection rate in Hz (0 moves the cursor inline on each frame)')
+        parser.add_argument('--input-backend', type=str, default='auto',
+                          choices=['auto', 'native', 'pyautogui', 'recording'],
+                          help='Mouse/keyboard injection backend (auto prefers native, recording injects nothing)')
+        parser.add_argument('--two-hands', type=str, default='false',
+                          help='Track two hands: the primary moves the cursor, the other gestures (true/false)')
+        parser.add_argument('--primary-hand', type=str, default='Right', choices=['Left', 'Right'],
+                          help='Hand that drives the cursor in two-hand mode')
+        parser.add_argument('--scroll-rate', type=float, default=60.0,
+                          help='Scroll events per second from the scroll engine')
+        parser.add_argument('--landmark-backend', type=str, default='legacy', choices=['legacy', 'tasks'],
+                          help='Hand landmark inference: legacy mp.solutions.hands or async Tasks HandLandmarker')
+        parser.add_argument('--model-complexity', type=int, default=1, choices=[0, 1],
+                          help='Legacy backend model complexity (0 is faster)')
+        parser.add_argument('--hand-model', type=str, default=None,
+                          help='hand_landmarker.task model file for the tasks backend')
+        parser.add_argument('--audio-chunk-ms', type=float, default=160.0,
+                          help='Microphone audio is coalesced into chunks of this length before sending')
+        parser.add_argument('--websocket-url', type=str, default=None,
+                          help='Transcription WebSocket URL, e.g. ws://127.0.0.1:8765 for local_ws_server.py')
+        parser.add_argument('--binary-audio', type=str, default='false',
+                          help='Send audio as binary WebSocket frames instead of base64 JSON (true/false)')
+        parser.add_argument('--mic-always-open', type=str, default='false',
+                          help='Keep the microphone open so recordings start instantly with pre-roll (true/false)')
+        parser.add_argument('--preroll-ms', type=float, default=500.0,
+                          help='Audio from before the recording gesture sent at its start (always-open mode)')
+        parser.add_argument('--vad', type=str, default='false',
+                          help='Skip silent audio chunks with voice activity detection (true/false)')
+        parser.add_argument('--vad-hangover-ms', type=float, default=300.0,
+                          help='Audio kept after speech ends before chunks count as silence')
+        parser.add_argument('--audio-format', type=str, default='pcm_s16le', choices=['pcm_s16le', 'mulaw'],
+                          help='Encoding of sent audio; mulaw is 8 bits per sample')
+        parser.add_argument('--audio-sample-rate', type=int, default=16000, choices=[16000, 8000],
+                          help='Sample rate of sent audio; 8000 is narrowband')
         args = parser.parse_args()
         
         # Convert string to boolean
         show_skeleton = args.show_skeleton.lower() == 'true'
         print(f"Starting hand tracking with skeleton display: {show_skeleton}")
         
-        # Load motion mapping from server if token is provided
-        motion_mapping = None
+        # Load motion mapping from server if token is provided - in the
+        # background, while Qt, the camera and the model start up
+        settings_future = None
         if args.access_token:
             print("Loading motion settings from server...")
-            settings_client = SettingsClient()
-            settings_client.set_access_token(args.access_token)
-            settings_data = settings_client.get_motion_settings()
-            if settings_data:
-                motion_mapping = settings_client.parse_motion_mapping(settings_data)
-                print(f"Loaded motion mapping: {motion_mapping}")
-            else:
-                print("Failed to load motion settings, using defaults")
+            settings_future = run_in_background('settings', load_motion_mapping, args.access_token)
         else:
             print("No access token provided, using default motion mapping")
         
         # Setup signal handler for graceful shutdown
         signal.signal(signal.SIGINT, signal_handler)
         
+        from PyQt6.QtWidgets import QApplication
+        from hand_overlay import HandOverlay
+        from frame_source import create_frame_source
+        
         # Create Qt application
         app = QApplication(sys.argv)
+        startup.mark('qt_ready')
         
-        # Create hand overlay with skeleton setting and motion mapping
-        overlay = HandOverlay(show_skeleton=show_skeleton, motion_mapping=motion_mapping)
+        # Create hand overlay with skeleton setting; the model loads in the background
+        overlay = HandOverlay(show_skeleton=show_skeleton, motion_mapping=None,
+                              target_latency_ms=args.target_latency_ms,
+                              adaptive_degradation=args.adaptive_degradation.lower() == 'true',
+                              frame_source=create_frame_source(args.source, realtime=True, loop=True),
+                              record_landmarks=args.record_landmarks,
+                              roi_inference=args.roi_inference.lower() == 'true',
+                              idle_timeout=args.idle_timeout,
+                              preview_fps=args.preview_fps,
+                              preview_bytes_per_second=args.preview_bytes_per_second,
+                              frame_transport=args.frame_transport,
+                              metrics_interval=args.metrics_interval,
+                              cursor_rate=args.cursor_rate,
+                              input_backend=args.input_backend,
+                              two_hands=args.two_hands.lower() == 'true',
+                              primary_hand=args.primary_hand,
+                              scroll_rate=args.scroll_rate,
+                              landmark_backend=args.landmark_backend,
+                              model_complexity=args.model_complexity,
+                              hand_model=args.hand_model,
+                              audio_chunk_ms=args.audio_chunk_ms,
+                              websocket_url=args.websocket_url,
+                              binary_audio=args.binary_audio.lower() == 'true',
+                              mic_always_open=args.mic_always_open.lower() == 'true',
+                              preroll_ms=args.preroll_ms,
+                              vad=args.vad.lower() == 'true',
+                              vad_hangover_ms=args.vad_hangover_ms,
+                              audio_format=args.audio_format,
+                              audio_samplerate=args.audio_sample_rate)
         overlay.show()
+        startup.mark('overlay_shown')
+        
+        def on_settings_loaded(future):
+            # Runs on the settings thread - the signal hands the mapping to the GUI thread
+            motion_mapping = future.result() if future.exception() is None else None
+            if motion_mapping:
+                print(f"Loaded motion mapping: {motion_mapping}")
+                overlay.motion_mapping_loaded.emit(motion_mapping)
+            else:
+                print("Failed to load motion settings, using defaults")
+        
+        if settings_future:
+            settings_future.add_done_callback(on_settings_loaded)
         
         print("Hand tracking started. Press Ctrl+C to stop.")
         
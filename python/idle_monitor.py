@@ -0,0 +1,75 @@
+"""
+Idle detection with motion-gated inference when no hand is present
+"""
+
+import time
+import cv2
+import numpy as np
+
+
+class IdleMonitor:
+    """Switches the pipeline into a low-power idle state when no hand is seen.
+
+    While idle, a cheap frame difference on a tiny grayscale thumbnail decides
+    whether the full hand inference should run at all.
+    """
+
+    def __init__(self, idle_timeout=5.0, idle_frame_interval=0.2, motion_threshold=4.0,
+                 thumbnail_size=(32, 24), on_state_change=None):
+        self.idle_timeout = idle_timeout  # Seconds without a hand before going idle, 0 disables
+        self.idle_frame_interval = idle_frame_interval  # Capture interval while idle
+        self.motion_threshold = motion_threshold  # Mean absolute gray level difference
+        self.thumbnail_size = thumbnail_size
+        self.on_state_change = on_state_change
+
+        self.is_idle = False
+        self.last_hand_time = time.monotonic()
+        self._last_thumbnail = None
+
+    def should_run_inference(self, frame):
+        """Return True if hand inference should run on this frame"""
+        if not self.is_idle:
+            return True
+
+        thumbnail = cv2.cvtColor(
+            cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY
+        ).astype(np.int16)
+        previous = self._last_thumbnail
+        self._last_thumbnail = thumbnail
+        if previous is None:
+            return False
+
+        motion = np.abs(thumbnail - previous).mean()
+        if motion > self.motion_threshold:
+            self._set_idle(False, f"motion {motion:.1f}")
+            return True
+        return False
+
+    def update(self, hand_detected):
+        """Record whether the last inference found a hand"""
+        now = time.monotonic()
+        if hand_detected:
+            self.last_hand_time = now
+            if self.is_idle:
+                self._set_idle(False, "hand detected")
+        elif (not self.is_idle and self.idle_timeout > 0
+              and now - self.last_hand_time > self.idle_timeout):
+            self._set_idle(True, f"no hand for {self.idle_timeout:.0f}s")
+
+    def wake(self, reason):
+        """Leave idle mode, or restart the no-hand timeout if already active"""
+        if self.is_idle:
+            self._set_idle(False, reason)
+        else:
+            self.last_hand_time = time.monotonic()
+
+    def _set_idle(self, idle, reason):
+        self.is_idle = idle
+        self._last_thumbnail = None
+        if not idle:
+            # Give the woken pipeline a full timeout before idling again
+            self.last_hand_time = time.monotonic()
+        print(f"Tracking {'idle' if idle else 'active'}: {reason}")
+        if self.on_state_change:
+            self.on_state_change(idle)
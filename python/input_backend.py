@@ -0,0 +1,276 @@
+"""
+Pluggable mouse and keyboard injection: pyautogui, native OS calls and an in-memory recorder
+"""
+
+import sys
+import time
+
+from metrics import metrics
+
+
+class InputBackend:
+    """Interface for anything that can inject mouse and keyboard input"""
+
+    name = 'base'
+
+    def size(self):
+        """Screen size in pixels as (width, height)"""
+        raise NotImplementedError
+
+    def move_to(self, x, y):
+        """Move the cursor to absolute screen pixels, without any tween"""
+        raise NotImplementedError
+
+    def mouse_down(self, button='left'):
+        raise NotImplementedError
+
+    def mouse_up(self, button='left'):
+        raise NotImplementedError
+
+    def click(self, button='left'):
+        self.mouse_down(button)
+        self.mouse_up(button)
+
+    def scroll(self, clicks):
+        """Scroll the wheel; positive is up"""
+        raise NotImplementedError
+
+    def hotkey(self, *keys):
+        """Press keys in order and release them in reverse, e.g. hotkey('ctrl', 'v')"""
+        raise NotImplementedError
+
+
+class PyAutoGuiBackend(InputBackend):
+    """Portable injection through pyautogui"""
+
+    name = 'pyautogui'
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+        # Disable pyautogui failsafe and pause
+        pyautogui.FAILSAFE = False
+        pyautogui.PAUSE = 0
+
+    def size(self):
+        return self.pyautogui.size()
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def mouse_down(self, button='left'):
+        self.pyautogui.mouseDown(button=button)
+
+    def mouse_up(self, button='left'):
+        self.pyautogui.mouseUp(button=button)
+
+    def click(self, button='left'):
+        self.pyautogui.click(button=button)
+
+    def scroll(self, clicks):
+        self.pyautogui.scroll(clicks)
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys)
+
+
+class WindowsInputBackend(InputBackend):
+    """Direct user32 calls through ctypes, skipping pyautogui's per-call overhead"""
+
+    name = 'native'
+
+    _BUTTON_FLAGS = {
+        'left': (0x0002, 0x0004),  # MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP
+        'right': (0x0008, 0x0010),
+        'middle': (0x0020, 0x0040),
+    }
+    _MOUSEEVENTF_WHEEL = 0x0800
+    _KEYEVENTF_KEYUP = 0x0002
+    _VIRTUAL_KEYS = {
+        'ctrl': 0x11, 'shift': 0x10, 'alt': 0x12, 'win': 0x5B,
+        'enter': 0x0D, 'tab': 0x09, 'esc': 0x1B, 'backspace': 0x08, 'space': 0x20,
+    }
+
+    def __init__(self):
+        import ctypes
+        self.user32 = ctypes.windll.user32
+
+    def size(self):
+        return self.user32.GetSystemMetrics(0), self.user32.GetSystemMetrics(1)
+
+    def move_to(self, x, y):
+        self.user32.SetCursorPos(int(x), int(y))
+
+    def mouse_down(self, button='left'):
+        self.user32.mouse_event(self._BUTTON_FLAGS[button][0], 0, 0, 0, 0)
+
+    def mouse_up(self, button='left'):
+        self.user32.mouse_event(self._BUTTON_FLAGS[button][1], 0, 0, 0, 0)
+
+    def scroll(self, clicks):
+        # Raw wheel delta units (120 per notch), the same unit pyautogui uses on Windows
+        self.user32.mouse_event(self._MOUSEEVENTF_WHEEL, 0, 0, int(clicks), 0)
+
+    def _virtual_key(self, key):
+        key = key.lower()
+        if key in self._VIRTUAL_KEYS:
+            return self._VIRTUAL_KEYS[key]
+        if len(key) == 1 and key.isalnum():
+            return ord(key.upper())
+        raise ValueError(f"Unsupported key: {key}")
+
+    def hotkey(self, *keys):
+        codes = [self._virtual_key(key) for key in keys]
+        for code in codes:
+            self.user32.keybd_event(code, 0, 0, 0)
+        for code in reversed(codes):
+            self.user32.keybd_event(code, 0, self._KEYEVENTF_KEYUP, 0)
+
+
+class XTestInputBackend(InputBackend):
+    """X11 XTest injection through python-xlib (optional dependency)"""
+
+    name = 'native'
+
+    _BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+    _KEYSYMS = {
+        'ctrl': 'Control_L', 'shift': 'Shift_L', 'alt': 'Alt_L', 'win': 'Super_L',
+        'enter': 'Return', 'tab': 'Tab', 'esc': 'Escape', 'backspace': 'BackSpace', 'space': 'space',
+    }
+
+    def __init__(self):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self.X = X
+        self.XK = XK
+        self.xtest = xtest
+        self.display = display.Display()
+        if not self.display.has_extension('XTEST'):
+            self.display.close()
+            raise RuntimeError("X server has no XTEST extension")
+        self.screen = self.display.screen()
+
+    def size(self):
+        return self.screen.width_in_pixels, self.screen.height_in_pixels
+
+    def move_to(self, x, y):
+        self.xtest.fake_input(self.display, self.X.MotionNotify, x=int(x), y=int(y))
+        self.display.flush()
+
+    def mouse_down(self, button='left'):
+        self.xtest.fake_input(self.display, self.X.ButtonPress, self._BUTTONS[button])
+        self.display.flush()
+
+    def mouse_up(self, button='left'):
+        self.xtest.fake_input(self.display, self.X.ButtonRelease, self._BUTTONS[button])
+        self.display.flush()
+
+    def scroll(self, clicks):
+        # Wheel clicks are buttons 4 (up) and 5 (down)
+        button = 4 if clicks > 0 else 5
+        for _ in range(abs(int(clicks))):
+            self.xtest.fake_input(self.display, self.X.ButtonPress, button)
+            self.xtest.fake_input(self.display, self.X.ButtonRelease, button)
+        self.display.flush()
+
+    def _keycode(self, key):
+        keysym = self.XK.string_to_keysym(self._KEYSYMS.get(key.lower(), key))
+        keycode = self.display.keysym_to_keycode(keysym)
+        if not keycode:
+            raise ValueError(f"Unsupported key: {key}")
+        return keycode
+
+    def hotkey(self, *keys):
+        codes = [self._keycode(key) for key in keys]
+        for code in codes:
+            self.xtest.fake_input(self.display, self.X.KeyPress, code)
+        for code in reversed(codes):
+            self.xtest.fake_input(self.display, self.X.KeyRelease, code)
+        self.display.flush()
+
+
+class RecordingBackend(InputBackend):
+    """Records every injection call in memory.
+
+    On its own it injects nothing, which makes gesture streams countable
+    without touching the desktop. Wrapping another backend forwards each
+    call and records how long it took.
+    """
+
+    name = 'recording'
+
+    def __init__(self, inner=None, screen_size=(1920, 1080)):
+        self.inner = inner
+        self.screen_size = screen_size
+        self.calls = []  # (call name, args, duration in seconds)
+
+    def _record(self, call, *args):
+        start = time.perf_counter()
+        if self.inner is not None:
+            getattr(self.inner, call)(*args)
+        duration = time.perf_counter() - start
+        self.calls.append((call, args, duration))
+        metrics.record(f"input.{call}", duration)
+
+    def size(self):
+        if self.inner is not None:
+            return self.inner.size()
+        return self.screen_size
+
+    def move_to(self, x, y):
+        self._record('move_to', x, y)
+
+    def mouse_down(self, button='left'):
+        self._record('mouse_down', button)
+
+    def mouse_up(self, button='left'):
+        self._record('mouse_up', button)
+
+    def click(self, button='left'):
+        self._record('click', button)
+
+    def scroll(self, clicks):
+        self._record('scroll', clicks)
+
+    def hotkey(self, *keys):
+        self._record('hotkey', *keys)
+
+    def counts(self):
+        """Number of calls per call name"""
+        counts = {}
+        for call, _, _ in self.calls:
+            counts[call] = counts.get(call, 0) + 1
+        return counts
+
+    def clear(self):
+        self.calls = []
+
+
+def create_native_backend():
+    """Native backend for this platform, or None if it is not available"""
+    try:
+        if sys.platform == 'win32':
+            return WindowsInputBackend()
+        if sys.platform.startswith('linux'):
+            return XTestInputBackend()
+    except Exception as e:
+        print(f"Native input backend unavailable: {e}")
+    return None
+
+
+def create_input_backend(name='auto'):
+    """Build an input backend by name: auto, native, pyautogui or recording.
+
+    'auto' prefers the native backend and falls back to pyautogui.
+    """
+    if name == 'recording':
+        return RecordingBackend()
+    if name in ('auto', 'native'):
+        backend = create_native_backend()
+        if backend is not None:
+            return backend
+        if name == 'native':
+            raise RuntimeError("No native input backend on this platform")
+    elif name != 'pyautogui':
+        raise ValueError(f"Unknown input backend: {name}")
+    return PyAutoGuiBackend()
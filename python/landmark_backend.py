@@ -0,0 +1,158 @@
+"""
+Pluggable hand landmark inference: legacy MediaPipe Hands or the Tasks HandLandmarker in live-stream mode
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from metrics import metrics
+
+
+class LandmarkResult:
+    """Hands found in one submitted frame"""
+
+    def __init__(self, timestamp, hands):
+        self.timestamp = timestamp  # Timestamp the frame was submitted with
+        self.hands = hands  # List of (handedness label, (21, 3) array)
+
+
+class LandmarkBackend:
+    """Interface for hand landmark inference.
+
+    submit() hands over an RGB frame; poll() returns the newest finished
+    result not returned before, or None. Synchronous backends finish inside
+    submit(); asynchronous ones may still be working on an older frame.
+    """
+
+    name = 'base'
+    is_async = False
+
+    def submit(self, rgb_image, timestamp):
+        raise NotImplementedError
+
+    def poll(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class LegacyHandsBackend(LandmarkBackend):
+    """Synchronous mp.solutions.hands - inference runs inside submit()"""
+
+    name = 'legacy'
+
+    def __init__(self, max_num_hands=1, model_complexity=1,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.5):
+        import mediapipe as mp
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=False,
+            max_num_hands=max_num_hands,
+            model_complexity=model_complexity,  # 0 is the lighter, faster model
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self._result = None
+
+    def submit(self, rgb_image, timestamp):
+        results = self.hands.process(rgb_image)
+        hands = []
+        if results.multi_hand_landmarks:
+            for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                positions = np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark])
+                hands.append((handedness.classification[0].label, positions))
+        self._result = LandmarkResult(timestamp, hands)
+
+    def poll(self):
+        result = self._result
+        self._result = None
+        return result
+
+    def close(self):
+        self.hands.close()
+
+
+class TasksHandLandmarkerBackend(LandmarkBackend):
+    """MediaPipe Tasks HandLandmarker in LIVE_STREAM mode.
+
+    submit() only queues the frame; results arrive on MediaPipe's thread
+    through a callback, so frame N+1 can be submitted while frame N is still
+    being processed. Frames submitted while the graph is busy are dropped.
+    """
+
+    name = 'tasks'
+    is_async = True
+
+    def __init__(self, model_path, max_num_hands=1,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.5):
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions, vision
+        self.mp = mp
+        options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+        self._lock = threading.Lock()
+        self._latest = None
+        self._in_flight = {}  # timestamp_ms -> (timestamp, submit perf_counter)
+        self._last_timestamp_ms = -1
+
+        # Statistics
+        self.frames_submitted = 0
+        self.frames_completed = 0
+        self.frames_dropped = 0
+
+    def submit(self, rgb_image, timestamp):
+        # Live-stream timestamps must be strictly increasing milliseconds
+        timestamp_ms = max(int(timestamp * 1000), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        with self._lock:
+            self._in_flight[timestamp_ms] = (timestamp, time.perf_counter())
+        image = self.mp.Image(image_format=self.mp.ImageFormat.SRGB, data=rgb_image)
+        self.landmarker.detect_async(image, timestamp_ms)
+        self.frames_submitted += 1
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        hands = [
+            (handedness[0].category_name, np.array([[lm.x, lm.y, lm.z] for lm in landmarks]))
+            for landmarks, handedness in zip(result.hand_landmarks, result.handedness)
+        ]
+        now = time.perf_counter()
+        with self._lock:
+            # Anything submitted before this frame without a result was dropped
+            for stale in [ms for ms in self._in_flight if ms < timestamp_ms]:
+                del self._in_flight[stale]
+                self.frames_dropped += 1
+            timestamp, submitted = self._in_flight.pop(timestamp_ms, (timestamp_ms / 1000.0, now))
+            self._latest = LandmarkResult(timestamp, hands)
+            self.frames_completed += 1
+        metrics.record('hands_result_latency', now - submitted)
+
+    def poll(self):
+        with self._lock:
+            result = self._latest
+            self._latest = None
+        return result
+
+    def close(self):
+        self.landmarker.close()
+
+
+def create_landmark_backend(name='legacy', max_num_hands=1, model_complexity=1, model_path=None):
+    """Build a landmark backend by name: legacy or tasks (needs a .task model file)"""
+    if name == 'legacy':
+        return LegacyHandsBackend(max_num_hands=max_num_hands, model_complexity=model_complexity)
+    if name == 'tasks':
+        if not model_path:
+            raise ValueError("The tasks landmark backend needs a hand_landmarker.task model path")
+        return TasksHandLandmarkerBackend(model_path, max_num_hands=max_num_hands)
+    raise ValueError(f"Unknown landmark backend: {name}")
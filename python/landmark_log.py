@@ -0,0 +1,101 @@
+"""
+Compact binary landmark log for recording and replaying hand tracking sessions
+
+File layout (little endian):
+    header  16 bytes  magic b'SGLM', version u16, record size u16, 8 reserved bytes
+    records 260 bytes each  timestamp f8 (time.time()), landmarks f4[21][3]
+"""
+
+import os
+import struct
+import time
+import numpy as np
+
+MAGIC = b'SGLM'
+VERSION = 1
+NUM_LANDMARKS = 21
+
+HEADER = struct.Struct('<4sHH8x')
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, 3)),
+])
+
+
+class LandmarkLogWriter:
+    """Appends landmark records to a log file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self.records_written = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+
+    def write(self, landmarks, timestamp=None):
+        """Write one (21, 3) landmark block"""
+        if self.file is None:
+            return
+        self._record['timestamp'] = time.time() if timestamp is None else timestamp
+        self._record['landmarks'] = landmarks
+        self.file.write(self._record.tobytes())
+        self.records_written += 1
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_landmark_log(path):
+    """Memory-map a landmark log as a structured array of records.
+
+    A trailing partial record (e.g. from a crash mid-write) is ignored.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"Not a landmark log: {path}")
+    magic, version, record_size = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"Not a landmark log: {path}")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Unsupported landmark log version {version} (record size {record_size})")
+
+    count = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+
+
+def replay_landmark_log(path, detector=None, realtime=False):
+    """Feed a landmark log through the gesture classifier.
+
+    Yields (timestamp, landmarks, gesture) per record. No camera or
+    MediaPipe is needed; pass a detector to replay with custom thresholds
+    or motion mapping.
+    """
+    if detector is None:
+        from gesture_detector import GestureDetector
+        detector = GestureDetector(enable_tracking=False)
+
+    records = read_landmark_log(path)
+    replay_start = time.perf_counter()
+    first_timestamp = float(records['timestamp'][0]) if len(records) else 0.0
+
+    for record in records:
+        timestamp = float(record['timestamp'])
+        if realtime:
+            delay = (timestamp - first_timestamp) - (time.perf_counter() - replay_start)
+            if delay > 0:
+                time.sleep(delay)
+        # Classifier works in float64 like the live path
+        positions = record['landmarks'].astype(np.float64)
+        yield timestamp, positions, detector._classify_gesture(positions)
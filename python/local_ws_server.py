@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the transcription WebSocket server, for measuring audio framing offline
+
+Usage:
+    python local_ws_server.py [--host 127.0.0.1] [--port 8765]
+    python hand_tracking_standalone.py --websocket-url ws://127.0.0.1:8765 [--binary-audio true]
+
+Accepts audio both as base64 send_audio JSON messages and as binary frames
+(see audio_frames.py) in any audio_codec.py encoding, answers
+stop_transcribe with a placeholder transcript and prints per-session
+bandwidth and decode cost. Only the parts
+of RFC 6455 the client uses are implemented, with no extra dependencies.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import socketserver
+import struct
+import sys
+import threading
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from audio_codec import decode_audio
+from audio_frames import SAMPLE_BYTES, unpack_audio_frame
+
+_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+class AudioStats:
+    """Bandwidth and decode cost per audio framing"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.messages = {'json': 0, 'binary': 0}
+        self.wire_bytes = {'json': 0, 'binary': 0}
+        self.audio_bytes = {'json': 0, 'binary': 0}
+        self.decode_seconds = {'json': 0.0, 'binary': 0.0}
+        self.audio_seconds = 0.0
+        self.sequence_gaps = 0
+        self.control_messages = 0
+
+    def record(self, framing, wire_bytes, audio_bytes, decode_seconds):
+        self.messages[framing] += 1
+        self.wire_bytes[framing] += wire_bytes
+        self.audio_bytes[framing] += audio_bytes
+        self.decode_seconds[framing] += decode_seconds
+
+    def summary(self):
+        result = {}
+        for framing, count in self.messages.items():
+            if not count:
+                continue
+            result[framing] = {
+                'messages': count,
+                'wire_bytes': self.wire_bytes[framing],
+                'audio_bytes': self.audio_bytes[framing],
+                'overhead_pct': round(100.0 * (self.wire_bytes[framing] / max(self.audio_bytes[framing], 1) - 1), 2),
+                'decode_us_per_message': round(self.decode_seconds[framing] / count * 1e6, 2),
+            }
+        result['audio_seconds'] = round(self.audio_seconds, 2)
+        result['sequence_gaps'] = self.sequence_gaps
+        result['control_messages'] = self.control_messages
+        return result
+
+
+class WebSocketConnection(socketserver.StreamRequestHandler):
+    """One client connection: handshake, then a frame loop"""
+
+    def setup(self):
+        super().setup()
+        self.stats = AudioStats()
+        self.next_sequence = None
+        self.send_lock = threading.Lock()
+        # Encoding of base64 JSON audio, from start_transcribe
+        self.audio_format = 'pcm_s16le'
+        self.sample_rate = 16000
+
+    def handle(self):
+        if not self._handshake():
+            return
+        print(f"Client connected: {self.client_address[0]}:{self.client_address[1]}")
+        message_opcode = None
+        fragments = []
+        while True:
+            frame = self._read_frame()
+            if frame is None:
+                break
+            final, opcode, payload = frame
+            if opcode == OPCODE_CLOSE:
+                self._send_frame(OPCODE_CLOSE, payload[:2])
+                break
+            if opcode == OPCODE_PING:
+                self._send_frame(OPCODE_PONG, payload)
+                continue
+            if opcode == OPCODE_PONG:
+                continue
+            # Reassemble fragmented messages
+            if opcode != OPCODE_CONTINUATION:
+                message_opcode = opcode
+                fragments = []
+            fragments.append(payload)
+            if final:
+                self._handle_message(message_opcode, b''.join(fragments))
+        print(f"Client disconnected: {self.client_address[0]}:{self.client_address[1]}")
+        self.server.report(self.stats)
+
+    def _handshake(self):
+        """Answer the HTTP upgrade request"""
+        headers = {}
+        request_line = self.rfile.readline()
+        if not request_line:
+            return False
+        while True:
+            line = self.rfile.readline().decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get('sec-websocket-key')
+        if not key:
+            self.wfile.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + _GUID).encode('ascii')).digest()).decode('ascii')
+        self.wfile.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode('ascii'))
+        return True
+
+    def _read_exact(self, size):
+        data = self.rfile.read(size)
+        return data if len(data) == size else None
+
+    def _read_frame(self):
+        """(final flag, opcode, unmasked payload) of the next frame, None when the connection ends"""
+        header = self._read_exact(2)
+        if header is None:
+            return None
+        first, second = header
+        final = bool(first & 0x80)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('>H', self._read_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack('>Q', self._read_exact(8))[0]
+        mask = self._read_exact(4) if second & 0x80 else None
+        payload = self._read_exact(length) if length else b''
+        if payload is None:
+            return None
+        if mask:
+            # Unmask a whole mask-length pattern at a time through int arithmetic
+            repeated = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, 'little') ^ int.from_bytes(repeated, 'little')).to_bytes(length, 'little')
+        return final, opcode, payload
+
+    def _send_frame(self, opcode, payload):
+        """Send one unmasked, unfragmented frame"""
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('>BB', 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack('>BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('>BBQ', 0x80 | opcode, 127, length)
+        with self.send_lock:
+            self.wfile.write(header + payload)
+
+    def _send_json(self, data):
+        self._send_frame(OPCODE_TEXT, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def _check_sequence(self, sequence):
+        if self.next_sequence is not None and sequence != self.next_sequence:
+            self.stats.sequence_gaps += 1
+        self.next_sequence = sequence + 1
+
+    def _handle_message(self, opcode, payload):
+        if opcode == OPCODE_BINARY:
+            start = time.perf_counter()
+            try:
+                frame = unpack_audio_frame(payload)
+                samples = decode_audio(frame.payload, frame.audio_format)
+            except ValueError as e:
+                print(f"Dropped binary message: {e}")
+                return
+            self.stats.record('binary', len(payload), len(frame.payload), time.perf_counter() - start)
+            self.stats.audio_seconds += len(samples) / frame.sample_rate
+            self._check_sequence(frame.sequence)
+            return
+
+        start = time.perf_counter()
+        try:
+            data = json.loads(payload.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            print("Dropped malformed text message")
+            return
+        message_type = data.get('type')
+        if message_type == 'send_audio':
+            try:
+                audio = base64.b64decode(data.get('data', ''))
+                samples = decode_audio(audio, self.audio_format)
+            except ValueError as e:
+                print(f"Dropped audio message: {e}")
+                return
+            self.stats.record('json', len(payload), len(audio), time.perf_counter() - start)
+            self.stats.audio_seconds += len(samples) / self.sample_rate
+            return
+
+        self.stats.control_messages += 1
+        if message_type == 'start_transcribe':
+            self.stats.reset()
+            self.next_sequence = None
+            self.audio_format = data.get('audio_format', 'pcm_s16le')
+            self.sample_rate = data.get('sample_rate', 16000)
+            if self.audio_format not in SAMPLE_BYTES:
+                print(f"Unknown audio format {self.audio_format}, reading audio as pcm_s16le")
+                self.audio_format = 'pcm_s16le'
+            print(f"Transcription started: {data}")
+        elif message_type == 'stop_transcribe':
+            summary = self.stats.summary()
+            print(f"Transcription stopped: {json.dumps(summary)}")
+            self._send_json({
+                'type': 'transcript',
+                'text': f"[local server] {self.stats.audio_seconds:.1f} s of audio received",
+                'is_partial': False,
+            })
+        else:
+            print(f"Control message: {message_type}")
+
+
+class LocalWebSocketServer(socketserver.ThreadingTCPServer):
+    """Threaded stand-in server; report() collects each finished connection's stats"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, WebSocketConnection)
+        self.reports = []
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"ws://{host}:{port}"
+
+    def report(self, stats):
+        self.reports.append(stats.summary())
+
+    def start(self):
+        """Serve on a background thread, e.g. from a benchmark"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in transcription WebSocket server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = LocalWebSocketServer((args.host, args.port))
+    print(f"Listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Lightweight latency histograms and counters for diagnosing the tracking pipeline
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Bucket upper bounds in seconds: 50 us to ~6.5 s, about 19% apart
+_BUCKET_BOUNDS = [0.00005 * (1.19 ** i) for i in range(69)]
+
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets - recording is a bisect and an increment"""
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                if index < len(_BUCKET_BOUNDS):
+                    return min(_BUCKET_BOUNDS[index], self.max)
+                return self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50) * 1000, 3),
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'p99_ms': round(self.percentile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class MetricsRegistry:
+    """Named histograms and counters shared by the whole tracker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.started_at = time.monotonic()
+
+    def record(self, name, seconds):
+        """Add a duration to the named histogram"""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def time(self, name):
+        """Time a block into the named histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        """Set a gauge-style counter to an absolute value"""
+        with self._lock:
+            self.counters[name] = value
+
+    def snapshot(self, reset=False):
+        """Histograms and counters as plain dicts, optionally starting a new interval"""
+        with self._lock:
+            data = {
+                'interval_s': round(time.monotonic() - self.started_at, 3),
+                'stages': {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+                'counters': dict(sorted(self.counters.items())),
+            }
+            if reset:
+                self.histograms = {}
+                self.started_at = time.monotonic()
+        return data
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
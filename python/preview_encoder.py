@@ -0,0 +1,143 @@
+"""
+Rate-limited camera preview encoder running off the frame loop
+"""
+
+import base64
+import threading
+import time
+import cv2
+import numpy as np
+
+from flutter_channel import send_to_flutter
+from metrics import metrics
+
+
+class PreviewEncoder:
+    """Encodes the latest submitted frame as a JPEG preview on its own thread.
+
+    The frame loop only hands over a reference; resize, JPEG encode, base64
+    and the stdout write all happen here, at most preview_fps times a second.
+    """
+
+    def __init__(self, preview_fps=15.0, width=180, target_bytes_per_second=150_000,
+                 min_quality=40, max_quality=85, skip_threshold=1.5, keepalive_interval=1.0,
+                 send=send_to_flutter, frame_writer=None):
+        self.preview_fps = preview_fps
+        self.width = width
+        self.target_bytes_per_second = target_bytes_per_second
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.skip_threshold = skip_threshold  # Mean gray level change below which a frame is skipped
+        self.keepalive_interval = keepalive_interval  # Send at least this often even if unchanged
+        self.send = send
+        self.frame_writer = frame_writer  # Optional binary channel (see frame_channel.py)
+
+        self.quality = max_quality
+        self.is_running = False
+        self.thread = None
+
+        self._condition = threading.Condition()
+        self._pending = None
+        self._last_thumbnail = None
+        self._last_send_time = 0.0
+
+        # Statistics
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.bytes_sent = 0
+
+    def start(self):
+        """Start the encoder thread"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the encoder thread"""
+        self.is_running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+
+    def submit(self, frame):
+        """Offer a frame for preview - never blocks, replaces any unencoded frame"""
+        with self._condition:
+            self._pending = frame
+            self._condition.notify()
+
+    def _take_frame(self):
+        """Wait for the next frame that is due under the preview rate"""
+        with self._condition:
+            while self.is_running and self._pending is None:
+                self._condition.wait()
+        if not self.is_running:
+            return None
+
+        # Respect the preview rate; newer frames replace the pending one meanwhile
+        delay = self._last_send_time + 1.0 / self.preview_fps - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._condition:
+            frame = self._pending
+            self._pending = None
+        return frame
+
+    def _run(self):
+        """Encoder loop"""
+        while self.is_running:
+            frame = self._take_frame()
+            if frame is None:
+                continue
+            try:
+                with metrics.time('preview_encode'):
+                    self._encode_and_send(frame)
+            except Exception:
+                # Don't print errors that could contain binary data
+                pass
+
+    def _encode_and_send(self, frame):
+        height, width = frame.shape[:2]
+        new_height = int(height * (self.width / width))
+        resized_frame = cv2.resize(frame, (self.width, new_height))
+
+        # Skip frames that are nearly identical to the last one sent
+        now = time.monotonic()
+        thumbnail = cv2.cvtColor(
+            cv2.resize(resized_frame, (32, 24), interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY
+        ).astype(np.int16)
+        if (self._last_thumbnail is not None
+                and now - self._last_send_time < self.keepalive_interval
+                and np.abs(thumbnail - self._last_thumbnail).mean() < self.skip_threshold):
+            self.frames_skipped += 1
+            metrics.increment('preview_frames_skipped')
+            return
+        self._last_thumbnail = thumbnail
+
+        _, buffer = cv2.imencode('.jpg', resized_frame, [cv2.IMWRITE_JPEG_QUALITY, int(self.quality)])
+        self._adapt_quality(len(buffer))
+
+        if self.frame_writer is not None:
+            self.frame_writer.write(buffer.reshape(-1).data)
+        else:
+            self.send({
+                "type": "camera_frame",
+                "data": base64.b64encode(buffer).decode('utf-8')
+            })
+        self._last_send_time = now
+        self.frames_sent += 1
+        self.bytes_sent += len(buffer)
+        metrics.increment('preview_frames_sent')
+
+    def _adapt_quality(self, frame_bytes):
+        """Nudge JPEG quality so the preview stays near the target bytes/s"""
+        frame_budget = self.target_bytes_per_second / self.preview_fps
+        if frame_bytes > frame_budget:
+            self.quality = max(self.min_quality, self.quality - 5)
+        elif frame_bytes < frame_budget * 0.7:
+            self.quality = min(self.max_quality, self.quality + 1)
@@ -0,0 +1,141 @@
+"""
+Fixed-rate scroll output with fractional accumulation and release inertia
+"""
+
+import math
+import threading
+import time
+
+from metrics import metrics
+
+
+class ScrollEngine:
+    """Integrates a scroll velocity over real time on its own thread.
+
+    The frame loop sets a velocity in scroll units per second; the engine
+    emits whole units at a fixed rate and carries the fractional remainder,
+    so slow scrolls still move and the speed does not depend on the camera
+    frame rate. After release() the velocity decays exponentially.
+
+    With rate_hz=0 no thread is started and the caller drives the engine
+    with advance(now), e.g. with recorded timestamps during replay.
+    """
+
+    def __init__(self, scroll, rate_hz=60.0, inertia_time=0.3, min_velocity=1.0):
+        self.scroll = scroll  # Callable(units) - positive scrolls up
+        self.rate_hz = rate_hz
+        self.inertia_time = inertia_time  # Seconds for the release velocity to fall to 1/e (0 disables)
+        self.min_velocity = min_velocity  # Units/s below which inertia stops
+
+        self.is_running = False
+        self.thread = None
+        self._condition = threading.Condition()
+        self.velocity = 0.0
+        self.accumulator = 0.0
+        self.is_engaged = False  # Scroll gesture held
+        self.is_coasting = False  # Inertia after release
+        self._last_time = None
+
+        # Statistics
+        self.events_sent = 0
+        self.units_sent = 0
+
+    def start(self):
+        """Start the scroll thread"""
+        if self.is_running or self.rate_hz <= 0:
+            return
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the scroll thread"""
+        self.is_running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+
+    @property
+    def is_active(self):
+        return self.is_engaged or self.is_coasting
+
+    def set_velocity(self, velocity, now=None):
+        """Scroll at velocity units/s while the gesture is held"""
+        with self._condition:
+            if not self.is_active:
+                self.accumulator = 0.0
+                self._last_time = time.monotonic() if now is None else now
+            self.velocity = velocity
+            self.is_engaged = True
+            self.is_coasting = False
+            self._condition.notify()
+
+    def release(self):
+        """Gesture ended: coast with decaying velocity"""
+        with self._condition:
+            if not self.is_engaged:
+                return
+            self.is_engaged = False
+            self.is_coasting = self.inertia_time > 0 and abs(self.velocity) >= self.min_velocity
+            if not self.is_coasting:
+                self.velocity = 0.0
+            self._condition.notify()
+
+    def halt(self):
+        """Stop scrolling immediately, dropping inertia and any fraction"""
+        with self._condition:
+            self.is_engaged = False
+            self.is_coasting = False
+            self.velocity = 0.0
+            self.accumulator = 0.0
+
+    def advance(self, now=None):
+        """Integrate up to now and send any whole units, without the thread"""
+        with self._condition:
+            units = self._integrate(time.monotonic() if now is None else now)
+        self._send(units)
+
+    def _integrate(self, now):
+        """Integrate up to now and return the whole units to send - call with the lock held"""
+        if not self.is_active:
+            return 0
+        dt = max(0.0, now - self._last_time)
+        self._last_time = now
+        if self.is_coasting:
+            # Exact integral of the decaying velocity over this step
+            decay = math.exp(-dt / self.inertia_time)
+            self.accumulator += self.velocity * self.inertia_time * (1 - decay)
+            self.velocity *= decay
+            if abs(self.velocity) < self.min_velocity:
+                self.is_coasting = False
+                self.velocity = 0.0
+        else:
+            self.accumulator += self.velocity * dt
+
+        units = int(self.accumulator)  # Truncate toward zero, keep the fraction
+        self.accumulator -= units
+        return units
+
+    def _send(self, units):
+        if not units:
+            return
+        try:
+            self.scroll(units)
+        except Exception:
+            pass
+        self.events_sent += 1
+        self.units_sent += abs(units)
+        metrics.increment('scroll_events_sent')
+
+    def _run(self):
+        """Scroll loop"""
+        period = 1.0 / self.rate_hz
+        while self.is_running:
+            with self._condition:
+                while self.is_running and not self.is_active:
+                    self._condition.wait()
+                units = self._integrate(time.monotonic())
+            self._send(units)
+            time.sleep(period)
@@ -2,7 +2,6 @@
 Settings client for communicating with the server API
 """
 
-import requests
 import json
 import os
 from typing import Dict, Optional
@@ -19,6 +18,7 @@ class SettingsClient:
     
     def get_motion_settings(self) -> Optional[Dict]:
         """Get motion settings from server"""
+        import requests  # Only needed once a token is available
         try:
             if not self.access_token:
                 print("No access token available")
@@ -51,6 +51,13 @@ class SettingsClient:
             print(f"Error loading motion settings: {e}")
             return None
     
+    def load_motion_mapping(self) -> Optional[Dict[str, str]]:
+        """Fetch and parse the motion settings, None if they could not be loaded"""
+        settings_data = self.get_motion_settings()
+        if not settings_data:
+            return None
+        return self.parse_motion_mapping(settings_data)
+    
     def parse_motion_mapping(self, settings_data: Dict) -> Dict[str, str]:
         """
         Parse motion settings and create gesture mapping
@@ -0,0 +1,69 @@
+"""
+Startup timeline: milestones since process start and background startup tasks
+"""
+
+import threading
+import time
+
+from flutter_channel import send_to_flutter
+
+# Import this module first so the clock starts as close to process start as possible
+PROCESS_START = time.perf_counter()
+
+
+class StartupTimeline:
+    """Records the first time each startup milestone is reached.
+
+    Every milestone is reported to Flutter once as a 'startup' message with
+    the milestones since process start, which is what the startup benchmark
+    reads back.
+    """
+
+    def __init__(self, start=PROCESS_START):
+        self.start = start
+        self.events = {}  # Milestone -> seconds since start
+        self._lock = threading.Lock()
+
+    def mark(self, event):
+        """Record a milestone; later calls for the same milestone are ignored"""
+        if event in self.events:
+            return  # Fast path for the per-frame milestones
+        with self._lock:
+            if event in self.events:
+                return
+            elapsed = time.perf_counter() - self.start
+            self.events[event] = elapsed
+        send_to_flutter({
+            "type": "startup",
+            "event": event,
+            "elapsed_ms": round(elapsed * 1000.0, 1),
+        })
+
+    def reached(self, event):
+        return event in self.events
+
+
+def run_in_background(name, target, *args, **kwargs):
+    """Run one startup step on a daemon thread and return a Future for its result
+
+    The step is marked as '<name>_ready' in the timeline when it finishes.
+    """
+    from concurrent.futures import Future
+    future = Future()
+
+    def run():
+        try:
+            result = target(*args, **kwargs)
+        except Exception as e:
+            print(f"Startup step {name} failed: {e}")
+            future.set_exception(e)
+            return
+        startup.mark(f"{name}_ready")
+        future.set_result(result)
+
+    threading.Thread(target=run, name=f"startup-{name}", daemon=True).start()
+    return future
+
+
+# Shared timeline used by the standalone script and the overlay
+startup = StartupTimeline()
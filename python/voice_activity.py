@@ -0,0 +1,85 @@
+"""
+Energy and zero-crossing voice activity detection over int16 audio chunks
+"""
+
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """Decides per audio chunk whether it is worth sending.
+
+    Each chunk is split into frame_ms frames and analysed in one pass:
+    frame energy in dB against an adaptive noise floor, and the zero-crossing
+    rate, which separates voiced speech from hiss. Loud high-ZCR frames
+    (fricatives such as 's') still count as speech. After the last speech
+    frame the detector stays active for hangover_ms so word endings and short
+    pauses are kept.
+    """
+
+    def __init__(self, samplerate=16000, frame_ms=20.0, energy_threshold_db=-50.0, margin_db=10.0,
+                 max_zcr=0.35, loud_margin_db=10.0, min_speech_frames=2, hangover_ms=300.0,
+                 floor_rise_db=0.5):
+        self.samplerate = samplerate
+        self.frame_samples = max(1, int(samplerate * frame_ms / 1000.0))
+        self.energy_threshold_db = energy_threshold_db  # Absolute floor, dBFS
+        self.margin_db = margin_db  # Speech must be this far above the noise floor
+        self.max_zcr = max_zcr  # Crossings per sample above which quiet frames are noise
+        self.loud_margin_db = loud_margin_db  # Frames this far above threshold ignore the ZCR test
+        self.min_speech_frames = min_speech_frames
+        self.hangover_samples = int(samplerate * hangover_ms / 1000.0)
+        self.floor_rise_db = floor_rise_db  # Noise floor may rise this much per chunk
+        self.reset()
+
+    def reset(self):
+        """Start a new recording"""
+        self.noise_floor_db = None
+        self.samples_seen = 0
+        self.last_speech_sample = None
+
+        # Statistics
+        self.frames_total = 0
+        self.frames_speech = 0
+
+    @property
+    def speech_ratio(self):
+        return self.frames_speech / self.frames_total if self.frames_total else 0.0
+
+    def frame_features(self, samples):
+        """Per-frame energy (dBFS) and zero-crossing rate of an int16 chunk; a partial last frame is ignored"""
+        count = len(samples) // self.frame_samples
+        frames = samples[:count * self.frame_samples].reshape(count, self.frame_samples)
+        scaled = frames.astype(np.float32) * (1.0 / 32768.0)
+        energy = np.einsum('ij,ij->i', scaled, scaled) / self.frame_samples
+        energy_db = 10.0 * np.log10(energy + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_samples
+        return energy_db, zcr
+
+    def update(self, samples):
+        """Classify the next chunk; True while speech is present or within the hangover"""
+        energy_db, zcr = self.frame_features(samples)
+        self.samples_seen += len(samples)
+        if not len(energy_db):
+            return self._in_hangover()
+
+        # Noise floor follows the quietest frame down at once and rises slowly
+        quietest = float(energy_db.min())
+        if self.noise_floor_db is None or quietest < self.noise_floor_db:
+            self.noise_floor_db = quietest
+        else:
+            self.noise_floor_db = min(quietest, self.noise_floor_db + self.floor_rise_db)
+
+        threshold = max(self.energy_threshold_db, self.noise_floor_db + self.margin_db)
+        voiced = (energy_db > threshold) & ((zcr <= self.max_zcr) | (energy_db > threshold + self.loud_margin_db))
+        speech_frames = int(np.count_nonzero(voiced))
+        self.frames_total += len(energy_db)
+        self.frames_speech += speech_frames
+
+        if speech_frames >= self.min_speech_frames:
+            self.last_speech_sample = self.samples_seen
+            return True
+        return self._in_hangover()
+
+    def _in_hangover(self):
+        return (self.last_speech_sample is not None
+                and self.samples_seen - self.last_speech_sample <= self.hangover_samples)